@@ -1,473 +1,816 @@
-import random
-from weapons import *
-from armour import *
-
-# ==============================
-# Classes
-# ==============================
-class Character:
-    """
-    Base class for any "combatant" (player or enemy)
-    This class handles combat values and logic
-    A Character has:
-        - a name (str)
-        - hp (integer)
-        - agility (integer)
-        - minimum and maximum damage (integers)
-        - critical hit chance (integer, optional, defaults to 0)
-        - sickness (dot effect that stacks, integer, defaults to 0)
-        - inflict minimum and maximum sickness (sickness that it can give, integer, optional, defaults to 0)
-    """
-    def __init__(self,
-                 name: str,
-                 hp: int,
-                 agility: int,
-                 min_damage: int,
-                 max_damage: int,
-                 crit_ch: int = 0,
-                 sickness: int = 0,
-                 inflict_min_sickness: int = 0,
-                 inflict_max_sickness: int = 0
-                 ) -> None:
-        self.name = name
-        self.hp = hp
-        self.hp_max = hp
-        self.agility = agility
-        self.min_damage = min_damage
-        self.max_damage = max_damage
-        self.crit_ch = crit_ch
-        self.sickness = sickness
-        self.inflict_min_sickness = inflict_min_sickness
-        self.inflict_max_sickness = inflict_max_sickness
-
-    def roll_damage(self) -> int:
-        # Returns a random damage value between min_damage and max_damage
-        return random.randint(self.min_damage, self.max_damage)
-    
-    def roll_inflict_sickness(self) -> int:
-        # Returns a random sickness value between inflict_min_sickness and inflict_max_sickness
-        return random.randint(self.inflict_min_sickness, self.inflict_max_sickness)
-
-    def evade(self) -> bool:
-        # Roll 1-100
-        # The character succeeds in evading if rolled value is under the value of its agility attribute
-        roll_evade = random.randint(1, 100)
-        return roll_evade <= self.agility
-    
-    def crit(self) -> bool:
-        # Roll 1-100
-        # The character deals a critical hit if rolled value is under the value of its crit_ch attribute
-        roll_crit = random.randint(1, 100)
-        return roll_crit <= self.crit_ch
-    
-    def deal_crit(self, 
-                  damage: int
-                  ) -> bool:
-        # Doubles damage if crit is triggered
-        if self.crit():
-            print("CRITICAL HIT")
-            return damage * 2
-        return damage
-
-    def attack(self, 
-               target
-               ) -> None:
-        # Handles basic attack sequence
-
-        if target.evade():      # check if target dodges the attack
-            print(f"{self.name} missed the attack!")
-            return
-        
-        damage = self.roll_damage()         # roll base damage
-        damage = self.deal_crit(damage)     # apply crit modifier if crit triggers
-
-        # If this character can inflict sickness
-        # Add inflict sickness value to target's sickness attribute
-        if self.inflict_max_sickness > 0:
-            inflicted_sickness = self.roll_inflict_sickness()
-            target.sickness += inflicted_sickness
-            print(f"{self.name} has inflicted {inflicted_sickness} sickness onto {target.name}!") 
-            target.apply_sickness()     # sickness damage is applied instantly
-        else:
-            # Otherwise, deal raw damage
-            target.take_damage(damage)
-            print(f"{self.name} inflicts {target.name} for {damage} damage!")
-
-    def apply_sickness(self) -> None:
-        # Applies sickness damage at the start of turn
-        if self.sickness > 0:
-            self.take_damage(self.sickness)
-            print(f"{self.name} suffers {self.sickness} damage from sickness")
-
-    def take_damage(self,
-                    damage: int
-                    ) -> None:
-        # Reduce HP, never go below 0
-        self.hp = max(0, self.hp - damage)
-        if self.hp <= 0:
-            print(f"{self.name} has been put to sleep")
-        else:
-            print(f"{self.name} has taken {damage} damage and has {self.hp} health remaining!")
-
-
-
-class Enemy(Character):
-    def __init__(self,
-                 name: str,
-                 group_size: int,
-                 hp_member: int,
-                 agility: int,
-                 min_damage: int,
-                 max_damage: int,
-                 crit_ch: int = 0,
-                 sickness: int = 0,
-                 inflict_min_sickness: int = 0,
-                 inflict_max_sickness: int = 0
-                 ) -> None:
-        """
-        A subclass of Character
-        An Enemy can represent a group of enemies
-        """
-        self.original_group_size = group_size       # store how many enemies the group started with
-        self.current_group_size = group_size        # track how mny enemies are left
-        self.hp_member = hp_member                  # HP of a single enemy
-        self.sickness_member = sickness             # sickness per individual enemy
-        total_hp = hp_member * group_size           
-        total_sickness = sickness * group_size
-
-        # Call parent class to initialise common attributes
-        super().__init__(name = name, 
-                         hp = total_hp,
-                         agility = agility,
-                         min_damage = min_damage,
-                         max_damage = max_damage,
-                         crit_ch = crit_ch,
-                         sickness = total_sickness,
-                         inflict_min_sickness = inflict_min_sickness,
-                         inflict_max_sickness = inflict_max_sickness
-                         )
-
-    def update_group_size(self):
-        # Recalculate group size after taking damage
-        if self.hp <=0:
-            self.current_group_size = 0
-        else:
-            # Divide remaining HP by hp per enemy to find out how many members are left in the group
-            self.current_group_size = max(1, self.hp // self.hp_member)
-
-    def roll_damage(self) -> int:
-        # The attacks of each remaining member are summed together
-        return sum(random.randint(self.min_damage, self.max_damage)
-                   for _ in range(self.current_group_size) 
-                   )
-    
-    def roll_inflict_sickness(self) -> int:
-        # Each remaining member can inflict sickness
-        return sum(random.randint(self.inflict_min_sickness, self.inflict_max_sickness)
-                   for _ in range(self.current_group_size) 
-                   )
-    
-    def attack(self,
-               target
-               ) -> None:
-        # Overrides basic attack method to include group members
-        damage = self.roll_damage()
-        damage = self.deal_crit(damage)
-
-        if target.evade():
-            print(f"{self.name} missed the attack!")
-            return
-        
-        if self.inflict_max_sickness > 0:
-            inflicted_sickness = self.roll_inflict_sickness()
-            target.sickness += inflicted_sickness
-            print(f"{self.name} (Group of {self.current_group_size}) inflicts {inflicted_sickness} sickness onto {target.name}!") 
-            target.apply_sickness()     
-        else:
-            print(f"{self.name} (Group of {self.current_group_size}) attacks {target.name} for {damage} damage!")
-            target.take_damage(damage)
-    
-    def take_damage(self,
-                    damage: int
-                    ) -> None:
-        self.hp = max(0, self.hp - damage)
-        self.update_group_size()        # recalculate group size
-        if self.hp <= 0:
-            print(f"{self.name} has been put to sleep")
-        else:
-            print(f"{self.name} has taken {damage} damage and has {self.current_group_size} member(s) left with a total of {self.hp} health remaining!")
-
-
-class Hero(Character):
-    def __init__(self,
-                 name: str, 
-                 sickness: int = 0,
-                 inflict_min_sickness: int = 0,
-                 inflict_max_sickness: int = 0,
-                 ):
-        """
-        A subclass of Character that handles the player
-        Extends the Character class but uses weapons and armour for stats
-        """
-        self.weapon = fists     # default starting weapon
-        self.armour = clothes   # default starting armour
-        self.defend = False     # defensive stance toggle
-        super().__init__(name = name,
-                         hp = self.armour.hp,                       # HP comes from armour
-                         agility = self.armour.agility,             # Agility comes from armour
-                         min_damage = self.weapon.min_damage,       # Damage comes from weapon
-                         max_damage = self.weapon.max_damage,
-                         crit_ch = self.weapon.crit_ch,             # Crit Chance comes from weapon
-                         sickness = sickness,
-                         inflict_min_sickness = inflict_min_sickness,
-                         inflict_max_sickness = inflict_max_sickness
-                         )
-    
-    def special_attack(self,
-                       target
-                       ) -> None:
-        # If weapon is a SpecialWeapon, player can choose attack type
-        choice = input(f"Use Basic Attack [1] Special Attack [2] with {self.weapon.name}? ").strip()
-
-        if choice == "1":
-            # Basic attack
-            if target.evade():
-                print(f"{self.name} missed the attack!")
-                return
-            else:
-                damage = self.weapon.roll_damage()
-                damage = self.deal_crit(damage)
-                print(f"{self.name} uses {self.weapon.name}'s BASIC ATTACK for {damage} damage!")
-                target.take_damage(damage)
-
-        elif choice == "2":
-            # Special attack
-            if target.evade():
-                print(f"{self.name} missed the attack!")
-                return
-            else:
-                damage = self.weapon.roll_special()
-                damage = self.deal_crit(damage)
-                print(f"{self.name} uses {self.weapon.name}'s SPECIAL ATTACK for {damage} damage!")
-                target.take_damage(damage)
-
-                if self.weapon.inflict_max_sickness > 0:
-                    # Apply sickness if weapon has a value for that attribute
-                    self.inflict_min_sickness = self.weapon.inflict_min_sickness
-                    self.inflict_max_sickness = self.weapon.inflict_max_sickness
-                    inflicted_sickness = self.roll_inflict_sickness()
-                    target.sickness += inflicted_sickness
-                    print(f"{self.name} uses {self.weapon.name}'s SPECIAL ATTACK and inflicts {inflicted_sickness} sickness onto {target.name}!") 
-                    target.apply_sickness()
-
-        else:
-            # If invalid choice, fallback to main attack function
-            print("Invalid choice. Please enter 1 to use the Basic Attack or 2 for the Special Attack")
-            self.attack(target)
-
-    def aoe_attack(self,
-                   target
-                   ) -> None:
-        # If weapon is an AOEWeapon, damage is applied per enemy in the group
-        if target.evade():
-            print(f"{self.name} missed the attack!")
-            return
-        else:
-            damage = self.weapon.roll_damage() * target.current_group_size
-            damage = self.deal_crit(damage)
-            print(f"{self.name} uses {self.weapon.name} for a total of {damage} damage to all enemies in range!")
-            target.take_damage(damage)
-
-    def attack(self, 
-               target
-               ) -> None:
-        # Overrides basic attack method
-        # Behaviour depends on weapon type
-        if isinstance(self.weapon, SpecialWeapon):
-            self.special_attack(target)     # Special weapons allow the user to choose from different attacks
-
-        elif isinstance(self.weapon, AOEWeapon):
-            self.aoe_attack(target)         # AOE weapons hits multiple enemies
-
-        else:
-            # Normal basic attack
-            if target.evade():
-                print(f"{self.name} missed the attack!")
-                return
-            else:
-                damage = self.weapon.roll_damage()
-                damage = self.deal_crit(damage)
-                print(f"{self.name} uses {self.weapon.name} for {damage} damage!")
-                target.take_damage(damage)
-
-    def take_damage(self,
-                    damage: int
-                    ) -> None:
-        # Overrides basic take_damage method
-        # If user is currently defending, incoming damage is halved
-        if self.defend:
-            damage = damage / 2
-            print(f"{self.name} defends the attack!")
-        else: 
-            damage = damage
-
-        # Apply damage armour reduction, percentage based
-        damage = int(damage * (1 - self.armour.damage_reduction))   
-
-        self.hp = max(0, self.hp - damage)
-        if self.hp <= 0:
-            print(f"{self.name} has been put to sleep")
-        else:
-            print(f"{self.name} has taken {damage} damage and has {self.hp} health remaining!")
-
-
-# ==============================
-# Enemy definitions
-# ==============================
-mictlantecuhtli = Enemy(name = "Mictlantecuhtli",
-                   group_size = 1,
-                   hp_member = 50000,
-                   agility = 10,
-                   min_damage = 500,
-                   max_damage = 700,
-                   crit_ch = 25
-                   )
-
-trex = Enemy(name = "T-rex",
-             group_size = 1,
-             hp_member = 20000,
-             agility = 5,
-             min_damage = 300,
-             max_damage = 300,
-             crit_ch = 10
-             )
-
-tribe = Enemy(name = "Tribe",
-              group_size = random.randint(10, 50),
-              hp_member = 100,
-              agility = 10,
-              min_damage = 5,
-              max_damage = 10,
-              crit_ch = 10
-              )
-
-spack = Enemy(name = "Pack of Saber-toothed Tigers",
-              group_size = random.randint(2, 7),
-              hp_member = 200,
-              agility = 20,
-              min_damage = 50,
-              max_damage = 100,
-              crit_ch = 50
-              )
-
-mammoth = Enemy(name = "Wooly Mammoth",
-                group_size = 1,
-                hp_member = 20000,
-                agility = 1,
-                min_damage = 50,
-                max_damage = 100
-                )
-
-titanoboa = Enemy(name = "Titanoboa",
-                  group_size = 1,
-                  hp_member = 3000,
-                  agility = 25,
-                  min_damage = 50,
-                  max_damage = 100,
-                  crit_ch = 20,
-                  inflict_min_sickness = 20,
-                  inflict_max_sickness = 50
-                  )
-
-chieftain = Enemy(name = "Chieftain",
-                  group_size = 1,
-                  hp_member = 3000,
-                  agility = 1,
-                  min_damage = 300,
-                  max_damage = 700,
-                  crit_ch = 20
-                  )
-
-crocodile = Enemy(name = "Crocodile",
-                  group_size = 1,
-                  hp_member = 1000,
-                  agility = 0,
-                  min_damage = 100,
-                  max_damage = 200,
-                  crit_ch = 20
-                  )
-
-cave_bear = Enemy(name = "Giant Cave Bear",
-                  group_size = random.randint(1, 2),
-                  hp_member = 1500,
-                  agility = 5,
-                  min_damage = 80,
-                  max_damage = 150,
-                  crit_ch = 20
-                  )
-
-megatherium = Enemy(name = "Giant Ground Sloth",
-                    group_size = 1,
-                    hp_member = 2000,
-                    agility = 0,
-                    min_damage = 20,
-                    max_damage = 80
-                    )
-
-terror_bird = Enemy(name = "Terror Bird",
-                    group_size = 1,
-                    hp_member = 500,
-                    agility = 80,
-                    min_damage = 100,
-                    max_damage = 200,
-                    crit_ch = 25
-                    )
-
-smilodon = Enemy(name = "Saber-toothed tiger",
-                 group_size = 1,
-                 hp_member = 200,
-                 agility = 20,
-                 min_damage = 50,
-                 max_damage = 100,
-                 crit_ch = 50
-                 )
-
-snakes = Enemy(name = "Line of Snakes",
-              group_size = random.randint(4, 7),
-              hp_member = 5,
-              agility = 50,
-              min_damage = 2,
-              max_damage = 5,
-              crit_ch = 20,
-              inflict_min_sickness = 5,
-              inflict_max_sickness = 10
-              )
-
-megaloceros = Enemy(name = "Megaloceros",
-                    group_size = 1,
-                    hp_member = 300,
-                    agility = 10,
-                    min_damage = 5,
-                    max_damage = 10
-                    )
-
-wolves = Enemy(name = "Pack of Wolves",
-               group_size = random.randint(3, 5),
-               hp_member = 20,
-               agility = 10,
-               min_damage = 5,
-               max_damage = 15
-               )
-
-wolf = Enemy(name = "Wolf",
-             group_size = 1,
-             hp_member = 20,
-             agility = 10,
-             min_damage = 5,
-             max_damage = 15
-             )
-
-# ==============================
-# Player definition
-# ==============================
-player = Hero(name = "Player")
+import random
+from array import array
+from weapons import *
+from armour import *
+from effects import *
+import world
+import tables
+import realtime
+
+# ==============================
+# Classes
+# ==============================
+class Character:
+    """
+    Base class for any "combatant" (player or enemy)
+    This class handles combat values and logic
+    A Character has:
+        - a name (str)
+        - hp (integer)
+        - agility (integer)
+        - minimum and maximum damage (integers)
+        - critical hit chance (integer, optional, defaults to 0)
+        - sickness (current poison damage per turn, integer, defaults to 0)
+        - inflict minimum and maximum sickness (sickness that it can give, integer, optional, defaults to 0)
+        - bleeding (bleed damage its hits open on the target, integer, optional, defaults to 0)
+        - stun chance (chance in % that its hits stun the target, integer, optional, defaults to 0)
+    """
+    def __init__(self,
+                 name: str,
+                 hp: int,
+                 agility: int,
+                 min_damage: int,
+                 max_damage: int,
+                 crit_ch: int = 0,
+                 sickness: int = 0,
+                 inflict_min_sickness: int = 0,
+                 inflict_max_sickness: int = 0,
+                 bleed: int = 0,
+                 stun_ch: int = 0
+                 ) -> None:
+        self.name = name
+        self.hp = hp
+        self.hp_max = hp
+        self.agility = agility
+        self.min_damage = min_damage
+        self.max_damage = max_damage
+        self.crit_ch = crit_ch
+        self.sickness = 0
+        self.inflict_min_sickness = inflict_min_sickness
+        self.inflict_max_sickness = inflict_max_sickness
+        self.bleed = bleed
+        self.stun_ch = stun_ch
+        self.effects = {}           # active status effects by name
+        self.effect_queue = None    # the EffectQueue of the fight this character is in, if any
+
+        # Starting sickness is applied as poison
+        if sickness > 0:
+            self.afflict(Poison(sickness))
+
+    def roll_damage(self) -> int:
+        # Returns a random damage value between min_damage and max_damage
+        return random.randint(self.min_damage, self.max_damage)
+    
+    def roll_inflict_sickness(self) -> int:
+        # Returns a random sickness value between inflict_min_sickness and inflict_max_sickness
+        return random.randint(self.inflict_min_sickness, self.inflict_max_sickness)
+
+    def evade(self) -> bool:
+        # Roll 1-100
+        # The character succeeds in evading if rolled value is under the value of its agility attribute
+        roll_evade = random.randint(1, 100)
+        return roll_evade <= self.agility
+    
+    def crit(self) -> bool:
+        # Roll 1-100
+        # The character deals a critical hit if rolled value is under the value of its crit_ch attribute
+        roll_crit = random.randint(1, 100)
+        return roll_crit <= self.crit_ch
+    
+    def deal_crit(self, 
+                  damage: int
+                  ) -> bool:
+        # Doubles damage if crit is triggered
+        if self.crit():
+            print("CRITICAL HIT")
+            return damage * 2
+        return damage
+
+    def attack(self, 
+               target
+               ) -> None:
+        # Handles basic attack sequence
+
+        if target.evade():      # check if target dodges the attack
+            print(f"{self.name} missed the attack!")
+            return
+        
+        damage = self.roll_damage()         # roll base damage
+        damage = self.deal_crit(damage)     # apply crit modifier if crit triggers
+
+        # If this character can inflict sickness
+        # Add inflict sickness value to target's sickness attribute
+        if self.inflict_max_sickness > 0:
+            inflicted_sickness = self.roll_inflict_sickness()
+            target.afflict(Poison(inflicted_sickness))     # sickness damage is dealt at the start of each turn
+            print(f"{self.name} has inflicted {inflicted_sickness} sickness onto {target.name}!") 
+        else:
+            # Otherwise, deal raw damage
+            target.take_damage(damage)
+            print(f"{self.name} inflicts {target.name} for {damage} damage!")
+        self.wound(target)
+
+    def wound(self,
+              target,
+              stun_turns: int = 1
+              ) -> None:
+        # Called after an attack lands: opens a bleeding wound and may stun the target
+        # The stun lasts stun_turns of the fight, effects advance at the end of the enemies' turn
+        # so a stun the hero lands covers the enemies' turn, while one landed on the hero needs 2 turns to cover the hero's next turn
+        if target.hp <= 0:
+            return
+        if self.bleed > 0:
+            target.afflict(Bleed(self.bleed))
+        if self.stun_ch > 0 and random.randint(1, 100) <= self.stun_ch:
+            target.afflict(Stun(stun_turns))
+
+    def afflict(self,
+                effect
+                ) -> None:
+        # Places a status effect on this character
+        # If an effect with the same name is already active, its stacking rule decides how they combine
+        active = self.effects.get(effect.name)
+        if active is None:
+            self.effects[effect.name] = effect
+            effect.on_apply(self)
+            active = effect
+        else:
+            if self.effect_queue and not active.ticks:
+                active.duration = active.due - self.effect_queue.turn   # only the turns left count towards a refresh
+            active.merge(effect, self)
+
+        # During a fight, the effect is (re)scheduled on the fight's queue
+        if self.effect_queue:
+            self.effect_queue.schedule(self, active)
+
+    def remove_effect(self,
+                      name: str
+                      ) -> None:
+        # Removes an active status effect and undoes anything it changed
+        effect = self.effects.pop(name, None)
+        if effect:
+            effect.due = None
+            effect.on_expire(self)
+
+    def clear_effects(self) -> None:
+        # Removes all active status effects
+        for name in list(self.effects):
+            self.remove_effect(name)
+
+    @property
+    def stunned(self) -> bool:
+        # A stunned character skips its turn
+        return "Stun" in self.effects
+
+    def take_damage(self,
+                    damage: int
+                    ) -> None:
+        # Reduce HP, never go below 0
+        self.hp = max(0, self.hp - damage)
+        if self.hp <= 0:
+            print(f"{self.name} has been put to sleep")
+        else:
+            print(f"{self.name} has taken {damage} damage and has {self.hp} health remaining!")
+
+
+
+class Enemy(Character):
+    def __init__(self,
+                 name: str,
+                 group_size: int,
+                 hp_member: int,
+                 agility: int,
+                 min_damage: int,
+                 max_damage: int,
+                 crit_ch: int = 0,
+                 sickness: int = 0,
+                 inflict_min_sickness: int = 0,
+                 inflict_max_sickness: int = 0,
+                 bleed: int = 0,
+                 stun_ch: int = 0,
+                 per_member: bool = False
+                 ) -> None:
+        """
+        A subclass of Character
+        An Enemy can represent a group of enemies
+        By default the group shares one pool of HP
+        With per_member, the HP of every member is tracked on its own (see hit_members)
+        group_size can be a (smallest, largest) range, the size is then rolled randomly, and rolled again for every new game
+        """
+        self.name = name
+        self.hp_member = hp_member                  # HP of a single enemy
+        self.agility = agility
+        self.min_damage = min_damage
+        self.max_damage = max_damage
+        self.crit_ch = crit_ch
+        self.sickness_member = sickness             # sickness per individual enemy
+        self.inflict_min_sickness = inflict_min_sickness
+        self.inflict_max_sickness = inflict_max_sickness
+        self.bleed = bleed
+        self.stun_ch = stun_ch
+        self.form(group_size, per_member)
+
+    def form(self,
+             group_size: int,
+             per_member: bool
+             ) -> None:
+        """
+        Gathers the group at full strength, from the stats every member shares
+        Enemies read from content tables (see tables.py) have their stats already and only go through this
+        """
+        self.group_range = None
+        if isinstance(group_size, tuple):
+            self.group_range = group_size
+            group_size = random.randint(*group_size)
+            world.randomized.append(self)
+        self.original_group_size = group_size       # store how many enemies the group started with
+        self.current_group_size = group_size        # track how mny enemies are left
+        self.hp = self.hp_max = self.hp_member * group_size
+        self.sickness = 0
+
+        # Per member HP, kept in a compact array sorted from weakest to strongest member
+        # Members before first_alive are asleep
+        # aoe_damage is the damage every member has taken from AOE attacks, it is subtracted when reading a member's HP
+        # so an AOE hit doesn't need to touch every member
+        self.members = array("l", [self.hp_member] * group_size) if per_member else None
+        self.first_alive = 0
+        self.aoe_damage = 0
+
+        self.effects = {}           # active status effects by name
+        self.effect_queue = None    # the EffectQueue of the fight this character is in, if any
+        if self.sickness_member > 0:
+            self.afflict(Poison(self.sickness_member * group_size))
+
+    def update_group_size(self):
+        # Recalculate group size after taking damage
+        if self.hp <=0:
+            self.current_group_size = 0
+        elif self.members is not None:
+            # Every member from first_alive onwards is still standing
+            self.current_group_size = len(self.members) - self.first_alive
+        else:
+            # Divide remaining HP by hp per enemy to find out how many members are left in the group
+            self.current_group_size = max(1, self.hp // self.hp_member)
+
+    def reset(self) -> None:
+        # Restores the group to full strength, as it was when it was created
+        self.current_group_size = self.original_group_size
+        self.hp = self.hp_max
+        if self.members is not None:
+            for i in range(len(self.members)):
+                self.members[i] = self.hp_member
+            self.first_alive = 0
+            self.aoe_damage = 0
+        self.clear_effects()
+        if self.sickness_member > 0:
+            self.afflict(Poison(self.sickness_member * self.original_group_size))
+
+    def restore(self) -> None:
+        # Called by world.reset() for a new game
+        self.reset()
+
+    def state(self) -> tuple:
+        # What a game changes about the group (see world.stash)
+        return (self.original_group_size, self.current_group_size, self.hp, self.hp_max, self.members,
+                self.first_alive, self.aoe_damage, self.sickness, self.effects, self.effect_queue)
+
+    def set_state(self,
+                  state: tuple
+                  ) -> None:
+        (self.original_group_size, self.current_group_size, self.hp, self.hp_max, self.members,
+         self.first_alive, self.aoe_damage, self.sickness, self.effects, self.effect_queue) = state
+
+    def start_over(self) -> None:
+        # Back to full strength with parts of its own, the game that stashed it keeps the ones it had (see world.stash)
+        self.effects = {}
+        self.effect_queue = None
+        if self.members is not None:
+            self.members = array("l", self.members)
+        self.reset()
+
+    def reroll(self,
+               size: int = None
+               ) -> None:
+        # Rolls a new size for a randomly sized group (unless a size is given) and brings it to full strength
+        if size is None:
+            size = random.randint(*self.group_range)
+        self.original_group_size = size
+        self.hp_max = self.hp_member * size
+        if self.members is not None:
+            self.members = array("l", [self.hp_member]) * size
+        self.reset()
+
+    def hit_members(self,
+                    damage: int
+                    ) -> int:
+        # Single target damage for per member groups
+        # The weakest member is hit first, any damage left over after it falls carries on to the next one
+        # Hitting the weakest member keeps the array sorted
+        # Returns the damage actually dealt
+        members = self.members
+        dealt = 0
+        while damage > 0 and self.first_alive < len(members):
+            remaining = members[self.first_alive] - self.aoe_damage
+            if damage >= remaining:
+                damage -= remaining
+                dealt += remaining
+                self.first_alive += 1       # this member is asleep
+            else:
+                members[self.first_alive] -= damage
+                dealt += damage
+                damage = 0
+        self.hp -= dealt
+        return dealt
+
+    def hit_all_members(self,
+                        damage: int
+                        ) -> int:
+        # AOE damage for per member groups, every living member takes the same damage
+        # Only the members that fall are touched, the rest just share the raised aoe_damage
+        # Returns the damage actually dealt
+        members = self.members
+        dealt = 0
+        previous = self.aoe_damage
+        self.aoe_damage += damage
+
+        # The array is sorted, so the members that fall are the ones at the front
+        while self.first_alive < len(members) and members[self.first_alive] <= self.aoe_damage:
+            dealt += members[self.first_alive] - previous
+            self.first_alive += 1
+
+        dealt += damage * (len(members) - self.first_alive)
+        self.hp -= dealt
+        return dealt
+
+    def roll_damage(self) -> int:
+        # The attacks of each remaining member are summed together
+        return sum(random.randint(self.min_damage, self.max_damage)
+                   for _ in range(self.current_group_size) 
+                   )
+    
+    def roll_inflict_sickness(self) -> int:
+        # Each remaining member can inflict sickness
+        return sum(random.randint(self.inflict_min_sickness, self.inflict_max_sickness)
+                   for _ in range(self.current_group_size) 
+                   )
+    
+    def attack(self,
+               target
+               ) -> None:
+        # Overrides basic attack method to include group members
+        damage = self.roll_damage()
+        damage = self.deal_crit(damage)
+
+        if target.evade():
+            print(f"{self.name} missed the attack!")
+            return
+        
+        if self.inflict_max_sickness > 0:
+            inflicted_sickness = self.roll_inflict_sickness()
+            target.afflict(Poison(inflicted_sickness))
+            print(f"{self.name} (Group of {self.current_group_size}) inflicts {inflicted_sickness} sickness onto {target.name}!") 
+        else:
+            print(f"{self.name} (Group of {self.current_group_size}) attacks {target.name} for {damage} damage!")
+            target.take_damage(damage)
+        self.wound(target, stun_turns = 2)
+    
+    def take_damage(self,
+                    damage: int
+                    ) -> None:
+        # Damage is reported to the world, so a new game knows to restore this enemy
+        world.mark(self)
+        hp = self.hp
+        if self.members is not None:
+            self.hit_members(damage)
+        else:
+            self.hp = max(0, self.hp - damage)
+        self.report_damage(hp - self.hp)
+
+    def take_aoe_damage(self,
+                        damage: int
+                        ) -> None:
+        # Deals damage to every remaining member of the group
+        world.mark(self)
+        hp = self.hp
+        if self.members is not None:
+            self.hit_all_members(damage)
+        else:
+            self.hp = max(0, self.hp - damage * self.current_group_size)
+        self.report_damage(hp - self.hp)
+
+    def report_damage(self,
+                      damage: int
+                      ) -> None:
+        # damage = the HP the hit actually took off, not what it was rolled for
+        self.update_group_size()        # recalculate group size
+        if self.hp <= 0:
+            print(f"{self.name} has been put to sleep")
+        else:
+            print(f"{self.name} has taken {damage} damage and has {self.current_group_size} member(s) left with a total of {self.hp} health remaining!")
+
+
+class Stats:
+    """
+    The hero's combat values, worked out from the equipped weapon and armour
+    Worked out again only when the gear or a stat bonus changes, so a fight reads them without going through the gear
+    Stats have:
+        - minimum and maximum damage (integers)
+        - minimum and maximum special damage and sickness (integers, 0 without a special weapon)
+        - critical hit chance (integer)
+        - bleeding and stun chance (integers)
+        - agility (integer)
+        - damage reduction and the share of damage taken after it (integers, in basis points)
+        - attack (the Hero method used to attack with the weapon)
+    """
+    __slots__ = ("min_damage", "max_damage", "min_special", "max_special", "inflict_min_sickness", "inflict_max_sickness",
+                 "crit_ch", "bleed", "stun_ch", "agility", "damage_reduction", "damage_taken", "attack")
+
+    def __init__(self,
+                 weapon: Weapon,
+                 armour: Armour,
+                 bonuses: dict
+                 ) -> None:
+        self.min_damage = weapon.min_damage
+        self.max_damage = weapon.max_damage
+        self.crit_ch = weapon.crit_ch
+        self.bleed = weapon.bleed
+        self.stun_ch = weapon.stun_ch
+        self.agility = armour.agility
+        self.damage_reduction = armour.damage_reduction
+
+        if isinstance(weapon, SpecialWeapon):
+            self.min_special = weapon.min_special
+            self.max_special = weapon.max_special
+            self.inflict_min_sickness = weapon.inflict_min_sickness
+            self.inflict_max_sickness = weapon.inflict_max_sickness
+            self.attack = Hero.special_attack       # Special weapons allow the user to choose from different attacks
+        else:
+            self.min_special = self.max_special = 0
+            self.inflict_min_sickness = self.inflict_max_sickness = 0
+            self.attack = Hero.aoe_attack if isinstance(weapon, AOEWeapon) else Hero.basic_attack
+
+        # Bonuses from effects (e.g. a Buff) come on top of the gear
+        for stat, bonus in bonuses.items():
+            setattr(self, stat, getattr(self, stat) + bonus)
+        self.damage_taken = BASIS_POINTS - self.damage_reduction
+
+
+def derived(stat):
+    """
+    A Hero attribute read from its Stats
+    Changing it (e.g. a Buff raising agility) is kept as a bonus on top of the gear
+    """
+    def get(self):
+        return getattr(self.stats, stat)
+
+    def set(self, value):
+        bonus = self.bonuses.get(stat, 0) + value - getattr(self.stats, stat)
+        if bonus:
+            self.bonuses[stat] = bonus
+        else:
+            self.bonuses.pop(stat, None)
+        self._stats = None
+
+    return property(get, set)
+
+
+def equipped(slot):
+    """
+    A Hero attribute holding a piece of gear
+    Equipping another piece means the stats have to be worked out again
+    """
+    attribute = "_" + slot
+
+    def get(self):
+        return getattr(self, attribute)
+
+    def set(self, value):
+        setattr(self, attribute, value)
+        self._stats = None
+
+    return property(get, set)
+
+
+class Hero(Character):
+    def __init__(self,
+                 name: str, 
+                 sickness: int = 0,
+                 inflict_min_sickness: int = 0,
+                 inflict_max_sickness: int = 0,
+                 ):
+        """
+        A subclass of Character that handles the player
+        Extends the Character class but uses weapons and armour for stats
+        Damage, crit chance, agility and damage reduction come from the Stats of the equipped gear
+        """
+        self.bonuses = {}       # stat -> bonus from effects
+        self._stats = None      # worked out on first use, see stats
+        self.weapon = fists     # default starting weapon
+        self.armour = clothes   # default starting armour
+        self.defend = False     # defensive stance toggle
+        super().__init__(name = name,
+                         hp = self.armour.hp,                       # HP comes from armour
+                         agility = self.armour.agility,             # Agility comes from armour
+                         min_damage = self.weapon.min_damage,       # Damage comes from weapon
+                         max_damage = self.weapon.max_damage,
+                         crit_ch = self.weapon.crit_ch,             # Crit Chance comes from weapon
+                         sickness = sickness,
+                         inflict_min_sickness = inflict_min_sickness,
+                         inflict_max_sickness = inflict_max_sickness
+                         )
+
+    weapon = equipped("weapon")
+    armour = equipped("armour")
+
+    @property
+    def stats(self) -> Stats:
+        stats = self._stats
+        if stats is None:
+            stats = self._stats = Stats(self.weapon, self.armour, self.bonuses)
+        return stats
+
+    min_damage = derived("min_damage")
+    max_damage = derived("max_damage")
+    crit_ch = derived("crit_ch")
+    bleed = derived("bleed")
+    stun_ch = derived("stun_ch")
+    agility = derived("agility")
+    damage_reduction = derived("damage_reduction")
+
+    def reset(self) -> None:
+        # Puts the hero back the way a new game starts: default weapon and armour, full HP and no effects
+        self.clear_effects()
+        self.bonuses.clear()
+        self.weapon = fists
+        self.armour = clothes
+        self.defend = False
+        self.hp = self.hp_max = self.armour.hp
+        self.inflict_min_sickness = 0
+        self.inflict_max_sickness = 0
+
+    def roll_damage(self) -> int:
+        # Rolls the equipped weapon's damage
+        stats = self.stats
+        return random.randint(stats.min_damage, stats.max_damage)
+
+    def special_attack(self,
+                       target
+                       ) -> None:
+        # If weapon is a SpecialWeapon, player can choose attack type
+        realtime.time_next_input()
+        choice = input(f"Use Basic Attack [1] Special Attack [2] with {self.weapon.name}? ").strip()
+
+        if choice == "1":
+            # Basic attack
+            if target.evade():
+                print(f"{self.name} missed the attack!")
+                return
+            else:
+                damage = self.roll_damage()
+                damage = self.deal_crit(damage)
+                print(f"{self.name} uses {self.weapon.name}'s BASIC ATTACK for {damage} damage!")
+                target.take_damage(damage)
+                self.wound(target)
+
+        elif choice == "2":
+            # Special attack
+            if target.evade():
+                print(f"{self.name} missed the attack!")
+                return
+            else:
+                stats = self.stats
+                damage = random.randint(stats.min_special, stats.max_special)
+                damage = self.deal_crit(damage)
+                print(f"{self.name} uses {self.weapon.name}'s SPECIAL ATTACK for {damage} damage!")
+                target.take_damage(damage)
+                self.wound(target)
+
+                if stats.inflict_max_sickness > 0:
+                    # Apply sickness if weapon has a value for that attribute
+                    self.inflict_min_sickness = stats.inflict_min_sickness
+                    self.inflict_max_sickness = stats.inflict_max_sickness
+                    inflicted_sickness = self.roll_inflict_sickness()
+                    target.afflict(Poison(inflicted_sickness))
+                    print(f"{self.name} uses {self.weapon.name}'s SPECIAL ATTACK and inflicts {inflicted_sickness} sickness onto {target.name}!") 
+
+        else:
+            # If invalid choice, fallback to main attack function
+            print("Invalid choice. Please enter 1 to use the Basic Attack or 2 for the Special Attack")
+            self.attack(target)
+
+    def aoe_attack(self,
+                   target
+                   ) -> None:
+        # If weapon is an AOEWeapon, damage is applied per enemy in the group
+        if target.evade():
+            print(f"{self.name} missed the attack!")
+            return
+        else:
+            damage = self.roll_damage()
+            damage = self.deal_crit(damage)
+            print(f"{self.name} uses {self.weapon.name} for {damage} damage to each of the {target.current_group_size} enemies in range!")
+            target.take_aoe_damage(damage)
+            self.wound(target)
+
+    def basic_attack(self,
+                     target
+                     ) -> None:
+        # Normal basic attack
+        if target.evade():
+            print(f"{self.name} missed the attack!")
+            return
+        else:
+            damage = self.roll_damage()
+            damage = self.deal_crit(damage)
+            print(f"{self.name} uses {self.weapon.name} for {damage} damage!")
+            target.take_damage(damage)
+            self.wound(target)
+
+    def attack(self, 
+               target
+               ) -> None:
+        # Overrides basic attack method
+        # Behaviour depends on weapon type, the method to use is kept in the stats
+        self.stats.attack(self, target)
+
+    def take_damage(self,
+                    damage: int
+                    ) -> None:
+        # Overrides basic take_damage method
+        # If user is currently defending, incoming damage is halved
+        # Halving and the armour's damage reduction are applied in a single integer step, rounding down
+        if self.defend:
+            damage = damage * self.stats.damage_taken // (BASIS_POINTS * 2)
+            print(f"{self.name} defends the attack!")
+        else: 
+            damage = damage * self.stats.damage_taken // BASIS_POINTS
+
+        self.hp = max(0, self.hp - damage)
+        if self.hp <= 0:
+            print(f"{self.name} has been put to sleep")
+        else:
+            print(f"{self.name} has taken {damage} damage and has {self.hp} health remaining!")
+
+
+# ==============================
+# Enemy definitions
+# ==============================
+# Read from content tables instead when the game plays from them (see tables.py)
+if tables.loaded:
+    globals().update(tables.loaded.enemies(Enemy))
+else:
+    mictlantecuhtli = Enemy(name = "Mictlantecuhtli",
+                       group_size = 1,
+                       hp_member = 50000,
+                       agility = 10,
+                       min_damage = 500,
+                       max_damage = 700,
+                       crit_ch = 25
+                       )
+
+    trex = Enemy(name = "T-rex",
+                 group_size = 1,
+                 hp_member = 20000,
+                 agility = 5,
+                 min_damage = 300,
+                 max_damage = 300,
+                 crit_ch = 10,
+                 stun_ch = 15
+                 )
+
+    tribe = Enemy(name = "Tribe",
+                  group_size = (10, 50),
+                  hp_member = 100,
+                  agility = 10,
+                  min_damage = 5,
+                  max_damage = 10,
+                  crit_ch = 10,
+                  per_member = True
+                  )
+
+    spack = Enemy(name = "Pack of Saber-toothed Tigers",
+                  group_size = (2, 7),
+                  hp_member = 200,
+                  agility = 20,
+                  min_damage = 50,
+                  max_damage = 100,
+                  crit_ch = 50,
+                  bleed = 30,
+                  per_member = True
+                  )
+
+    mammoth = Enemy(name = "Wooly Mammoth",
+                    group_size = 1,
+                    hp_member = 20000,
+                    agility = 1,
+                    min_damage = 50,
+                    max_damage = 100,
+                    stun_ch = 20
+                    )
+
+    titanoboa = Enemy(name = "Titanoboa",
+                      group_size = 1,
+                      hp_member = 3000,
+                      agility = 25,
+                      min_damage = 50,
+                      max_damage = 100,
+                      crit_ch = 20,
+                      inflict_min_sickness = 20,
+                      inflict_max_sickness = 50
+                      )
+
+    chieftain = Enemy(name = "Chieftain",
+                      group_size = 1,
+                      hp_member = 3000,
+                      agility = 1,
+                      min_damage = 300,
+                      max_damage = 700,
+                      crit_ch = 20
+                      )
+
+    crocodile = Enemy(name = "Crocodile",
+                      group_size = 1,
+                      hp_member = 1000,
+                      agility = 0,
+                      min_damage = 100,
+                      max_damage = 200,
+                      crit_ch = 20
+                      )
+
+    cave_bear = Enemy(name = "Giant Cave Bear",
+                      group_size = (1, 2),
+                      hp_member = 1500,
+                      agility = 5,
+                      min_damage = 80,
+                      max_damage = 150,
+                      crit_ch = 20
+                      )
+
+    megatherium = Enemy(name = "Giant Ground Sloth",
+                        group_size = 1,
+                        hp_member = 2000,
+                        agility = 0,
+                        min_damage = 20,
+                        max_damage = 80
+                        )
+
+    terror_bird = Enemy(name = "Terror Bird",
+                        group_size = 1,
+                        hp_member = 500,
+                        agility = 80,
+                        min_damage = 100,
+                        max_damage = 200,
+                        crit_ch = 25
+                        )
+
+    smilodon = Enemy(name = "Saber-toothed tiger",
+                     group_size = 1,
+                     hp_member = 200,
+                     agility = 20,
+                     min_damage = 50,
+                     max_damage = 100,
+                     crit_ch = 50,
+                     bleed = 30
+                     )
+
+    snakes = Enemy(name = "Line of Snakes",
+                  group_size = (4, 7),
+                  hp_member = 5,
+                  agility = 50,
+                  min_damage = 2,
+                  max_damage = 5,
+                  crit_ch = 20,
+                  inflict_min_sickness = 5,
+                  inflict_max_sickness = 10,
+                  per_member = True
+                  )
+
+    megaloceros = Enemy(name = "Megaloceros",
+                        group_size = 1,
+                        hp_member = 300,
+                        agility = 10,
+                        min_damage = 5,
+                        max_damage = 10
+                        )
+
+    wolves = Enemy(name = "Pack of Wolves",
+                   group_size = (3, 5),
+                   hp_member = 20,
+                   agility = 10,
+                   min_damage = 5,
+                   max_damage = 15,
+                   per_member = True
+                   )
+
+    wolf = Enemy(name = "Wolf",
+                 group_size = 1,
+                 hp_member = 20,
+                 agility = 10,
+                 min_damage = 5,
+                 max_damage = 15
+                 )
+
+# ==============================
+# Player definition
+# ==============================
+player = Hero(name = "Player")
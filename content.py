@@ -0,0 +1,106 @@
+import zlib
+import weapons
+import armour
+import characters
+import map
+import tables
+
+# ==============================
+# Content IDs
+# ==============================
+# Every weapon, armour, enemy and area gets a small integer ID, its position in the lists made by index()
+# Saves and other compact formats refer to content by these IDs instead of storing the objects
+# The lists follow the order the content is defined in its module
+# Content reloaded while the game runs (see hotreload.py) is numbered again, IDs are only good for one version of it
+
+
+def instances(module, kind) -> list:
+    # Every object of a kind defined in a module, in the order they were defined
+    return [value for value in vars(module).values() if isinstance(value, kind)]
+
+
+class TableAreas:
+    """
+    AREAS when the world comes from a content tables file (see tables.py)
+    Areas keep the codes they were packed with, and are only built when they are asked for
+    """
+    def __init__(self,
+                 areas: object
+                 ) -> None:
+        self.areas = areas
+
+    def __len__(self) -> int:
+        return self.areas.tables.area_count
+
+    def __getitem__(self, code):
+        if not 0 <= code < len(self):
+            raise IndexError(code)
+        return self.areas.at(code)
+
+
+class TableAreaIds:
+    """
+    area_ids when the world comes from a content tables file, answered from the tables' hash of names
+    """
+    def __init__(self,
+                 tables: object
+                 ) -> None:
+        self.tables = tables
+
+    def __getitem__(self, name) -> int:
+        code = self.tables.find(name)
+        if code < 0:
+            raise KeyError(name)
+        return code
+
+
+def index():
+    """
+    Numbers the content that is loaded
+    """
+    global WEAPONS, ARMOURS, ENEMIES, AREAS
+    global weapon_ids, armour_ids, enemy_ids, area_ids
+    global checksum
+    WEAPONS = instances(weapons, weapons.Weapon)
+    ARMOURS = instances(armour, armour.Armour)
+    ENEMIES = instances(characters, characters.Enemy)
+
+    # Lookups from object to ID
+    # Keyed by id() because the same object can appear under several names (e.g. LST in two areas)
+    weapon_ids = {id(weapon): code for code, weapon in enumerate(WEAPONS)}
+    armour_ids = {id(item): code for code, item in enumerate(ARMOURS)}
+    enemy_ids = {id(enemy): code for code, enemy in enumerate(ENEMIES)}
+
+    if isinstance(map.all_areas, map.LazyAreas):
+        AREAS = TableAreas(map.all_areas)
+        area_ids = TableAreaIds(map.all_areas.tables)
+    else:
+        AREAS = list(map.all_areas.values())
+        area_ids = {area.name: code for code, area in enumerate(AREAS)}
+
+    checksum = None    # content only changes when it is reloaded, so the fingerprint is only worked out once per version
+
+
+index()
+
+
+def fingerprint():
+    """
+    Returns a checksum of the names of all content, in ID order
+    Anything that stores IDs should store this too: if content is added, removed or reordered
+    the fingerprint changes and the stored IDs can no longer be trusted
+    """
+    global checksum
+    if checksum is None:
+        names = [item.name for group in (WEAPONS, ARMOURS, ENEMIES) for item in group]
+        if isinstance(AREAS, TableAreas):
+            names += [AREAS.areas.tables.area_name(code) for code in range(len(AREAS))]    # without building the areas
+        else:
+            names += [area.name for area in AREAS]
+        checksum = zlib.crc32("\n".join(names).encode())
+    return checksum
+
+
+# Content tables store the fingerprint of the content they were written from, tables that don't match it can't be trusted
+if tables.loaded and fingerprint() != tables.loaded.fingerprint:
+    raise ValueError("the content tables don't match the content, write them again with python tables.py")
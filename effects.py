@@ -0,0 +1,230 @@
+import heapq
+
+# ==============================
+# Classes
+# ==============================
+class StatusEffect:
+    """
+    Base class for any timed effect placed on a Character
+    A StatusEffect has:
+        - a name (string, effects with the same name are merged together)
+        - potency (integer, how strong the effect is)
+        - duration (integer, number of turns the effect lasts)
+        - a stacking rule (string)
+            - "stack": potency adds up and the duration is refreshed
+            - "refresh": the stronger potency is kept and the duration is refreshed
+            - "ignore": a new copy is ignored while one is already active
+        - ticks (bool, True if the effect does something every turn, False if it only expires)
+    """
+    name = "Effect"
+    stacking = "refresh"
+    ticks = False
+
+    def __init__(self,
+                 potency: int,
+                 duration: int
+                 ) -> None:
+        self.potency = potency
+        self.duration = duration
+        self.due = None     # turn of the effect's next scheduled event, set by the EffectQueue
+
+    def merge(self,
+              other,
+              target
+              ) -> None:
+        # Combines a newly inflicted copy of this effect into the active one
+        if self.stacking == "stack":
+            self.potency += other.potency
+        elif self.stacking == "refresh":
+            self.potency = max(self.potency, other.potency)
+        else:
+            return      # "ignore", the active effect is left untouched
+        self.duration = max(self.duration, other.duration)
+
+    def on_apply(self, target) -> None:
+        # Called once when the effect is first placed on the target
+        pass
+
+    def on_tick(self, target) -> None:
+        # Called at the start of every turn for effects that tick
+        pass
+
+    def on_expire(self, target) -> None:
+        # Called once when the effect runs out or the fight ends
+        pass
+
+
+class Poison(StatusEffect):
+    """
+    A subclass of StatusEffect that replaces the old sickness counter
+    Deals its potency as damage every turn
+    Inflicting more poison adds to the potency, but it wears off once its duration is over
+    The target's sickness attribute mirrors the current potency
+    """
+    name = "Poison"
+    stacking = "stack"
+    ticks = True
+
+    def __init__(self,
+                 potency: int,
+                 duration: int = 3
+                 ) -> None:
+        super().__init__(potency = potency,
+                         duration = duration
+                         )
+
+    def merge(self, other, target) -> None:
+        super().merge(other, target)
+        target.sickness = self.potency
+
+    def on_apply(self, target) -> None:
+        target.sickness = self.potency
+
+    def on_tick(self, target) -> None:
+        target.take_damage(self.potency)
+        print(f"{target.name} suffers {self.potency} damage from sickness")
+
+    def on_expire(self, target) -> None:
+        target.sickness = 0
+
+
+class Bleed(StatusEffect):
+    """
+    A subclass of StatusEffect for open wounds
+    Deals its potency as damage every turn, but the bleeding halves after each tick
+    A new wound only replaces the current one if it is stronger
+    """
+    name = "Bleed"
+    stacking = "refresh"
+    ticks = True
+
+    def __init__(self,
+                 potency: int,
+                 duration: int = 3
+                 ) -> None:
+        super().__init__(potency = potency,
+                         duration = duration
+                         )
+
+    def on_tick(self, target) -> None:
+        target.take_damage(self.potency)
+        print(f"{target.name} bleeds for {self.potency} damage")
+        self.potency = max(1, self.potency // 2)
+
+
+class Stun(StatusEffect):
+    """
+    A subclass of StatusEffect that makes the target skip its turns
+    Does nothing every turn, it only expires
+    Stuns do not stack, a second stun is ignored while the first is active
+    """
+    name = "Stun"
+    stacking = "ignore"
+
+    def __init__(self,
+                 duration: int = 1
+                 ) -> None:
+        super().__init__(potency = 0,
+                         duration = duration
+                         )
+
+    def on_apply(self, target) -> None:
+        print(f"{target.name} is stunned!")
+
+
+class Buff(StatusEffect):
+    """
+    A subclass of StatusEffect that temporarily raises one of the target's stats
+    stat = name of the attribute to raise (e.g. "agility", "crit_ch")
+    The bonus is removed again when the effect expires
+    A second buff of the same stat keeps the stronger bonus
+    """
+    stacking = "refresh"
+
+    def __init__(self,
+                 stat: str,
+                 potency: int,
+                 duration: int = 3
+                 ) -> None:
+        self.stat = stat
+        self.name = f"{stat.title()} Buff"
+        super().__init__(potency = potency,
+                         duration = duration
+                         )
+
+    def merge(self, other, target) -> None:
+        # Remove the old bonus before keeping the stronger one, so bonuses never add up
+        self.on_expire(target)
+        super().merge(other, target)
+        self.on_apply(target)
+
+    def on_apply(self, target) -> None:
+        setattr(target, self.stat, getattr(target, self.stat) + self.potency)
+
+    def on_expire(self, target) -> None:
+        setattr(target, self.stat, getattr(target, self.stat) - self.potency)
+
+
+class EffectQueue:
+    """
+    Schedules status effects for a single fight
+    Every effect has one entry in a heap, ordered by the turn of its next event:
+        - effects that tick are due again on the next turn
+        - effects that only expire are due on the turn they run out
+    Each turn only pops the entries that are due, so the cost of a turn depends on
+    the effects that fire, not on every effect on every character
+    Entries made stale by a refreshed or removed effect are skipped when popped
+    """
+    def __init__(self) -> None:
+        self.turn = 0
+        self.heap = []          # (due turn, order, character, effect)
+        self.order = 0          # tie breaker so effects due on the same turn fire in the order they were added
+        self.characters = []    # characters taking part in the fight
+
+    def join(self, character) -> None:
+        # Adds a character to the fight and schedules the effects it already has
+        character.effect_queue = self
+        self.characters.append(character)
+        for effect in character.effects.values():
+            self.schedule(character, effect)
+
+    def schedule(self,
+                 character,
+                 effect
+                 ) -> None:
+        # Works out the effect's next event and pushes it onto the heap
+        if effect.ticks:
+            due = self.turn + 1
+        else:
+            due = self.turn + effect.duration
+        if effect.due == due:
+            return      # already scheduled for that turn
+        effect.due = due
+        self.order += 1
+        heapq.heappush(self.heap, (due, self.order, character, effect))
+
+    def advance(self) -> None:
+        # Moves the fight on by one turn and fires every effect that is due
+        self.turn += 1
+        while self.heap and self.heap[0][0] <= self.turn:
+            due, _, character, effect = heapq.heappop(self.heap)
+
+            # Skip entries for effects that were removed or rescheduled since they were pushed
+            if character.effects.get(effect.name) is not effect or effect.due != due:
+                continue
+
+            if effect.ticks:
+                effect.on_tick(character)
+                effect.duration -= 1
+                if effect.duration > 0:
+                    self.schedule(character, effect)
+                    continue
+            character.remove_effect(effect.name)
+
+    def close(self) -> None:
+        # Ends the fight, removing all remaining effects from the characters that took part
+        for character in self.characters:
+            character.clear_effects()
+            character.effect_queue = None
+        self.heap.clear()
+        self.characters.clear()
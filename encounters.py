@@ -0,0 +1,139 @@
+import copy
+import random
+from array import array
+from characters import *
+
+# ==============================
+# Classes
+# ==============================
+class EnemyPool:
+    """
+    Holds ready made copies of one enemy (the template)
+    Spawning takes a copy out of the pool and resets it, instead of building a new Enemy through its constructor
+    Copies go back into the pool once they have been defeated, so they can be reused by the next encounter
+    An EnemyPool has:
+        - a template (Enemy)
+        - free copies (list of Enemy objects not currently in use)
+    """
+    def __init__(self,
+                 template: Enemy,
+                 size: int = 4
+                 ) -> None:
+        self.template = template
+        self.free = [self.make_copy() for _ in range(size)]     # preallocate copies up front
+
+    def make_copy(self) -> Enemy:
+        # Shallow copy of the template, the only things that can't be shared are the mutable parts
+        enemy = copy.copy(self.template)
+        enemy.effects = {}
+        enemy.effect_queue = None
+        if enemy.members is not None:
+            enemy.members = array("l", self.template.members)
+        enemy.pool = self       # so the copy knows where to go back to
+        return enemy
+
+    def acquire(self) -> Enemy:
+        # Takes a copy out of the pool (only makes a new one if the pool is empty)
+        # A randomly sized group rolls a new size every time it spawns, otherwise every copy would keep the size it was made with
+        if self.free:
+            enemy = self.free.pop()
+        else:
+            enemy = self.make_copy()
+        if enemy.group_range:
+            enemy.reroll()
+        else:
+            enemy.reset()
+        return enemy
+
+    def release(self,
+                enemy: Enemy
+                ) -> None:
+        # Puts a copy back into the pool
+        enemy.clear_effects()
+        enemy.effect_queue = None
+        self.free.append(enemy)
+
+
+class EncounterTable:
+    """
+    A weighted table of enemies that can appear when the player enters an Area
+    An EncounterTable has:
+        - a chance (integer, percent chance that anything appears at all, defaults to 100)
+        - rolls (integer, how many times the table is rolled per encounter, defaults to 1)
+        - entries (each with an enemy pool, a weight and how many of that enemy appear)
+    """
+    def __init__(self,
+                 chance: int = 100,
+                 rolls: int = 1
+                 ) -> None:
+        self.chance = chance
+        self.rolls = rolls
+        self.entries = []           # (pool, min_count, max_count)
+        self.cum_weights = []       # running total of the entries' weights, used by random.choices
+
+    def add(self,
+            template: Enemy,
+            weight: int,
+            min_count: int = 1,
+            max_count: int = 1
+            ) -> None:
+        """
+        Adds an enemy to the table
+        weight = how likely this entry is compared to the others
+        min_count and max_count = how many copies of the enemy appear when this entry is picked
+        """
+        total = self.cum_weights[-1] if self.cum_weights else 0
+        self.entries.append((get_pool(template), min_count, max_count))
+        self.cum_weights.append(total + weight)
+
+    def roll(self) -> list:
+        # Returns a list of freshly spawned enemies (empty if nothing appears)
+        enemies = []
+        if not self.entries or random.randint(1, 100) > self.chance:
+            return enemies
+        for entry in random.choices(self.entries, cum_weights = self.cum_weights, k = self.rolls):
+            pool, min_count, max_count = entry
+            for _ in range(random.randint(min_count, max_count)):
+                enemies.append(pool.acquire())
+        return enemies
+
+
+class RespawnRule:
+    """
+    How an area's item and enemy come back after being picked up or defeated (see respawn.py)
+    A RespawnRule has:
+        - a delay (integer, turns until the content comes back)
+        - jitter (integer, up to this many turns are randomly added to the delay, defaults to 0)
+        - max concurrent (integer, most respawns of this rule waiting at once, defaults to 0 for no limit)
+          content taken while the rule is full doesn't come back
+    """
+    def __init__(self,
+                 delay: int,
+                 jitter: int = 0,
+                 max_concurrent: int = 0
+                 ) -> None:
+        self.delay = delay
+        self.jitter = jitter
+        self.max_concurrent = max_concurrent
+        self.waiting = 0        # respawns of this rule scheduled and not yet due
+
+    def roll_delay(self) -> int:
+        # Returns the turns until the next respawn
+        return self.delay + random.randint(0, self.jitter)
+
+
+# ==============================
+# Pools
+# ==============================
+
+# One pool per template, shared by every table that uses it
+pools = {}
+
+
+def get_pool(template):
+    """
+    Returns the pool for an enemy template, creating it the first time it is needed
+    """
+    if template.name not in pools:
+        pools[template.name] = EnemyPool(template)
+    return pools[template.name]
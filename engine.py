@@ -0,0 +1,167 @@
+import io
+import os
+import sys
+import json
+import builtins
+import save
+import spectate
+
+# ==============================
+# Engine protocol
+# ==============================
+# python engine.py runs the game as an engine for another program (e.g. a web front end) to drive,
+# speaking newline delimited JSON on stdin and stdout instead of printing screens and asking at a console
+#
+# Every time the game asks for a line, the engine writes one response:
+#   {"prompt": "What do you want to do? ", "kind": "action",
+#    "messages": ["You go to Tall Grasslands", ...],      what the game said since the last prompt, one line each
+#    "events": [{"event": "turn", ...}, ...],             what happened in battle, see spectate.py
+#    "state": {"area": {...}, "enemies": [...], "player": {...}, "turns": 3}}
+# and then reads one request answering it:
+#   {"line": "go north"}
+# A request that can't be read is answered with {"error": "..."} and the same prompt is asked again
+# The engine exits at the end of its input
+#
+# State comes from the same values the status, enemy and player screens show, those screens aren't printed
+
+# What the front end is being asked for, by prompt
+KINDS = {
+    "What do you want to do? ": "action",
+    "Do you want to defend or attack? ": "battle",
+    "Which enemy do you want to attack? ": "target",
+    "What does the nametag say? ": "name",
+    "Are you sure that's what the nametag says? ": "confirm",
+    "Do you want to play again? ": "again",
+}
+
+output = sys.stdout     # the front end's end of the pipe, the game's own printing is collected instead
+events = []             # battle events since the last prompt
+items = {}              # id of a weapon or armour -> its description, they never change
+
+
+# ==============================
+# Reading and writing
+# ==============================
+def kind_of(prompt):
+    kind = KINDS.get(prompt)
+    if kind:
+        return kind
+    if prompt.startswith("Press enter"):
+        return "continue"
+    if prompt.startswith("Use Basic Attack"):
+        return "attack"
+    return "text"
+
+
+def take_messages():
+    # The lines printed since the last prompt, without the screens' rules and padding
+    text = sys.stdout.getvalue()
+    sys.stdout.seek(0)
+    sys.stdout.truncate()
+    return [line.strip() for line in text.splitlines() if line.strip() and line.strip("-= ")]
+
+
+def engine_input(prompt = ""):
+    """
+    Replacement for input(): writes the response for this prompt and reads the front end's answer
+    """
+    response = {"prompt": prompt, "kind": kind_of(prompt), "messages": take_messages(), "events": events[:], "state": state()}
+    events.clear()
+    while True:
+        output.write(json.dumps(response, separators = (",", ":")) + "\n")
+        output.flush()
+        line = sys.stdin.readline()
+        if not line:
+            raise EOFError()
+        try:
+            return str(json.loads(line)["line"])
+        except (ValueError, KeyError, TypeError) as error:
+            response = {"error": f"bad request: {error!r}", "prompt": prompt, "kind": response["kind"]}
+
+
+def record(message):
+    # Battle messages from spectate.Recorder, turned into JSON events
+    if message[0] == "begin":
+        player, enemies, values = message[1:]
+        events.append({"event": "begin", "player": player, "enemies": enemies, "values": spectate.group(values)})
+    elif message[0] == "turn":
+        turn, action, changes, text = message[1:]
+        events.append({"event": "turn", "turn": turn, "action": action, "changes": spectate.group(changes)})
+    else:
+        events.append({"event": "end", "result": message[1]})
+
+
+# ==============================
+# State
+# ==============================
+def describe_item(item):
+    description = items.get(id(item))
+    if description is None:
+        description = {"name": item.name, "description": item.description}
+        for stat in ("min_damage", "max_damage", "crit_ch", "min_special", "max_special",
+                     "inflict_min_sickness", "inflict_max_sickness", "bleed", "stun_ch", "hp", "agility", "damage_reduction"):
+            if hasattr(item, stat):
+                description[stat] = getattr(item, stat)
+        description["kind"] = type(item).__name__
+        items[id(item)] = description
+    return description
+
+
+def describe_enemy(enemy):
+    # As display_enemy() shows it
+    return {"name": enemy.name, "group_size": enemy.current_group_size, "hp": enemy.hp, "agility": enemy.agility,
+            "min_damage": enemy.min_damage, "max_damage": enemy.max_damage, "crit_ch": enemy.crit_ch,
+            "inflict_min_sickness": enemy.inflict_min_sickness, "inflict_max_sickness": enemy.inflict_max_sickness,
+            "bleed": enemy.bleed, "stun_ch": enemy.stun_ch, "sickness": enemy.sickness}
+
+
+def state():
+    """
+    The game as status(), display_enemy() and display_player() show it
+    """
+    area = main.current_area
+    player = main.player
+    enemies = [area.enemy] + area.enemies if area.enemy else area.enemies
+    return {
+        "area": {"name": area.name, "description": area.description, "exits": list(area.exits),
+                 "item": describe_item(area.item) if area.item else None, "complete": area.complete},
+        "enemies": [describe_enemy(enemy) for enemy in enemies if enemy.hp > 0],
+        "player": {"name": player.name, "hp": player.hp, "agility": player.agility, "sickness": player.sickness,
+                   "effects": list(player.effects),
+                   "weapon": describe_item(player.weapon), "armour": describe_item(player.armour),
+                   "weapons": [item.name for item in main.weapon_inventory],
+                   "armours": [item.name for item in main.armour_inventory]},
+        "turns": main.turns,
+    }
+
+
+def nothing(*args):
+    return 0
+
+
+def install():
+    """
+    Routes the game's input and output through the protocol
+    Done before main is imported, so input() wrappers (metrics, save) wrap this one
+    """
+    builtins.input = engine_input
+    os.system = nothing         # no console to clear
+    sys.stdout = io.StringIO()
+    save.enabled = False        # the front end decides what happens to a game, not the save file
+    spectate.send = record
+
+
+if __name__ == "__main__":
+    install()
+    import main
+
+    # The screens are described by the state instead
+    main.status = main.display_enemy = main.display_player = main.display_weapons = main.display_armour = nothing
+    try:
+        while True:
+            main.play()
+            if input("Do you want to play again? ").lower().strip() != "yes":
+                break
+            main.new_game()
+    except EOFError:
+        pass
@@ -0,0 +1,82 @@
+from weapons import *
+from armour import *
+from effects import Poison
+import hotreload
+
+# ==============================
+# Gear scoring
+# ==============================
+# Works out which weapon and armour give the player the best odds against an enemy
+# A fight is won in (enemy HP / damage dealt per turn) turns and lost in (player HP / damage taken per turn) turns,
+# so the odds are (turns the player lasts) / (turns needed to win)
+# The weapon only affects the damage dealt and the armour only affects the damage taken and the player's HP,
+# which means the best pair is simply the best weapon together with the best armour:
+# every item is scored once against the enemy instead of trying every combination
+#
+# Scores are kept per (item, enemy, enemy group size), the only things they depend on
+
+# Poison deals its potency on every turn it lasts
+POISON_TURNS = Poison(0).duration
+
+weapon_scores = {}      # (weapon, enemy, group size) -> damage dealt per turn
+armour_scores = {}      # (armour, enemy, group size) -> turns the player lasts
+hotreload.caches += [weapon_scores, armour_scores]      # scores of the old content are no good after a reload
+
+
+def hit_chance(agility):
+    # Chance that an attack isn't evaded by a target with this agility
+    return max(0, 100 - agility) / 100
+
+
+def damage_per_turn(weapon, enemy):
+    """
+    Expected damage the player deals to an enemy each turn with a weapon
+    Accounts for the enemy evading, critical hits, the better of a special weapon's two attacks and its poison,
+    AOE weapons hitting every member of the group and the bleeding a hit opens
+    Bleeding halves between hits, but every hit that lands opens the wound again, so it counts for its potency every turn
+    """
+    key = (weapon, enemy, enemy.current_group_size)
+    score = weapon_scores.get(key)
+    if score is None:
+        damage = (weapon.min_damage + weapon.max_damage) / 2
+        if isinstance(weapon, SpecialWeapon):
+            special = (weapon.min_special + weapon.max_special) / 2
+            special += (weapon.inflict_min_sickness + weapon.inflict_max_sickness) / 2 * POISON_TURNS
+            damage = max(damage, special)
+        elif isinstance(weapon, AOEWeapon):
+            damage *= enemy.current_group_size
+        score = hit_chance(enemy.agility) * ((1 + weapon.crit_ch / 100) * damage + weapon.bleed)
+        weapon_scores[key] = score
+    return score
+
+
+def turns_survived(item, enemy):
+    """
+    Expected number of turns the player lasts against an enemy wearing a piece of armour
+    Every member of the group attacks, attacks can be evaded with the armour's agility
+    and the armour's damage reduction applies to damage, poison and bleeding alike
+    """
+    key = (item, enemy, enemy.current_group_size)
+    score = armour_scores.get(key)
+    if score is None:
+        if enemy.inflict_max_sickness > 0:
+            damage = (enemy.inflict_min_sickness + enemy.inflict_max_sickness) / 2 * POISON_TURNS
+        else:
+            damage = (enemy.min_damage + enemy.max_damage) / 2 * (1 + enemy.crit_ch / 100)
+        damage = enemy.current_group_size * damage + enemy.bleed
+        taken = hit_chance(item.agility) * damage * (BASIS_POINTS - item.damage_reduction) / BASIS_POINTS
+        score = item.hp / taken if taken > 0 else float("inf")
+        armour_scores[key] = score
+    return score
+
+
+def best_gear(weapons, armours, enemy):
+    """
+    Picks the weapon and armour with the best odds against an enemy
+    Returns (weapon, armour, turns needed to win, turns the player lasts)
+    """
+    weapon = max(weapons, key = lambda weapon: damage_per_turn(weapon, enemy))
+    item = max(armours, key = lambda item: turns_survived(item, enemy))
+    dealt = damage_per_turn(weapon, enemy)
+    turns_to_win = enemy.hp / dealt if dealt > 0 else float("inf")
+    return weapon, item, turns_to_win, turns_survived(item, enemy)
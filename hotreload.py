@@ -0,0 +1,465 @@
+import gc
+import sys
+import time
+import types
+import random
+import importlib.util
+from collections import OrderedDict
+import tables
+import content
+import world
+import save
+import respawn
+import shared
+import weapons
+import armour
+import characters
+import map
+
+# ==============================
+# Hot reload
+# ==============================
+# Weapons, armour, enemies and areas can be read from disk again while the game runs (e.g. by a server, see server.py)
+# A reload happens in two steps:
+#   load()          runs the content modules again, off to the side, and works out what changed
+#                   the new objects are moved onto the classes the game is already using: only content is reloaded,
+#                   changes to code (classes and functions) still need a restart
+#                   this is the slow part, the game keeps its old content until the swap
+#   Reload.swap()   puts the new content in place of the old in one go, renumbers it (see content.py)
+#                   and moves the game's references over to it by ID, see translate()
+# Nothing is played while either runs (a server's shard loads once for all of its sessions, see server.py),
+# so the reload's pause is the time taken by both
+#
+# Content read from content tables (see tables.py) isn't reloaded: running the modules again would only read
+# the same tables, new tables need a restart
+#
+# Snapshots taken before a reload (a hibernated session, or one on its way from another shard) are brought up to date
+# with upgrade(), the last HISTORY versions of the content are kept around for that
+
+# The content modules, in the order they import each other
+RELOADED = ("weapons", "armour", "characters", "encounters", "map")
+
+HISTORY = 8
+
+history = OrderedDict()     # content fingerprint -> Version, for every version of the content reloaded away from
+caches = []                 # dictionaries keyed by content (e.g. gear scores), emptied whenever content is reloaded
+
+
+class ReloadError(Exception):
+    """
+    Raised when content can't be reloaded, the game keeps the content it has
+    """
+
+
+# ==============================
+# Classes
+# ==============================
+class Version:
+    """
+    One version of the content, as numbered by content.py
+    Holds on to the objects, so IDs from that version can still be read after it has been swapped out
+    """
+    def __init__(self) -> None:
+        self.fingerprint = content.fingerprint()
+        self.weapons = content.WEAPONS
+        self.armours = content.ARMOURS
+        self.enemies = content.ENEMIES
+        self.areas = content.AREAS
+        self.weapon_ids = content.weapon_ids
+        self.armour_ids = content.armour_ids
+        self.enemy_ids = content.enemy_ids
+        self.area_ids = content.area_ids
+        self.randomized = list(world.randomized)
+
+    def area_name(self, code) -> str:
+        if isinstance(self.areas, content.TableAreas):
+            return self.areas.areas.tables.area_name(code)     # without building the area
+        return self.areas[code].name
+
+    def area_record(self, code):
+        if isinstance(self.areas, content.TableAreas):
+            return record(self.areas.areas.tables.area(code))
+        return record(self.areas[code])
+
+
+class Changes:
+    """
+    What a reload adds, removes and changes
+    A Changes has:
+        - added, removed and changed (dictionaries of kind of content -> names)
+        - renumbered (True if any content has a different ID in the new content, see content.py)
+    """
+    def __init__(self) -> None:
+        self.added = {}
+        self.removed = {}
+        self.changed = {}
+        self.renumbered = False
+
+    def compare(self,
+                kind: str,
+                old: dict,
+                new: dict
+                ) -> None:
+        # old and new are name -> record (see record()) of one kind of content
+        self.added[kind] = [name for name in new if name not in old]
+        self.removed[kind] = [name for name in old if name not in new]
+        self.changed[kind] = [name for name in new if name in old and new[name] != old[name]]
+        self.renumbered = self.renumbered or list(old) != list(new)
+
+    def __str__(self) -> str:
+        parts = []
+        for kind in self.added:
+            for what, names in (("added", self.added[kind]), ("removed", self.removed[kind]), ("changed", self.changed[kind])):
+                if names:
+                    parts.append(f"{len(names)} {kind} {what} ({', '.join(names[:5])}{', ...' if len(names) > 5 else ''})")
+        return ", ".join(parts) or "nothing changed"
+
+
+class Reload:
+    """
+    Content loaded from disk by load(), waiting to be swapped in
+    A Reload has:
+        - the freshly run content modules, and the ones the game is using (dictionaries of name -> module)
+        - the new modules' compiled code (dictionary of name -> code object)
+        - the new randomly sized enemies (see world.randomized)
+        - changes (Changes, worked out by load() against the content in use then)
+        - loading (seconds load() took)
+        - pause (seconds the game was held up by load() and swap(), once swap() has run)
+        - old (the Version swapped out, once swap() has run)
+    """
+    def __init__(self,
+                 fresh: dict,
+                 live: dict,
+                 code: dict,
+                 randomized: list,
+                 changes: Changes
+                 ) -> None:
+        self.fresh = fresh
+        self.live = live
+        self.code = code
+        self.randomized = randomized
+        self.changes = changes
+        self.loading = 0.0
+        self.pause = None
+        self.old = None
+
+    def swap(self,
+             player: object = None,
+             weapon_inventory: list = None,
+             armour_inventory: list = None,
+             current_area: object = None,
+             turns: int = 0
+             ) -> object:
+        """
+        Puts the new content in place of the old
+        A game being played (player, inventories, area and turns) is carried on with the new content
+        Returns the area the player is in now
+        Raises ReloadError if the new content can't be put in place, the old content and the game are then put back
+        """
+        started = time.perf_counter()
+        snapshot = None
+        if player is not None:
+            snapshot = save.capture(player, weapon_inventory, armour_inventory, current_area, turns, 0)
+            respawn.clear(turns)        # counted by the old rules, the snapshot brings them over to the new ones
+
+        old = self.old = Version()
+        changed, randomized = set(world.changed), list(world.randomized)
+        kept = {name: {key: value for key, value in vars(module).items() if is_content(key, value)}
+                for name, module in self.live.items()}
+        replaced = self.install()
+        try:
+            rebind(replaced)
+            world.changed.clear()       # the old objects, the snapshot brings their changes over
+            world.randomized[:] = self.randomized
+            content.index()
+            for cache in caches:
+                cache.clear()
+            if snapshot is not None:
+                current_area = self.carry_on(snapshot, player, weapon_inventory, armour_inventory)
+        except Exception as error:
+            self.roll_back(kept, replaced, changed, randomized)
+            if snapshot is not None:
+                snapshot.seed = random.getrandbits(64)
+                save.apply(snapshot, player, weapon_inventory, armour_inventory)
+            raise ReloadError(f"the new content can't be put in place: {error!r}") from error
+
+        if old.fingerprint != content.fingerprint():
+            history[old.fingerprint] = old
+            while len(history) > HISTORY:
+                history.popitem(last = False)
+
+        self.pause = self.loading + time.perf_counter() - started
+        return current_area
+
+    def carry_on(self,
+                 snapshot: object,
+                 player: object,
+                 weapon_inventory: list,
+                 armour_inventory: list
+                 ) -> object:
+        """
+        Carries a game on with the new content from a snapshot taken with the old content (see save.capture),
+        for games that weren't swapped over by swap() itself
+        Returns the area the player is in now
+        """
+        translate(snapshot, self.old)
+        snapshot.seed = random.getrandbits(64)      # apply() reseeds, carry on with unrelated numbers
+        return save.apply(snapshot, player, weapon_inventory, armour_inventory)
+
+    def roll_back(self,
+                  kept: dict,
+                  replaced: dict,
+                  changed: set,
+                  randomized: list
+                  ) -> None:
+        """
+        Puts the content swap() replaced back, kept = name -> the content each module had before install()
+        """
+        for name, module in self.live.items():
+            live = vars(module)
+            for key in [key for key, value in live.items() if is_content(key, value) and key not in kept[name]]:
+                del live[key]       # new in the new content
+            live.update(kept[name])
+        rebind({(key, id(new)): (new, old) for (key, _), (old, new) in replaced.items()})
+        world.changed.clear()
+        world.changed.update(changed)
+        world.randomized[:] = randomized
+        content.index()
+        for cache in caches:
+            cache.clear()
+        self.old = None
+
+    def install(self) -> dict:
+        """
+        Moves the new content into the modules the game is using, returns {(name, id(old value)): (old value, new value)}
+        """
+        replaced = {}
+        for name, module in self.fresh.items():
+            live = vars(self.live[name])
+            new = vars(module)
+            for key in [key for key, value in live.items() if is_content(key, value) and key not in new]:
+                del live[key]       # gone from the new content
+            for key, value in new.items():
+                if is_content(key, value):
+                    if key in live and live[key] is not value:
+                        replaced[(key, id(live[key]))] = (live[key], value)
+                    live[key] = value
+        return replaced
+
+
+# ==============================
+# Loading
+# ==============================
+def is_content(name, value) -> bool:
+    # The values a content module defines, as opposed to its code, the modules it uses and its players
+    if name.startswith("__"):
+        return False
+    if isinstance(value, (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType)):
+        return False
+    return not isinstance(value, characters.Hero)
+
+
+def load(code = None) -> Reload:
+    """
+    Runs the content modules again from disk, without touching the content the game is using
+    code = compiled code of the modules (see Reload) to run instead, to load exactly what another process loaded
+    Raises ReloadError if the new content can't be used
+    """
+    if tables.loaded:
+        raise ReloadError("the content comes from content tables, new tables need a restart")
+    started = time.perf_counter()
+    live = {name: sys.modules[name] for name in RELOADED}
+    fresh = {}
+    code = dict(code or {})
+
+    # The new content is built against a world of its own, and is part of its starting world (see world.py)
+    changed, randomized, tracking = world.changed, world.randomized, world.tracking
+    world.changed, world.randomized, world.tracking = set(), [], False
+    try:
+        for name in RELOADED:
+            spec = importlib.util.spec_from_file_location(name, live[name].__file__)
+            fresh[name] = sys.modules[name] = importlib.util.module_from_spec(spec)     # found by the modules after it
+            if name not in code:
+                code[name] = spec.loader.get_code(name)
+            exec(code[name], vars(fresh[name]))
+        new_randomized = world.randomized
+    except Exception as error:
+        raise ReloadError(f"the new content doesn't load: {error!r}") from error
+    finally:
+        sys.modules.update(live)
+        world.changed, world.randomized, world.tracking = changed, randomized, tracking
+
+    rehome(fresh, live)
+    reload = Reload(fresh, live, code, new_randomized, compare(fresh))      # compared before swap() replaces the content
+    if shared.enabled and reload.changes.renumbered:
+        # The shared world file holds its areas by ID, and was made for one version of the content (see shared.py)
+        raise ReloadError("content can't be added, removed or moved while the world is shared")
+    reload.loading = time.perf_counter() - started
+    return reload
+
+
+def rehome(fresh, live) -> None:
+    """
+    Moves every object made by the freshly run modules onto the class of the same name the game is using
+    """
+    classes = {}
+    for name, module in fresh.items():
+        for value in vars(module).values():
+            if isinstance(value, type) and value.__module__ == name:
+                old = getattr(live[name], value.__qualname__, None)
+                if old is None:
+                    raise ReloadError(f"{value.__qualname__} is new in {name}.py, changes to code need a restart")
+                classes[value] = old
+
+    # The new objects aren't all reachable from the modules (e.g. copies of enemies in their pools), so every object is checked
+    for thing in gc.get_objects():
+        old = classes.get(type(thing))
+        if old is not None:
+            try:
+                thing.__class__ = old
+            except TypeError as error:
+                raise ReloadError(f"{old.__qualname__} has changed shape, changes to code need a restart") from error
+
+
+def record(thing):
+    """
+    What a weapon, armour, enemy or area is made of, compared to find out whether a reload changed it
+    """
+    if isinstance(thing, characters.Enemy):
+        size = thing.group_range or thing.original_group_size
+        return (size, thing.hp_member, thing.agility, thing.min_damage, thing.max_damage, thing.crit_ch,
+                thing.sickness_member, thing.inflict_min_sickness, thing.inflict_max_sickness, thing.bleed, thing.stun_ch,
+                thing.members is not None)
+    if isinstance(thing, map.Area):
+        item, enemy = thing.baseline
+        return (item and item.name, enemy and enemy.name, thing.description, getattr(thing, "region", None), thing.exits)
+    if isinstance(thing, tables.AreaView):
+        return (thing.item, thing.enemy, thing.description, thing.region, thing.exits)
+    return vars(thing)
+
+
+def area_records(areas) -> dict:
+    # name -> record of every area, read from the tables without building them when the world comes from tables
+    if isinstance(areas, map.LazyAreas):
+        views = (areas.tables.area(code) for code in range(areas.tables.area_count))
+        return {view.name: record(view) for view in views}
+    return {area.name: record(area) for area in areas.values()}
+
+
+def compare(fresh) -> Changes:
+    changes = Changes()
+    for kind, module, old, cls in (("weapons", "weapons", content.WEAPONS, weapons.Weapon),
+                                   ("armours", "armour", content.ARMOURS, armour.Armour),
+                                   ("enemies", "characters", content.ENEMIES, characters.Enemy)):
+        changes.compare(kind,
+                        {thing.name: record(thing) for thing in old},
+                        {thing.name: record(thing) for thing in content.instances(fresh[module], cls)})
+    changes.compare("areas", area_records(map.all_areas), area_records(fresh["map"].all_areas))
+    return changes
+
+
+def rebind(replaced) -> None:
+    """
+    Points every other module's names for the old content (e.g. from star imports) at the new content
+    """
+    names = {name for name, _ in replaced}
+    for module in list(sys.modules.values()):
+        if module is None or module.__name__ in RELOADED:
+            continue
+        values = vars(module)
+        for name in names & values.keys():
+            old, new = replaced.get((name, id(values[name])), (None, None))
+            if old is values[name]:
+                values[name] = new
+
+
+# ==============================
+# Moving references over
+# ==============================
+def translate(snapshot, old) -> None:
+    """
+    Renumbers a snapshot taken with an old version of the content for the content loaded now, matching by name
+    What the new content no longer has is left out: gear is dropped (the starting gear is worn instead),
+    a player in an area that is gone goes back to the start, respawns of areas that lost their rule are dropped, and so on
+    Enemies that changed start out afresh, as do areas whose item or enemy changed,
+    and spawned enemies copied from an enemy that changed are gone
+    """
+    weapon_codes = {item.name: code for code, item in enumerate(content.WEAPONS)}
+    armour_codes = {item.name: code for code, item in enumerate(content.ARMOURS)}
+    enemy_codes = {enemy.name: code for code, enemy in enumerate(content.ENEMIES)}
+
+    def area_code(code):
+        try:
+            return content.area_ids[old.area_name(code)]
+        except KeyError:
+            return None
+
+    snapshot.weapon_inventory = [weapon_codes[old.weapons[code].name] for code in snapshot.weapon_inventory
+                                 if old.weapons[code].name in weapon_codes]
+    snapshot.armour_inventory = [armour_codes[old.armours[code].name] for code in snapshot.armour_inventory
+                                 if old.armours[code].name in armour_codes]
+    snapshot.weapon = weapon_codes.get(old.weapons[snapshot.weapon].name,
+                                       content.weapon_ids.get(id(getattr(weapons, "fists", None)), 0))
+    snapshot.armour = armour_codes.get(old.armours[snapshot.armour].name,
+                                       content.armour_ids.get(id(getattr(armour, "clothes", None)), 0))
+    if snapshot.weapon not in snapshot.weapon_inventory:
+        snapshot.weapon_inventory.append(snapshot.weapon)
+    if snapshot.armour not in snapshot.armour_inventory:
+        snapshot.armour_inventory.append(snapshot.armour)
+
+    current_area = area_code(snapshot.current_area)
+    snapshot.current_area = current_area if current_area is not None else content.area_ids[map.start_area]
+
+    areas = []
+    for code, flags in snapshot.areas:
+        new = area_code(code)
+        if new is None:
+            continue
+        old_item, old_enemy = old.area_record(code)[:2]
+        new_item, new_enemy = Version().area_record(new)[:2]
+        if old_item != new_item:
+            flags &= ~save.ITEM_TAKEN
+        if old_enemy != new_enemy:
+            flags &= ~save.ENEMY_CLEARED
+        if flags:
+            areas.append((new, flags))
+    snapshot.areas = areas
+
+    enemies = []
+    for code, *state in snapshot.enemies:
+        enemy = old.enemies[code]
+        new = enemy_codes.get(enemy.name)
+        if new is not None and record(content.ENEMIES[new]) == record(enemy):
+            enemies.append((new, *state))
+    snapshot.enemies = enemies
+
+    spawned = []
+    for code, enemy_code, *state in snapshot.spawned:
+        new = area_code(code)
+        enemy = old.enemies[enemy_code]
+        new_enemy = enemy_codes.get(enemy.name)
+        if new is not None and new_enemy is not None and record(content.ENEMIES[new_enemy]) == record(enemy):
+            spawned.append((new, new_enemy, *state))
+    snapshot.spawned = spawned
+
+    respawns = []
+    for code, what, due in snapshot.respawns:
+        new = area_code(code)
+        if new is not None and content.AREAS[new].respawn is not None:
+            respawns.append((new, what, due))
+    snapshot.respawns = respawns
+
+
+def upgrade(data) -> bytes:
+    """
+    Brings an encoded snapshot taken before a reload up to the content loaded now
+    Snapshots of the content loaded now, or of a version too old to be remembered, are returned as they are
+    """
+    if len(data) >= save.HEADER.size:
+        fingerprint = save.HEADER.unpack_from(data, 0)[2]
+        old = history.get(fingerprint)
+        if old is not None and fingerprint != content.fingerprint():
+            snapshot = save.decode(data, saved_with = fingerprint)
+            translate(snapshot, old)
+            return save.encode(snapshot)
+    return data
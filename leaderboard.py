@@ -0,0 +1,210 @@
+import os
+import sys
+import time
+import queue
+import atexit
+import sqlite3
+import threading
+from armour import BASIS_POINTS
+
+# ==============================
+# Settings
+# ==============================
+# Where finished runs are stored
+DB_PATH = os.environ.get("TIMEBOUND_DB", "timebound.db")
+
+# The writer saves runs in batches: whichever comes first of BATCH_SIZE runs waiting or FLUSH_INTERVAL seconds
+BATCH_SIZE = 500
+FLUSH_INTERVAL = 0.5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    player TEXT NOT NULL,
+    won INTEGER NOT NULL,
+    cause_of_death TEXT,
+    turns INTEGER NOT NULL,
+    seconds REAL NOT NULL,
+    areas_completed INTEGER NOT NULL,
+    hp INTEGER NOT NULL,
+    agility INTEGER NOT NULL,
+    weapon TEXT NOT NULL,
+    min_damage INTEGER NOT NULL,
+    max_damage INTEGER NOT NULL,
+    crit_ch INTEGER NOT NULL,
+    armour TEXT NOT NULL,
+    damage_reduction REAL NOT NULL,
+    finished_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_ranking ON runs (won DESC, areas_completed DESC, turns, seconds);
+CREATE INDEX IF NOT EXISTS runs_player ON runs (player, finished_at DESC);
+"""
+
+COLUMNS = ("player", "won", "cause_of_death", "turns", "seconds", "areas_completed",
+           "hp", "agility", "weapon", "min_damage", "max_damage", "crit_ch",
+           "armour", "damage_reduction", "finished_at")
+
+INSERT = f"INSERT INTO runs ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+
+
+def connect(path = DB_PATH):
+    """
+    Opens the database in WAL mode, so the writer never blocks readers
+    Several processes can share the same file, each waits up to 10 seconds for another's write to finish
+    """
+    connection = sqlite3.connect(path, timeout = 10, check_same_thread = False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")     # safe with WAL, and only syncs at checkpoints
+    connection.executescript(SCHEMA)
+    return connection
+
+
+# ==============================
+# Classes
+# ==============================
+class RunWriter:
+    """
+    Saves finished runs to the database from a background thread
+    record() only puts the run on a queue, so a finishing session never waits for the disk
+    The thread collects whatever is queued and writes it in a single transaction
+    A batch that can't be written (the database stayed locked past the timeout, the disk is full, ...) is dropped
+    and counted in dropped, the thread carries on with the next one
+    """
+    def __init__(self,
+                 path: str = DB_PATH
+                 ) -> None:
+        self.path = path
+        self.queue = queue.Queue()
+        self.dropped = 0
+        self.thread = threading.Thread(target = self.run, daemon = True)
+        self.thread.start()
+
+    def record(self,
+               run: dict
+               ) -> None:
+        self.queue.put(tuple(run[column] for column in COLUMNS))
+
+    def run(self) -> None:
+        connection = None
+        closing = False
+        while not closing:
+            # Wait for the first run, then gather up anything else that arrives within the flush interval
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + FLUSH_INTERVAL
+            while len(batch) < BATCH_SIZE:
+                try:
+                    batch.append(self.queue.get(timeout = max(0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+
+            # None is the signal to stop, sent by close()
+            if None in batch:
+                closing = True
+                batch = [row for row in batch if row is not None]
+
+            if batch:
+                try:
+                    if connection is None:
+                        connection = connect(self.path)
+                    with connection:
+                        connection.executemany(INSERT, batch)
+                except sqlite3.Error as error:
+                    self.dropped += len(batch)
+                    print(f"Leaderboard: {len(batch)} runs not saved ({self.dropped} in all): {error}", file = sys.stderr)
+        if connection is not None:
+            connection.close()
+
+    def close(self) -> None:
+        # Writes whatever is still queued and stops the thread
+        self.queue.put(None)
+        self.thread.join()
+
+
+# ==============================
+# Queries
+# ==============================
+readers = {}                # path -> connection shared by the queries, opened by the first one
+reading = threading.Lock()
+
+
+def query(sql, parameters, path):
+    # Runs a query on the shared read connection, only the first query on a path sets up the schema
+    with reading:
+        connection = readers.get(path)
+        if connection is None:
+            connection = readers[path] = connect(path)
+        return connection.execute(sql, parameters).fetchall()
+
+
+def top(limit = 10, path = DB_PATH):
+    """
+    Returns the best runs: wins first, then the most areas completed, then the fewest turns and the shortest time
+    Answered straight from the runs_ranking index
+    """
+    return query("SELECT player, won, areas_completed, turns, seconds, weapon, armour FROM runs "
+                 "ORDER BY won DESC, areas_completed DESC, turns, seconds LIMIT ?", (limit,), path)
+
+
+def history(player, limit = 20, path = DB_PATH):
+    """
+    Returns a player's most recent runs, newest first
+    Answered straight from the runs_player index
+    """
+    return query("SELECT finished_at, won, cause_of_death, areas_completed, turns, seconds, weapon, armour FROM runs "
+                 "WHERE player = ? ORDER BY finished_at DESC LIMIT ?", (player, limit), path)
+
+
+# ==============================
+# Recording runs
+# ==============================
+# The writer is only started the first time a run is recorded
+writer = None
+
+
+def record(player, won, cause_of_death, turns, seconds, areas_completed):
+    """
+    Records a finished run, along with the player's final stats
+    """
+    global writer
+    if writer is None:
+        writer = RunWriter()
+        atexit.register(writer.close)
+    writer.record({
+        "player": player.name,
+        "won": int(won),
+        "cause_of_death": cause_of_death,
+        "turns": turns,
+        "seconds": seconds,
+        "areas_completed": areas_completed,
+        "hp": player.hp,
+        "agility": player.agility,
+        "weapon": player.weapon.name,
+        "min_damage": player.weapon.min_damage,
+        "max_damage": player.weapon.max_damage,
+        "crit_ch": player.weapon.crit_ch,
+        "armour": player.armour.name,
+        "damage_reduction": player.armour.damage_reduction / BASIS_POINTS,     # stored as a fraction, armour keeps basis points
+        "finished_at": time.time(),
+    })
+
+
+# ==============================
+# Command line
+# ==============================
+# python leaderboard.py top [n]
+# python leaderboard.py history <player>
+if __name__ == "__main__":
+    if len(sys.argv) >= 2 and sys.argv[1] == "top":
+        limit = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+        print(f"{'#': <4} | {'Player': <20} | {'Result': <6} | {'Areas': <5} | {'Turns': <5} | {'Time': <8} | Gear")
+        print("-" * 100)
+        for rank, (player, won, areas, turns, seconds, weapon, armour) in enumerate(top(limit), start = 1):
+            result = "Won" if won else "Lost"
+            print(f"{rank: <4} | {player: <20} | {result: <6} | {areas: <5} | {turns: <5} | {seconds: <8.0f} | {weapon}, {armour}")
+    elif len(sys.argv) >= 3 and sys.argv[1] == "history":
+        for finished_at, won, cause, areas, turns, seconds, weapon, armour in history(sys.argv[2]):
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(finished_at))
+            result = "Won" if won else f"Defeated by {cause}"
+            print(f"{when} | {result} | {areas} areas | {turns} turns | {seconds:.0f}s | {weapon}, {armour}")
+    else:
+        print("Usage: python leaderboard.py top [n] | history <player>")
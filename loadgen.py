@@ -0,0 +1,230 @@
+import re
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+from collections import Counter
+
+# ==============================
+# Load generator
+# ==============================
+# Plays the game against a running server (see server.py) with many simulated players at once
+# and reports how long the server took to answer each kind of command
+#
+# python loadgen.py --clients 1000 --rate 500 --duration 60 > capacity.json
+#
+# Every player answers whatever the server asks: it names itself, fights its battles and
+# picks a command from the mix at the action prompt
+# A command's latency is the time from sending the line to the server asking for the next one
+
+# Command mix used at the action prompt, by weight
+MIX = {"go": 40, "pick": 10, "show weapons": 10, "show armour": 5, "equip": 10, "status": 15, "commands": 10}
+
+# How players answer in battle
+BATTLE = {"attack": 80, "defend": 20}
+
+# The server is waiting for a line once its output ends with one of its prompts ("...? " or "Press enter to continue...")
+PROMPT = re.compile(r"(\? |\.\.\. ?)$")
+
+# Exits are listed one per line under "Available Moves:" on the status screen
+MOVES = re.compile(r"Available Moves:\s*\n(.*?)\n-", re.S)
+
+
+# ==============================
+# Classes
+# ==============================
+class Results:
+    """
+    Latencies and errors collected from every player
+    """
+    def __init__(self) -> None:
+        self.latencies = {}         # command -> list of seconds
+        self.errors = Counter()     # kind of error -> count
+        self.sessions = 0           # games played to the end
+
+    def record(self, command, seconds):
+        self.latencies.setdefault(command, []).append(seconds)
+
+    def report(self, elapsed, clients, rate):
+        """
+        Returns the results as a dictionary, ready to be written as JSON
+        """
+        commands = {}
+        for command, values in sorted(self.latencies.items()):
+            values.sort()
+            commands[command] = {
+                "count": len(values),
+                "p50_ms": round(percentile(values, 0.50) * 1000, 3),
+                "p95_ms": round(percentile(values, 0.95) * 1000, 3),
+                "p99_ms": round(percentile(values, 0.99) * 1000, 3),
+                "max_ms": round(values[-1] * 1000, 3),
+            }
+        everything = sorted(value for values in self.latencies.values() for value in values)
+        total = len(everything)
+        return {
+            "clients": clients,
+            "target_rate": rate,
+            "seconds": round(elapsed, 3),
+            "commands_sent": total,
+            "throughput": round(total / elapsed, 1) if elapsed else 0.0,
+            "p50_ms": round(percentile(everything, 0.50) * 1000, 3) if total else None,
+            "p95_ms": round(percentile(everything, 0.95) * 1000, 3) if total else None,
+            "p99_ms": round(percentile(everything, 0.99) * 1000, 3) if total else None,
+            "sessions_finished": self.sessions,
+            "errors": dict(self.errors),
+            "per_command": commands,
+        }
+
+
+def percentile(values, fraction):
+    # Nearest rank percentile of an already sorted list
+    return values[max(0, min(len(values) - 1, int(fraction * len(values) + 0.5) - 1))]
+
+
+def mix_from_journal(path):
+    """
+    Builds a command mix from recorded traffic: the lines players entered, e.g. a save journal (see save.py)
+    Lines that aren't commands (names, battle answers, empty lines) are skipped
+    """
+    counts = Counter()
+    with open(path, encoding = "utf-8") as file:
+        for line in file:
+            words = line.strip().lower().split()
+            if not words or line.startswith("#"):
+                continue
+            command = " ".join(words[:2]) if words[0] == "show" else words[0]
+            if command in MIX:
+                counts[command] += 1
+    if not counts:
+        raise ValueError(f"no commands found in {path}")
+    return dict(counts)
+
+
+def choose(weights):
+    return random.choices(list(weights), weights = list(weights.values()))[0]
+
+
+def answer(output, mix, player):
+    """
+    Works out what a player types at the prompt the output ends with
+    Returns (command label, line)
+    """
+    prompt = output.rstrip("\n").rsplit("\n", 1)[-1]
+    if "Are you sure" in prompt:
+        return "name", "yes"
+    if "nametag say" in prompt:
+        return "name", f"player{player}"
+    if "defend or attack" in prompt:
+        command = choose(BATTLE)
+        return command, command
+    if "Which enemy" in prompt:
+        return "target", "0"
+    if "play again" in prompt:
+        return "again", "no"
+    if "What do you want to do" not in prompt:
+        return "continue", ""       # "Press enter to continue..."
+
+    command = choose(mix)
+    if command == "go":
+        moves = MOVES.search(output)
+        exits = [line.strip().lower() for line in moves.group(1).split("\n") if line.strip()] if moves else []
+        return "go", f"go {random.choice(exits)}" if exits else "go nowhere"
+    if command == "pick":
+        return "pick", "pick up"
+    if command == "equip":
+        return "equip", f"equip {random.choice(('weapon', 'armour'))} 0"
+    return command, command
+
+
+async def read_prompt(reader, timeout):
+    # Reads until the server asks for a line, returns everything it sent
+    output = ""
+    while not PROMPT.search(output):
+        data = await asyncio.wait_for(reader.read(65536), timeout)
+        if not data:
+            raise ConnectionResetError("server closed the connection")
+        output += data.decode(errors = "replace")
+    return output
+
+
+async def play(player, options, mix, results, deadline):
+    """
+    One simulated player, sends a line every clients / rate seconds on average until the deadline
+    Starts a new game whenever one ends
+    """
+    interval = options.clients / options.rate if options.rate else 0
+    await asyncio.sleep(random.uniform(0, interval or 0.1))    # spread the players out
+    while time.monotonic() < deadline:
+        try:
+            reader, writer = await asyncio.open_connection(options.host, options.port)
+        except OSError as error:
+            results.errors[type(error).__name__] += 1
+            await asyncio.sleep(1)
+            continue
+        try:
+            output = await read_prompt(reader, options.timeout)
+            next_send = time.monotonic()
+            while time.monotonic() < deadline:
+                command, line = answer(output, mix, player)
+                if command == "again":
+                    results.sessions += 1
+                    break
+                if interval:
+                    next_send += random.expovariate(1 / interval)
+                    await asyncio.sleep(max(0, next_send - time.monotonic()))
+                if command == "go" and line == "go nowhere":
+                    results.errors["no_exits"] += 1
+                sent = time.perf_counter()
+                writer.write((line + "\n").encode())
+                await writer.drain()
+                output = await read_prompt(reader, options.timeout)
+                results.record(command, time.perf_counter() - sent)
+                if "Invalid" in output:
+                    results.errors["invalid_command"] += 1
+        except asyncio.TimeoutError:
+            results.errors["timeout"] += 1
+        except (OSError, ConnectionError) as error:
+            results.errors[type(error).__name__] += 1
+        finally:
+            writer.close()
+
+
+async def run(options, mix):
+    results = Results()
+    started = time.monotonic()
+    deadline = started + options.duration
+    await asyncio.gather(*(play(player, options, mix, results, deadline) for player in range(options.clients)))
+    return results.report(time.monotonic() - started, options.clients, options.rate)
+
+
+# ==============================
+# Command line
+# ==============================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Generate load against a game server and report latencies as JSON")
+    parser.add_argument("--host", default = "127.0.0.1")
+    parser.add_argument("--port", type = int, default = 4000)
+    parser.add_argument("--clients", type = int, default = 100, help = "players connected at once")
+    parser.add_argument("--rate", type = float, default = 100, help = "lines sent per second by all players together, 0 for as fast as possible")
+    parser.add_argument("--duration", type = float, default = 30, help = "seconds to run for")
+    parser.add_argument("--timeout", type = float, default = 10, help = "seconds to wait for an answer before counting an error")
+    parser.add_argument("--mix", help = "command weights, e.g. go=40,status=20,pick=10 (see MIX)")
+    parser.add_argument("--journal", help = "take the command mix from recorded lines instead, e.g. a save journal")
+    parser.add_argument("--seed", type = int, help = "random seed, for repeatable runs")
+    options = parser.parse_args()
+
+    mix = MIX
+    if options.journal:
+        mix = mix_from_journal(options.journal)
+    elif options.mix:
+        mix = {}
+        for part in options.mix.split(","):
+            command, weight = part.split("=")
+            mix[command.strip().replace("_", " ")] = float(weight)
+    if options.seed is not None:
+        random.seed(options.seed)
+
+    json.dump(asyncio.run(run(options, mix)), sys.stdout, indent = 2)
+    print()
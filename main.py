@@ -1,469 +1,882 @@
-import os
-import time
-from weapons import *
-from characters import *
-from armour import *
-from map import *
-
-# keeps track of the game's run status
-run = False
-
-# keeps track of the player's weapons
-weapon_inventory = [fists]
-
-# keeps track of the player's armour
-armour_inventory = [clothes]
-
-# keeps track of the player's current location
-current_area = all_areas["Short Grasslands"]
-
-# displays a list of game commands
-def commands():
-    print(f"\nAvailable Commands:")
-    print("-" * 90)
-    print(f"{'go <direction>': <20} | {'Move in a direction (e.g. go north)': <90}")
-    print(f"-" * 90)
-    print(f"{'pick up <item>': <20} | {'Pick up an item in the current area (e.g. pick up bone)': <90}")
-    print(f"-" * 90)
-    print(f"{'show weapons': <20} | {'Displays weapons in you inventory': <90}")
-    print(f"-" * 90)
-    print(f"{'show armour': <20} | {'Displays armour in your inventory': <90}")
-    print(f"-" * 90)
-    print(f"{'equip weapon': <20} | {'Equip a weapon by its code (e.g.equip weapon 0)': <90}")
-    print(f"-" * 90)
-    print(f"{'equip armour': <20} | {'Equip armour by its code (e.g. equip armour 0)': <90}")
-    print(f"-" * 90)
-    print(f"{'status': <20} | {'Display your current status, including HP, weapon, and armour': <90}")
-    print(f"-" * 90)
-    print(f"{'commands': <20} | {'Show this list of commands': <90}")
-    print(f"-" * 90)
-
-# =======================================
-# Displays current area and moves
-# =======================================
-def status():
-    moves = current_area.exits.keys()   # list of all possible exits (actions)
-
-    # Centred title with area name
-    print(f"Current Location: {current_area.name}".center(len(current_area.description) + 10))
-    print("-----" + "-" * len(current_area.description) + "-----")
-
-    # Area description
-    print(f"{current_area.description}".center(len(current_area.description) + 10))
-    print("-----" + "-" * len(current_area.description) + "-----")
-
-    # Available moves
-    print("Available Moves:".center(len(current_area.description) + 10))
-    for move in moves:
-        print(f"{move.title()}".center(len(current_area.description) + 10))
-    print("-----" + "-" * len(current_area.description) + "-----")
-
-    # Items in area (if any)
-    if current_area.item:
-        print(f"Item here: {current_area.item.name}".center(len(current_area.description) + 10))
-        print(f"Description: {current_area.item.description}".center(len(current_area.description) + 10))
-    else:
-        print("No items here".center(len(current_area.description) + 10))
-    print("-----" + "-" * len(current_area.description) + "-----")
-    print("Use 'commands' to see available commands".center(len(current_area.description) + 10))
-    print("-----" + "-" * len(current_area.description) + "-----")
-
-
-
-# ========================================
-# Display weapon inventory
-# ========================================
-def display_weapons():
-    print("\nWeapons:")
-    print("-" * 120)
-    print(f"{' Code': <5} | {'Name': <20} | {'Stats': <25} | Description")
-    print("-" * 120)
-    for item in weapon_inventory:
-        stats = []       # collect stats in a list for each weapon
-
-        # Check if the item has specific attributes and append them to the stats list
-        if hasattr(item, "min_damage"):
-            stats.append(f"Damage: {item.min_damage} - {item.max_damage}")
-
-        if hasattr(item, "min_special"):
-            stats.append(f"Special: {item.min_special} - {item.max_special}")
-            
-        if hasattr(item, "crit_ch"):
-            stats.append(f"Crit Chance: {item.crit_ch}%")
-
-        if hasattr(item, "inflict_min_sickness"):
-            stats.append(f"Sickness: {item.inflict_min_sickness} - {item.inflict_max_sickness}")
-        
-        # Get the index of the item in the inventory to be used for equipping
-        code = weapon_inventory.index(item)     
-
-        # Print weapon info (first stat inline)
-        print(f"{str(code).center(5): <5} | {item.name: <20} | {stats[0]: <25} | {item.description}")
-
-        # Print remaining stats underneath with other columns empty
-        for stat in stats[1:]:
-            print(f"{'': <5} | {'': <20} | {stat: <25} |")
-        print("-" * 120)
-
-
-# ========================================
-# Display armour inventory
-# ========================================
-def display_armour():
-    print("\nArmour:")
-    print("-" * 120)
-    print(f"{'Code': <5} | {'Name': <20} | {'Stats': <25} | Description")
-    print("-" * 120)
-    for item in armour_inventory:
-        stats = []      # collect stats in a list for armour
-
-        # Check and append stats
-        if hasattr(item, "hp"):
-            stats.append(f"HP: {item.hp}")
-
-        if hasattr(item, "agility"):
-            stats.append(f"Agility: {item.agility}")
-            
-        if hasattr(item, "damage_reduction"):
-            stats.append(f"Damage Reduction: {int(item.damage_reduction * 100)}%")
-        
-        code = armour_inventory.index(item)
-
-        # Print armour info
-        print(f"{str(code).center(5): <5} | {item.name: <20} | {stats[0]: <25} | {item.description}")
-        for stat in stats[1:]:
-            print(f"{'': <5} | {'': <20} | {stat: <25} |")
-        print("-" * 120)
-
-
-# ========================================
-# Display enemy information
-# ========================================
-def display_enemy(enemy):
-    print("-" * 50)
-    print(f"Enemy: {enemy.name} (Group of {enemy.current_group_size})".center(50))
-    print("-" * 50)
-    print(f"HP: {enemy.hp}")
-    print(f"Agility: {enemy.agility}")
-    print(f"-" * 50)
-
-    print(f"Attack: {enemy.min_damage} - {enemy.max_damage}")
-    if enemy.crit_ch > 0:
-        print(f"Crit Chance: {enemy.crit_ch}%")
-
-    if enemy.inflict_min_sickness > 0:
-        print(f"Poison: {enemy.inflict_min_sickness} - {enemy.inflict_max_sickness}")
-    print("-" * 50)
-
-
-# ========================================
-# Display player information
-# ========================================
-def display_player():
-    print("-" * 40)
-    print(f"Player: {player.name}")
-    print("-" * 40)
-    print(f"HP: {player.hp}")
-    print(f"Agility: {player.agility}")
-    print(f"-" * 40)
-
-    # Equipped weapon info
-    print(f"Weapon: {player.weapon.name}")
-    print(f"Damage: {player.weapon.min_damage} - {player.weapon.max_damage}")
-    if hasattr(player.weapon, "crit_ch"):
-        print(f"Crit Chance: {player.weapon.crit_ch}%")
-
-    if hasattr(player.weapon, "inflict_min_sickness"):
-        print(f"Poison: {player.weapon.inflict_min_sickness} - {player.weapon.inflict_max_sickness}")
-    print("-" * 40)
-
-    # Equipped armour info
-    print(f"Armour: {player.armour.name}")
-    print(f"HP Bonus: {player.armour.hp}")
-    print(f"Agility Bonus: {player.armour.agility}")
-    print(f"Damage Reduction: {int(player.armour.damage_reduction * 100)}%")
-    print("-" * 40)
-
-
-# ========================================
-# Item pick up
-# ========================================
-def check_item():
-    """
-    Checks if there is an item in the current area
-    If there is an item and no enemy, it allows the player to pick it up
-    If there is an enemy, it informs the player that they cannot pick up items while in combat
-    If the area is already complete, it informs the player that there are no items to pick up
-    """
-    if current_area.enemy == None and current_area.item != None:
-        pick_up(current_area.item)      # pick up the item
-        current_area.item = None
-    elif current_area.enemy != None:
-        print("You can't pick up items while in combat!")
-    elif current_area.complete:
-        print("You have already completed this area, no items to pick up.")
-    else:
-        print("There are no items to pick up in this area.")
-
-
-def pick_up(item):
-    """
-    Adds an item to the relevant inventory (weapon or armour)
-    But only if it is not already in the inventory
-    """
-    global weapon_inventory     
-    global armour_inventory
-
-    # Prevents duplicates
-    if item not in weapon_inventory or armour_inventory:
-        # Check if the item is a weapon or armour (not weapon) and add it to the respective inventory
-        if isinstance(item, Weapon):
-            weapon_inventory.append(item)
-        else:
-            armour_inventory.append(item)
-
-    print(f"You have picked up {item.name}")
-
-
-# ========================================
-# Player's turn in battle
-# ========================================
-def turn(hero, enemy):
-    hero.defend = False
-    prompt = input("Do you want to defend or attack? ").lower().strip()   
-    if len(prompt) == 0:      # empty input
-        print("Please enter a command")
-        turn(hero, enemy)      # recalls the function
-    else:
-        if prompt == "defend":
-            hero.defend = True
-        elif prompt == "attack":
-            hero.attack(enemy)
-        else:
-            print("Invalid option! Choose to either attack or defend")
-            turn(hero, enemy)       
-
-# ========================================
-# Check for enemy and handle battle
-# ========================================
-def check_enemy(enemy):
-    if current_area.enemy:      # if enemy exists, start battle
-            battle(player, current_area.enemy)
-    else:
-        pass    # no enemy, do nothing
-
-
-def battle(hero, enemy):
-    global run      # to update the run variable and exit the game if player is defeated
-    while hero.hp > 0 and enemy.hp > 0:
-        os.system("cls")        # clear the console for a clean battle display
-        print(f"A wild {enemy.name} appears!")
-        display_enemy(enemy)
-
-        print("\nYour Turn:")
-        turn(hero, enemy)
-
-        # Check if enemy was defeated before its turn
-        if current_area.enemy.hp <= 0:
-            print(f"{current_area.enemy.name} has been defeated!")
-            player.hp = player.armour.hp  # restore player's HP after defeating an enemy
-            current_area.enemy = None
-            input("Press enter to continue...")
-            return
-        
-        print("\nEnemy Turn:")
-        enemy.attack(hero)
-
-        # Check if player is defeated
-        if player.hp <= 0:
-            print("You have been defeated! Game Over!")
-            display_player()
-            run = False     # ends the main game loop, exitting the game when the player is defeated
-        input("Press enter to continue...")
-
-
-# ========================================
-# Equipping items
-# ========================================
-def equip_weapon(code):
-    if code in range(len(weapon_inventory)):
-        player.weapon = weapon_inventory[code]
-        player.crit_ch = player.weapon.crit_ch      # update player's crit chance based on the equipped weapon
-        print(f"You have equipped {player.weapon.name} as your weapon")
-    else:
-        print("Please provide a valid code for the weapon you want to equip")
-    display_player()
-
-
-def equip_armour(code):
-    if code in range(len(armour_inventory)):
-        player.armour = armour_inventory[code] 
-        player.hp = player.armour.hp                # update player's HP based on the equipped armour
-        player.agility = player.armour.agility      # update player's agility based on the equipped armour
-        print(f"You have equipped {player.armour.name} as your armour")
-    else:
-        print("Please provide a valid code for the armour you want to equip")
-    display_player()
-
-
-# ========================================
-# Player movement
-# ========================================
-def move_player(action):
-    """
-    Moves the player to a new area based on the action provided
-    Uses the global all_areas dictionary from the 'map' file so that the player can move between regions
-    """
-    global current_area     # to update the current_area variable defined outside this function
-
-    # check if the current area has an exit for the given action
-    if action in current_area.exits:
-        new_area_name = current_area.exits[action]      # get the name of the new area from the exits dictionary
-        current_area = all_areas[new_area_name]
-        print(f"You go to {current_area.name}")
-        print(current_area.description)
-    else:
-        print("You can't go that way.")
-
-
-# ========================================
-# Action handling
-# ========================================
-def action():
-    """
-    Handles player input for actions in the game
-    Prompts the player for an action then splits the input into a list of individual words
-    This allows to check for the first word to determine the action and to check for additional parameters
-    If the input is empty, it prompts the player to enter a command
-    """
-    os.system("cls")
-    status()
-
-    prompt = input("What do you want to do? ").strip().lower().split()
-
-    if len(prompt) == 0:        # empty input
-        print("Please enter a command")
-        action()
-    else:
-
-        # Movement
-        if prompt[0] ==  "go":
-            # Checks the length of the prompt to ensure a direction is specified
-            if len(prompt) < 2: 
-                print("Please specify a direction to go")
-                input("Press enter to continue... ")
-                action()
-
-            # Allows for multiple word commands
-            else:
-                if len(prompt) == 3:
-                    direction = f"{prompt[1]} {prompt[2]}"
-                    move_player(direction)
-                else:
-                    move_player(prompt[1])
-
-        # Pick up
-        elif prompt[0] == "pick":
-            check_item()
-
-        # Show inventories
-        elif prompt[0] == "show":
-            if prompt[1] == "weapons":
-                display_weapons()
-            elif prompt[1] == "armour":
-                display_armour()
-        
-        # Equip items
-        elif prompt[0] == "equip":
-            if len(prompt) < 3:     # checks if the command is complete
-                print("Invalid equip command. Use 'equip weapon <code>' or 'equip armour <code>'")
-                input("Press enter to continue... ")
-                action()
-            else:
-                if prompt[2].isdigit():     # checks if the code is a number
-
-                    # Converts the code into an integer
-                    code = int(prompt[2])   
-                    if prompt[1] == "weapon":
-                        equip_weapon(code)
-                    elif prompt[1] == "armour":
-                        equip_armour(code)
-                else:
-                    print("Invalid code. Check weapons ('show weapons') or armour (show armour') inventories for valid codes")
-                    input("Press enter to continue... ")
-                    action()
-
-        # Status
-        elif prompt[0] == "status":
-            display_player()
-
-        # Commands
-        elif prompt[0] == "commands":
-            commands()
-
-        # Invalid command fallback
-        else:
-            print("Invalid action. Try 'commands' to see available actions")
-            input("Press enter to continue... ")
-            action()
-
-# ========================================
-# Establish Story
-# ========================================
-def start():
-    global run
-    os.system("cls")
-    print("=" * 100)
-    print("You stumble upon a mysterious artefact during an archaeological excavation.")
-    print("As you touch it, the artefact activates, engulfing you in a bright light and you lose conciousness")
-    print("You hear echoes of soft whispers")
-    print("When you regain conciousness, you find yourself in the dense and untamed world of the Stone Age.")
-    print("You can't seem to remember your name, until you see the nametag on your chest")
-    print("=" * 100)
-
-    prompt = input("What does the nametag say? ")
-    check = input("Are you sure that's what the nametag says? ").lower().strip()
-    if check == "yes":
-        player.name = prompt
-        print(f"Welcome, {player.name}!")
-        input("Press enter to continue... ")
-        run = True
-    else: 
-        print("Read it correctly then!")
-        input("Press enter to continue... ")
-        start()
-
-start()
-
-# Main game loop
-while run:
-    os.system("cls") 
-    check_enemy(current_area.enemy)   
-
-    # Checks if the final area is complete and ends game
-    if arena.complete:
-        print("You have freed your souls from this cruel game! You win!")
-        print("Final Status:")
-        display_player()
-        input("Press enter to continue...")
-        run = False
-        break
-
-    # Checks if player died during battle
-    if not run:
-        break       # immediately break out of loop
-
-    action()
-    input("Press enter to continue... ")
-
-    # Checks if the current are has an enemy or item
-    # If not, area is complete
-    if current_area.enemy == None and current_area.item == None:
-        current_area.complete = True
-    
-
-    
-    
-    
-
-
+import os
+import time
+import metrics
+import profiler
+import leaderboard
+import save
+import shared
+import respawn
+import spectate
+import realtime
+import hotreload
+import memory       # kill -USR2 writes a memory report (see memory.py)
+from weapons import *
+from characters import *
+from armour import *
+from map import *
+from effects import *
+import world
+import gear
+
+# keeps track of the game's run status
+run = False
+
+# keeps track of the player's weapons
+weapon_inventory = [fists]
+
+# keeps track of the player's armour
+armour_inventory = [clothes]
+
+# keeps track of the player's current location
+current_area = all_areas[start_area]
+
+# keeps track of the run's progress, recorded on the leaderboard when the game ends
+turns = 0               # actions taken and battle rounds fought
+started_at = None       # when the player started the run
+cause_of_death = None   # name of the enemies that defeated the player
+
+# tells this session apart from others in the same process (see profiler.py), the server numbers its sessions itself
+session_id = os.getpid()
+
+# Defending also raises the player's agility until the enemies have had their turn
+DEFEND_AGILITY = 20
+
+# displays a list of game commands
+@metrics.timed("timebound_render_seconds", "commands")
+def commands():
+    print(f"\nAvailable Commands:")
+    print("-" * 90)
+    print(f"{'go <direction>': <20} | {'Move in a direction (e.g. go north)': <90}")
+    print(f"-" * 90)
+    print(f"{'pick up <item>': <20} | {'Pick up an item in the current area (e.g. pick up bone)': <90}")
+    print(f"-" * 90)
+    print(f"{'show weapons': <20} | {'Displays weapons in you inventory': <90}")
+    print(f"-" * 90)
+    print(f"{'show armour': <20} | {'Displays armour in your inventory': <90}")
+    print(f"-" * 90)
+    print(f"{'equip weapon': <20} | {'Equip a weapon by its code (e.g.equip weapon 0)': <90}")
+    print(f"-" * 90)
+    print(f"{'equip armour': <20} | {'Equip armour by its code (e.g. equip armour 0)': <90}")
+    print(f"-" * 90)
+    print(f"{'status': <20} | {'Display your current status, including HP, weapon, and armour': <90}")
+    print(f"-" * 90)
+    print(f"{'where <thing>': <20} | {'Find where a weapon, armour or enemy is (e.g. where bone)': <90}")
+    print(f"-" * 90)
+    print(f"{'optimize [enemy]': <20} | {'Equip your best gear against the nearest (or a named) enemy': <90}")
+    print(f"-" * 90)
+    print(f"{'commands': <20} | {'Show this list of commands': <90}")
+    print(f"-" * 90)
+
+# =======================================
+# Displays current area and moves
+# =======================================
+@metrics.timed("timebound_render_seconds", "status")
+def status():
+    moves = current_area.exits.keys()   # list of all possible exits (actions)
+
+    # Centred title with area name
+    print(f"Current Location: {current_area.name}".center(len(current_area.description) + 10))
+    print("-----" + "-" * len(current_area.description) + "-----")
+
+    # Area description
+    print(f"{current_area.description}".center(len(current_area.description) + 10))
+    print("-----" + "-" * len(current_area.description) + "-----")
+
+    # Available moves
+    print("Available Moves:".center(len(current_area.description) + 10))
+    for move in moves:
+        print(f"{move.title()}".center(len(current_area.description) + 10))
+    print("-----" + "-" * len(current_area.description) + "-----")
+
+    # Items in area (if any)
+    if current_area.item:
+        print(f"Item here: {current_area.item.name}".center(len(current_area.description) + 10))
+        print(f"Description: {current_area.item.description}".center(len(current_area.description) + 10))
+    else:
+        print("No items here".center(len(current_area.description) + 10))
+    print("-----" + "-" * len(current_area.description) + "-----")
+    print("Use 'commands' to see available commands".center(len(current_area.description) + 10))
+    print("-----" + "-" * len(current_area.description) + "-----")
+
+
+
+# ========================================
+# Display weapon inventory
+# ========================================
+@metrics.timed("timebound_render_seconds", "weapons")
+def display_weapons():
+    print("\nWeapons:")
+    print("-" * 120)
+    print(f"{' Code': <5} | {'Name': <20} | {'Stats': <25} | Description")
+    print("-" * 120)
+    for item in weapon_inventory:
+        stats = []       # collect stats in a list for each weapon
+
+        # Check if the item has specific attributes and append them to the stats list
+        if hasattr(item, "min_damage"):
+            stats.append(f"Damage: {item.min_damage} - {item.max_damage}")
+
+        if hasattr(item, "min_special"):
+            stats.append(f"Special: {item.min_special} - {item.max_special}")
+            
+        if hasattr(item, "crit_ch"):
+            stats.append(f"Crit Chance: {item.crit_ch}%")
+
+        if hasattr(item, "inflict_min_sickness"):
+            stats.append(f"Sickness: {item.inflict_min_sickness} - {item.inflict_max_sickness}")
+
+        if item.bleed > 0:
+            stats.append(f"Bleeding: {item.bleed}")
+
+        if item.stun_ch > 0:
+            stats.append(f"Stun Chance: {item.stun_ch}%")
+        
+        # Get the index of the item in the inventory to be used for equipping
+        code = weapon_inventory.index(item)     
+
+        # Print weapon info (first stat inline)
+        print(f"{str(code).center(5): <5} | {item.name: <20} | {stats[0]: <25} | {item.description}")
+
+        # Print remaining stats underneath with other columns empty
+        for stat in stats[1:]:
+            print(f"{'': <5} | {'': <20} | {stat: <25} |")
+        print("-" * 120)
+
+
+# ========================================
+# Display armour inventory
+# ========================================
+@metrics.timed("timebound_render_seconds", "armour")
+def display_armour():
+    print("\nArmour:")
+    print("-" * 120)
+    print(f"{'Code': <5} | {'Name': <20} | {'Stats': <25} | Description")
+    print("-" * 120)
+    for item in armour_inventory:
+        stats = []      # collect stats in a list for armour
+
+        # Check and append stats
+        if hasattr(item, "hp"):
+            stats.append(f"HP: {item.hp}")
+
+        if hasattr(item, "agility"):
+            stats.append(f"Agility: {item.agility}")
+            
+        if hasattr(item, "damage_reduction"):
+            stats.append(f"Damage Reduction: {item.damage_reduction // 100}%")
+        
+        code = armour_inventory.index(item)
+
+        # Print armour info
+        print(f"{str(code).center(5): <5} | {item.name: <20} | {stats[0]: <25} | {item.description}")
+        for stat in stats[1:]:
+            print(f"{'': <5} | {'': <20} | {stat: <25} |")
+        print("-" * 120)
+
+
+# ========================================
+# Display enemy information
+# ========================================
+@metrics.timed("timebound_render_seconds", "enemy")
+def display_enemy(enemy):
+    print("-" * 50)
+    print(f"Enemy: {enemy.name} (Group of {enemy.current_group_size})".center(50))
+    print("-" * 50)
+    print(f"HP: {enemy.hp}")
+    print(f"Agility: {enemy.agility}")
+    print(f"-" * 50)
+
+    print(f"Attack: {enemy.min_damage} - {enemy.max_damage}")
+    if enemy.crit_ch > 0:
+        print(f"Crit Chance: {enemy.crit_ch}%")
+
+    if enemy.inflict_min_sickness > 0:
+        print(f"Poison: {enemy.inflict_min_sickness} - {enemy.inflict_max_sickness}")
+    if enemy.bleed > 0:
+        print(f"Bleeding: {enemy.bleed}")
+    if enemy.stun_ch > 0:
+        print(f"Stun Chance: {enemy.stun_ch}%")
+    print("-" * 50)
+
+
+# ========================================
+# Display player information
+# ========================================
+@metrics.timed("timebound_render_seconds", "player")
+def display_player():
+    print("-" * 40)
+    print(f"Player: {player.name}")
+    print("-" * 40)
+    print(f"HP: {player.hp}")
+    print(f"Agility: {player.agility}")
+    if player.effects:
+        print(f"Effects: {', '.join(player.effects)}")
+    print(f"-" * 40)
+
+    # Equipped weapon info
+    print(f"Weapon: {player.weapon.name}")
+    print(f"Damage: {player.weapon.min_damage} - {player.weapon.max_damage}")
+    if hasattr(player.weapon, "crit_ch"):
+        print(f"Crit Chance: {player.weapon.crit_ch}%")
+
+    if hasattr(player.weapon, "inflict_min_sickness"):
+        print(f"Poison: {player.weapon.inflict_min_sickness} - {player.weapon.inflict_max_sickness}")
+    if player.weapon.bleed > 0:
+        print(f"Bleeding: {player.weapon.bleed}")
+    if player.weapon.stun_ch > 0:
+        print(f"Stun Chance: {player.weapon.stun_ch}%")
+    print("-" * 40)
+
+    # Equipped armour info
+    print(f"Armour: {player.armour.name}")
+    print(f"HP Bonus: {player.armour.hp}")
+    print(f"Agility Bonus: {player.armour.agility}")
+    print(f"Damage Reduction: {player.armour.damage_reduction // 100}%")
+    print("-" * 40)
+
+
+# ========================================
+# Item pick up
+# ========================================
+@metrics.timed("timebound_call_seconds", "check_item")
+def check_item():
+    """
+    Checks if there is an item in the current area
+    If there is an item and no enemy, it allows the player to pick it up
+    If there is an enemy, it informs the player that they cannot pick up items while in combat
+    If the area is already complete, it informs the player that there are no items to pick up
+    """
+    if current_area.enemy == None and not current_area.enemies and current_area.item != None:
+        item = current_area.item
+        if shared.claim(current_area, shared.ITEM_TAKEN):       # in a shared world, another player may have been quicker
+            pick_up(item)      # pick up the item
+            current_area.change(item = None)
+            respawn.schedule(current_area, save.ITEM_TAKEN)
+        else:
+            print(f"Someone else picked up {item.name} first!")
+    elif current_area.enemy != None or current_area.enemies:
+        print("You can't pick up items while in combat!")
+    elif current_area.complete:
+        print("You have already completed this area, no items to pick up.")
+    else:
+        print("There are no items to pick up in this area.")
+
+
+def pick_up(item):
+    """
+    Adds an item to the relevant inventory (weapon or armour)
+    But only if it is not already in the inventory
+    """
+    global weapon_inventory     
+    global armour_inventory
+
+    # Prevents duplicates
+    if item not in weapon_inventory or armour_inventory:
+        # Check if the item is a weapon or armour (not weapon) and add it to the respective inventory
+        if isinstance(item, Weapon):
+            weapon_inventory.append(item)
+        else:
+            armour_inventory.append(item)
+
+    print(f"You have picked up {item.name}")
+
+
+# ========================================
+# Player's turn in battle
+# ========================================
+@metrics.timed("timebound_call_seconds", "turn")
+def turn(hero, enemies):
+    hero.defend = False
+    realtime.start_turn(enemies)        # in a real time battle the player only has so long (see realtime.py)
+    try:
+        while True:
+            realtime.time_next_input()
+            prompt = input("Do you want to defend or attack? ").lower().strip()
+            if len(prompt) == 0:      # empty input
+                print("Please enter a command")
+            elif prompt == "defend":
+                hero.defend = True
+                hero.afflict(Buff("agility", DEFEND_AGILITY, duration = 1))
+                break
+            elif prompt == "attack":
+                hero.attack(choose_target(enemies))
+                break
+            else:
+                print("Invalid option! Choose to either attack or defend")
+    finally:
+        realtime.end_turn()
+
+
+def choose_target(enemies):
+    """
+    Asks the player which enemy to attack when there is more than one
+    Enemies are chosen by their code, shown next to their name
+    """
+    if len(enemies) == 1:
+        return enemies[0]
+
+    for code, enemy in enumerate(enemies):
+        print(f"[{code}] {enemy.name} (Group of {enemy.current_group_size}, HP: {enemy.hp})")
+    realtime.time_next_input()
+    prompt = input("Which enemy do you want to attack? ").strip()
+    if prompt.isdigit() and int(prompt) in range(len(enemies)):
+        return enemies[int(prompt)]
+    print("Invalid code! Choose one of the enemies above")
+    return choose_target(enemies)
+
+# ========================================
+# Check for enemy and handle battle
+# ========================================
+def check_enemy(enemy):
+    # The area's own enemy is fought together with any enemies spawned from its encounter table
+    enemies = list(current_area.enemies)
+    if current_area.enemy:
+        enemies.insert(0, current_area.enemy)
+
+    if enemies:      # if enemies exist, start battle
+            battle(player, enemies)
+    else:
+        pass    # no enemy, do nothing
+
+
+def battle(hero, enemies):
+    global run      # to update the run variable and exit the game if player is defeated
+    global turns
+    global cause_of_death
+
+    # Status effects (sickness, stuns, ...) are ticked from a queue that only lasts for this fight
+    effects = EffectQueue()
+    effects.join(hero)
+    for enemy in enemies:
+        effects.join(enemy)
+    metrics.count("timebound_fights_total")
+    watch = spectate.begin(hero, enemies)      # sends the fight to anyone watching, None when nobody can (see spectate.py)
+
+    while hero.hp > 0 and enemies:
+        started = metrics.clock()
+        turns += 1
+        os.system("cls")        # clear the console for a clean battle display
+        for enemy in enemies:
+            print(f"A wild {enemy.name} appears!")
+            display_enemy(enemy)
+
+        print("\nYour Turn:")
+        if hero.stunned:
+            print(f"{hero.name} is stunned and can't move!")
+            hero.defend = False     # a stunned player can't hold a defensive stance either
+            action = "is stunned"
+        else:
+            try:
+                turn(hero, enemies)
+                action = "defends" if hero.defend else "attacks"
+            except realtime.TimedOut:
+                print(f"\n{hero.name} took too long and hesitates!")
+                action = "hesitates"
+
+        # Check if all enemies were defeated before their turn
+        enemies = remove_fallen(enemies)
+        if not enemies:
+            metrics.observe("timebound_battle_turn_seconds", "", "", started)
+            if watch:
+                watch.record(action)
+                watch.end("wins")
+            win_battle(effects)
+            return
+        
+        # All remaining enemies take their turn in a single pass
+        print("\nEnemy Turn:")
+        for enemy in enemies:
+            if enemy.stunned:
+                print(f"{enemy.name} is stunned and can't move!")
+            else:
+                enemy.attack(hero)
+            if hero.hp <= 0:
+                break
+
+        # Status effects tick at the start of the next turn
+        effects.advance()
+
+        # Check if enemies succumbed to their effects
+        if hero.hp <= 0:
+            cause_of_death = ", ".join(enemy.name for enemy in enemies)
+        enemies = remove_fallen(enemies)
+        metrics.observe("timebound_battle_turn_seconds", "", "", started)
+        if watch:
+            watch.record(action)
+        if not enemies and hero.hp > 0:
+            if watch:
+                watch.end("wins")
+            win_battle(effects)
+            return
+
+        # Check if player is defeated
+        if player.hp <= 0:
+            if watch:
+                watch.end("has been defeated")
+            print("You have been defeated! Game Over!")
+            display_player()
+            effects.close()
+            run = False     # ends the main game loop, exitting the game when the player is defeated
+        input("Press enter to continue...")
+
+
+def remove_fallen(enemies):
+    """
+    Returns the enemies that are still standing
+    Announces the ones that have fallen
+    """
+    standing = []
+    for enemy in enemies:
+        if enemy.hp > 0:
+            standing.append(enemy)
+        else:
+            print(f"{enemy.name} has been defeated!")
+    return standing
+
+
+def win_battle(effects):
+    effects.close()                 # effects don't last beyond the fight
+    player.hp = player.armour.hp    # restore player's HP after defeating an enemy
+    enemy = current_area.enemy
+    if enemy and not shared.claim(current_area, shared.ENEMY_CLEARED):   # in a shared world, another player may have been quicker
+        print(f"Someone else defeated {enemy.name} here first!")
+    elif enemy:
+        respawn.schedule(current_area, save.ENEMY_CLEARED)
+
+    # Spawned enemies go back to their pools to be reused
+    for enemy in current_area.enemies:
+        enemy.pool.release(enemy)
+    current_area.change(enemy = None, enemies = [])
+    input("Press enter to continue...")
+
+
+# ========================================
+# Respawning
+# ========================================
+def bring_back(respawns):
+    # Puts back the items and enemies that respawn (see respawn.py)
+    for area, what in respawns:
+        if shared.enabled:
+            shared.release(area, what)      # back for every player
+        else:
+            area.bring_back(item = what == save.ITEM_TAKEN, enemy = what == save.ENEMY_CLEARED)
+
+
+# ========================================
+# Equipping items
+# ========================================
+def equip_weapon(code):
+    if code in range(len(weapon_inventory)):
+        player.weapon = weapon_inventory[code]      # the player's damage and crit chance follow the equipped weapon
+        print(f"You have equipped {player.weapon.name} as your weapon")
+    else:
+        print("Please provide a valid code for the weapon you want to equip")
+    display_player()
+
+
+def equip_armour(code):
+    if code in range(len(armour_inventory)):
+        player.armour = armour_inventory[code]      # the player's agility and damage reduction follow the equipped armour
+        player.hp = player.armour.hp                # update player's HP based on the equipped armour
+        print(f"You have equipped {player.armour.name} as your armour")
+    else:
+        print("Please provide a valid code for the armour you want to equip")
+    display_player()
+
+
+# ========================================
+# Finding things
+# ========================================
+@metrics.timed("timebound_call_seconds", "where")
+def where(name):
+    """
+    Shows the areas holding every weapon, armour or enemy whose name contains the given text
+    along with how many moves away they are
+    """
+    things = [thing for thing in locations if name in thing.name.lower()]
+    if isinstance(all_areas, LazyAreas):
+        things += [thing for thing in all_areas.content.values() if name in thing.name.lower() and thing not in things]
+    found = False
+    for thing in things:
+        areas = locate(thing)
+        if not areas:
+            continue
+        found = True
+        moves = distances(current_area.name, areas)
+        print(f"{thing.name}:")
+        for area in sorted(areas, key = lambda area: moves.get(area, float("inf"))):
+            if area in moves:
+                print(f"    {area} ({moves[area]} moves away)")
+            else:
+                print(f"    {area} (no way there within {ROUTE_LIMIT} moves)")
+    if not found:
+        print(f"Nothing called '{name}' can be found anywhere")
+
+
+# ========================================
+# Choosing gear
+# ========================================
+def next_enemy(name = None):
+    """
+    Finds the enemy to prepare for: the one in the current area, otherwise the nearest one along the way
+    With a name, the nearest enemy whose name contains it
+    Returns (enemy, moves away), moves is None for an enemy that can't be reached
+    """
+    if name is None:
+        for enemy in [current_area.enemy] + current_area.enemies:
+            if enemy and enemy.hp > 0:
+                return enemy, 0
+    enemies = [thing for thing in locations if isinstance(thing, Enemy)]
+    if isinstance(all_areas, LazyAreas):
+        enemies += [thing for thing in all_areas.content.values() if isinstance(thing, Enemy) and thing not in enemies]
+    if name is not None:
+        enemies = [enemy for enemy in enemies if name in enemy.name.lower()]
+
+    # The area holding each enemy, searched from the current area until the closest one is reached
+    holders = {}
+    for enemy in enemies:
+        for area in locate(enemy):
+            holders.setdefault(area, enemy)
+    for area, moves in distances(current_area.name, holders, first = True).items():
+        return holders[area], moves
+    if enemies:
+        return enemies[0], None
+    return None, None
+
+
+@metrics.timed("timebound_call_seconds", "optimize")
+def optimize(name = None):
+    """
+    Equips the weapon and armour from the inventories that give the best odds against the next enemy (see gear.py)
+    """
+    enemy, moves = next_enemy(name)
+    if enemy is None:
+        print(f"There is no enemy called '{name}' to prepare for" if name else "There are no enemies left to prepare for")
+        return
+    weapon, armour, turns_to_win, turns_lasted = gear.best_gear(weapon_inventory, armour_inventory, enemy)
+
+    if moves is None:
+        print(f"Preparing for {enemy.name} (Group of {enemy.current_group_size}), no way there within {ROUTE_LIMIT} moves")
+    elif moves:
+        print(f"Preparing for {enemy.name} (Group of {enemy.current_group_size}), {moves} moves away")
+    else:
+        print(f"Preparing for {enemy.name} (Group of {enemy.current_group_size})")
+    if weapon is player.weapon and armour is player.armour:
+        print(f"{weapon.name} and {armour.name} are already your best gear")
+    if weapon is not player.weapon:
+        equip_weapon(weapon_inventory.index(weapon))
+    if armour is not player.armour:
+        equip_armour(armour_inventory.index(armour))
+    print(f"Expected to win in {turns_to_win:.1f} turns and to last {turns_lasted:.1f} turns")
+
+
+# ========================================
+# Player movement
+# ========================================
+@metrics.timed("timebound_call_seconds", "move_player")
+def move_player(action):
+    """
+    Moves the player to a new area based on the action provided
+    Uses the global all_areas dictionary from the 'map' file so that the player can move between regions
+    """
+    global current_area     # to update the current_area variable defined outside this function
+
+    # check if the current area has an exit for the given action
+    if action in current_area.exits:
+        new_area_name = current_area.exits[action]      # get the name of the new area from the exits dictionary
+        current_area = all_areas[new_area_name]
+        current_area.spawn()        # enemies from the area's encounter table may appear
+        print(f"You go to {current_area.name}")
+        print(current_area.description)
+    else:
+        print("You can't go that way.")
+
+
+# ========================================
+# Action handling
+# ========================================
+def action():
+    """
+    Handles player input for actions in the game
+    Prompts the player for an action then splits the input into a list of individual words
+    This allows to check for the first word to determine the action and to check for additional parameters
+    If the input is empty, it prompts the player to enter a command
+    """
+    os.system("cls")
+    status()
+
+    prompt = input("What do you want to do? ").strip().lower().split()
+    started = metrics.clock()       # time the command from the moment it is entered
+
+    if len(prompt) == 0:        # empty input
+        print("Please enter a command")
+        action()
+    else:
+
+        # Movement
+        if prompt[0] ==  "go":
+            # Checks the length of the prompt to ensure a direction is specified
+            if len(prompt) < 2: 
+                print("Please specify a direction to go")
+                input("Press enter to continue... ")
+                action()
+
+            # Allows for multiple word commands
+            else:
+                if len(prompt) == 3:
+                    direction = f"{prompt[1]} {prompt[2]}"
+                    move_player(direction)
+                else:
+                    move_player(prompt[1])
+
+        # Pick up
+        elif prompt[0] == "pick":
+            check_item()
+
+        # Show inventories
+        elif prompt[0] == "show":
+            if prompt[1] == "weapons":
+                display_weapons()
+            elif prompt[1] == "armour":
+                display_armour()
+        
+        # Equip items
+        elif prompt[0] == "equip":
+            if len(prompt) < 3:     # checks if the command is complete
+                print("Invalid equip command. Use 'equip weapon <code>' or 'equip armour <code>'")
+                input("Press enter to continue... ")
+                action()
+            else:
+                if prompt[2].isdigit():     # checks if the code is a number
+
+                    # Converts the code into an integer
+                    code = int(prompt[2])   
+                    if prompt[1] == "weapon":
+                        equip_weapon(code)
+                    elif prompt[1] == "armour":
+                        equip_armour(code)
+                else:
+                    print("Invalid code. Check weapons ('show weapons') or armour (show armour') inventories for valid codes")
+                    input("Press enter to continue... ")
+                    action()
+
+        # Status
+        elif prompt[0] == "status":
+            display_player()
+
+        # Finding things
+        elif prompt[0] == "where":
+            if len(prompt) < 2:
+                print("Please specify what to look for (e.g. where bone)")
+            else:
+                where(" ".join(prompt[1:]))
+
+        # Choosing gear
+        elif prompt[0] == "optimize":
+            optimize(" ".join(prompt[1:]) or None)
+
+        # Commands
+        elif prompt[0] == "commands":
+            commands()
+
+        # Invalid command fallback
+        else:
+            print("Invalid action. Try 'commands' to see available actions")
+            input("Press enter to continue... ")
+            action()
+
+        metrics.observe_command(prompt[0], started)
+
+# ========================================
+# Saving and crash recovery
+# ========================================
+def save_game():
+    # Snapshots the session, the commands entered after this are kept in the save's journal
+    save.store(save.capture(player, weapon_inventory, armour_inventory, current_area, turns, time.time() - started_at))
+
+
+def load_game():
+    """
+    Restores a game that didn't finish (e.g. because the game crashed)
+    The last snapshot is loaded, then the commands entered after it are replayed from the journal
+    Returns True if a game was restored
+    """
+    try:
+        snapshot = save.recover()
+    except ValueError as error:
+        print(f"Your saved game could not be loaded: {error}")
+        input("Press enter to start a new game... ")
+        return False
+    if snapshot is None:
+        return False
+
+    resume(snapshot)
+    print(f"Welcome back, {player.name}!")
+    return True
+
+
+def resume(snapshot):
+    """
+    Carries on a game from a snapshot
+    Used for crash recovery and when a server hands a session over to another shard (see server.py)
+    """
+    global run
+    global current_area
+    global turns
+    global started_at
+    current_area = save.apply(snapshot, player, weapon_inventory, armour_inventory)
+    turns = snapshot.turns
+    started_at = time.time() - snapshot.seconds
+    run = True
+    profiler.attach(session_id, player.name)
+
+
+# ========================================
+# Establish Story
+# ========================================
+def start():
+    global run
+    global started_at
+    os.system("cls")
+    print("=" * 100)
+    print("You stumble upon a mysterious artefact during an archaeological excavation.")
+    print("As you touch it, the artefact activates, engulfing you in a bright light and you lose conciousness")
+    print("You hear echoes of soft whispers")
+    print("When you regain conciousness, you find yourself in the dense and untamed world of the Stone Age.")
+    print("You can't seem to remember your name, until you see the nametag on your chest")
+    print("=" * 100)
+
+    prompt = input("What does the nametag say? ")
+    check = input("Are you sure that's what the nametag says? ").lower().strip()
+    if check == "yes":
+        player.name = prompt
+        print(f"Welcome, {player.name}!")
+        input("Press enter to continue... ")
+        run = True
+        started_at = time.time()
+        metrics.count("timebound_sessions_total")
+        profiler.attach(session_id, player.name)    # allows this session to be profiled
+    else: 
+        print("Read it correctly then!")
+        input("Press enter to continue... ")
+        start()
+
+# ========================================
+# Game loop
+# ========================================
+def play(snapshot = None):
+    """
+    Plays one game from start to finish
+    snapshot = a game to carry on with instead (optional, see resume())
+    """
+    global run
+    global turns
+
+    # Picks up an unfinished game where it left off, otherwise starts a new one
+    if snapshot is not None:
+        resume(snapshot)
+    elif not load_game():
+        start()
+
+    # Main game loop
+    while run:
+        os.system("cls") 
+        shared.sync(current_area)       # in a shared world, other players may have changed the area
+        check_enemy(current_area.enemy)   
+
+        # Checks if the final area is complete and ends game
+        if all_areas[win_area].complete:
+            print("You have freed your souls from this cruel game! You win!")
+            print("Final Status:")
+            display_player()
+            input("Press enter to continue...")
+            run = False
+            break
+
+        # Checks if player died during battle
+        if not run:
+            break       # immediately break out of loop
+
+        # Snapshots the game every few seconds
+        if save.due():
+            save_game()
+
+        action()
+        turns += 1
+        bring_back(respawn.due(turns))
+        input("Press enter to continue... ")
+
+        # Checks if the current are has an enemy or item
+        # If not, area is complete
+        if current_area.enemy == None and not current_area.enemies and current_area.item == None and not current_area.complete:
+            current_area.change(complete = True)
+
+    # The game is over, so there is nothing left to recover
+    save.discard()
+
+    # Nobody is left to bring this game's respawns back to a shared world, so they come back now
+    if shared.enabled:
+        bring_back(respawn.drain())
+
+    # Records the finished run on the leaderboard
+    leaderboard.record(player,
+                       won = all_areas[win_area].complete,
+                       cause_of_death = cause_of_death,
+                       turns = turns,
+                       seconds = time.time() - started_at,
+                       areas_completed = sum(area.complete for area in all_areas.values())
+                       )
+
+
+# ========================================
+# New game
+# ========================================
+def new_game():
+    """
+    Resets everything for a new game without restarting the program
+    Only the areas and enemies that changed during the last game are restored (see world.py)
+    Randomly sized enemy groups get a new size
+    """
+    global run
+    global current_area
+    global turns
+    global started_at
+    global cause_of_death
+    world.reset()
+    shared.forget()
+    respawn.clear()
+    player.reset()
+    weapon_inventory[:] = [fists]
+    armour_inventory[:] = [clothes]
+    current_area = all_areas[start_area]
+    run = False
+    turns = 0
+    started_at = None
+    cause_of_death = None
+
+
+# ========================================
+# Reloading content
+# ========================================
+def reload_content(code = None):
+    """
+    Reads the weapons, armour, enemies and areas from disk again and carries this game on with them (see hotreload.py)
+    code = the content's compiled code, when it has already been read by another process
+    Raises hotreload.ReloadError if the new content can't be used, the game then carries on as it was
+    Returns the reload, with what changed and how long the game was held up
+    """
+    global current_area
+    update = hotreload.load(code)
+    current_area = update.swap(player, weapon_inventory, armour_inventory, current_area, turns)
+    if metrics.enabled:
+        metrics.histogram("timebound_reload_pause_seconds", "", "").observe(update.pause)
+    return update
+
+
+if __name__ == "__main__":
+    while True:
+        play()
+        again = input("Do you want to play again? ").lower().strip()
+        if again != "yes":
+            break
+        new_game()
@@ -1,696 +1,1014 @@
-from weapons import *
-from characters import *
-from armour import *
-
-# ===============================
-# Classes
-# ===============================
-class Area:
-    """
-    Represents a single location within the game
-    An Area has:
-        - a name (string)
-        - a description (string)
-        - exits (dictionary mapping directions to other area names)
-        - any items or enemies (optional)
-    """
-    def __init__(self,
-                 name: str,
-                 description: str,
-                 item: object = None,
-                 enemy: object = None
-                 ) -> None:
-        self.name = name
-        self.description = description
-        self.item = item
-        self.enemy = enemy
-        self.complete = False   # to track if the area has been completed
-        self.exits = {}         # dictionary of possible exits
-    
-    def add_exit(self,
-                 action,
-                 area_name
-                 ) -> None:
-        """
-        Adds a possible action from an Area to another Area
-        direction = the action to take (e.g., "north", "south", "hunt", "forage", etc.)
-        area_name = string name of the area to which the action leads to
-        """
-        self.exits[action] = area_name      
-
-
-class Region:
-    """
-    Groups together multiple Areas with a similar theme or location
-    Allows for better organisation of the game world
-    """
-    def __init__(self,
-                 name: str
-                 ) -> None:
-        self.name = name
-        self.areas = {}     # dictionary to hold areas by name
-
-    def add_area(self, 
-                 area: Area):
-        """
-        Adds an Area object to this Region's dictionary of areas
-        """
-        self.areas[area.name] = area    
-
-
-
-# ==============================
-# Global Area Registry
-# ==============================
-
-# This dictionary holds all areas across all regions
-# Allows movement between regions
-all_areas = {}
-
-
-def register_region(region):
-    """
-    Registers a region and its areas into the global area registry.
-    This allows the movement system to access all areas even across different regions
-    """
-    for area in region.areas.values():  # loop through each area in the region
-        all_areas[area.name] = area     # add the area to the global registry by name
-
-
-# ==============================
-# Region and Area definitions
-# ==============================
-#--------------- Savanna ---------------#
-savanna = Region(name = "Savanna")
-
-
-# define areas
-short_grasslands = Area(name = "Short Grasslands",
-                        description = "You are in a vast expanse of open grasslands. It is eerily quiet",
-                        )
-
-tall_grasslands = Area(name = "Tall Grasslands",
-                       description = "Your view is obstructed by tall grass, making it hard to see far. A faint rustling can be heard",
-                       item = bone
-                       )
-
-dense_grasslands = Area(name = "Dense Grasslands",
-                        description = "The grass is so thick here that you can barely move. You feel uneasy",
-                        item = fur,
-                        enemy = wolf
-                        )
-
-thornbush = Area(name = "Thornbush Thicket",
-                 description = "You push through a maze of dry, tangled thornbushes. The air smells of dust and something metallic",
-                 item = brambles,
-                 enemy = snakes
-                 )
-
-den = Area(name = "Wolf's Den",
-           description = "You have stumbled onto the gravesite of many skeletons",
-           item = spear,
-           enemy = wolves
-           )
-
-plains = Area(name = "Open Plains",
-              description = "The ground rumbles as dirt is swept up into the air",
-              item = deer_armour,
-              enemy = megaloceros
-              )
-
-tree = Area(name = "Savanna Tree",
-            description = "You go rest under a tree. You sit down but stumble as something cumbles under you. Human remains",
-            item = LST
-            )
-
-northern_grasslands = Area(name = "Northern Grasslands",
-                           description = "The ground is littered with carcasses rotting under the sun's heat",
-                           item = saber_armour,
-                           enemy = smilodon
-                           )
-
-southern_grasslands = Area(name = "Southern Grasslands",
-                           description = "Large acacia trees provide shade. Large bohemoths take them for food",
-                           item = sloth_armour,
-                           enemy = megatherium
-                           )
-
-watering_hole = Area(name = "Watering Hole",
-                     description = "A muddy watering hole surrounded by tall grass. The water is murky, but it is the only source of water for miles",
-                     item = alligator_armour,
-                     enemy = crocodile
-                     )
-
-
-
-# add exits
-short_grasslands.add_exit("north", "Woodland Edge")
-short_grasslands.add_exit("south", "Tall Grasslands")
-
-tall_grasslands.add_exit("north", "Short Grasslands")
-tall_grasslands.add_exit("hunt", "Dense Grasslands")
-tall_grasslands.add_exit("forage", "Foraging Ground")
-
-dense_grasslands.add_exit("north", "Tall Grasslands")
-dense_grasslands.add_exit("east", "Thornbush Thicket")
-dense_grasslands.add_exit("west", "Wolf's Den")
-dense_grasslands.add_exit("south", "Open Plains")
-
-thornbush.add_exit("west", "Dense Grasslands")
-thornbush.add_exit("straight", "Open Plains")
-
-den.add_exit("east", "Dense Grasslands")
-den.add_exit("straight", "Open Plains")
-
-plains.add_exit("back", "Dense Grasslands")
-plains.add_exit("north", "Northern Grasslands")
-plains.add_exit("south", "Southern Grasslands")
-plains.add_exit("rest", "Savanna Tree")
-
-northern_grasslands.add_exit("back", "Open Plains")
-northern_grasslands.add_exit("rest", "Savanna Tree")
-
-southern_grasslands.add_exit("back", "Open Plains")
-southern_grasslands.add_exit("rest", "Savanna Tree")
-
-tree.add_exit("explore", "Watering Hole")
-tree.add_exit("hunt", "Outer Region")
-tree.add_exit("forage", "Foraging Ground")
-
-# add areas to the region
-savanna.add_area(short_grasslands)  
-savanna.add_area(tall_grasslands)  
-savanna.add_area(dense_grasslands)
-savanna.add_area(thornbush)
-savanna.add_area(den)
-savanna.add_area(plains)
-savanna.add_area(tree)
-savanna.add_area(northern_grasslands)
-savanna.add_area(southern_grasslands)
-savanna.add_area(watering_hole)
-
-# adds the region's areas into the global dictionary
-register_region(savanna)
-
-#--------------- Jungle ---------------#
-jungle = Region(name = "Jungle")
-
-# define areas
-edge = Area(name = "Woodland Edge",
-            description = "Large jungle trees are looming ahead of you",
-            item = vine_armour
-            )
-
-dense_forest = Area(name = "Dense Forest",
-                    description = "The dense foliage only lets individual rays of light to penetrate",
-                    item = dagger
-                    )
-
-clearing = Area(name = "Open Clearing",
-                description = "The jungle opens up to a large empty space",
-                item = deer_armour,
-                enemy = megaloceros
-                )
-
-river = Area(name = "River",
-             description = "A small river flows. A log is placed up on two rocks, maybe as a bridge?"
-             )
-
-# add exits
-edge.add_exit("south", "Short Grasslands")
-edge.add_exit("forage", "Foraging Ground")
-edge.add_exit("deeper", "Dense Forest")
-
-dense_forest.add_exit("back", "Woodland Edge")
-dense_forest.add_exit("deeper", "Open Clearing")
-
-clearing.add_exit("back", "Dense Forest")
-clearing.add_exit("deeper", "River")
-
-river.add_exit("back", "Open Clearing")
-river.add_exit("bridge", "Secret Gate")
-river.add_exit("follow river", "Village Outskirts")
-
-# add areas to the region
-jungle.add_area(edge)
-jungle.add_area(dense_forest) 
-jungle.add_area(clearing)
-jungle.add_area(river)
-
-# adds the region's areas into the global dictionary
-register_region(jungle)
-
-#--------------- Ruins ---------------#
-ruins = Region(name = "Ruins")
-
-# define areas
-secret = Area(name = "Secret Gate",
-              description = "A door covered in vines... and maybe some other green critters",
-              item = poisoned_dagger,
-              enemy = snakes
-              )
-
-grounds = Area(name = "Open Grounds",
-               description = "An open sanctuary within the walls of the ruins"
-               )
-
-watch_tower = Area(name = "Watch Tower Remains",
-                   description = "The crumbled debris of what seems to be a watchtower",
-                   item = MCB
-                   )
-
-statues = Area(name = "Courtyard of Statues",
-               description = "Eerie humanoid statues. Some are even decorated!.. with some limbs missing",
-               item = chainmail_armour
-               )
-
-stairwell = Area(name = "Dusty Stairwell",
-                 description = "A small hole in the ground reveals itself to be a way to go deeper"
-                 )
-
-hall = Area(name = "Hall of Echoes",
-            description = "SOunD iS heAEaVily dISTorted. don't get caught off guard"
-            )
-
-passage = Area(name = "Passage",
-               description = "The passage is littered with bones. It's not too late to turn back",
-               item = LST,
-               enemy = smilodon
-               )
-
-chambers = Area(name = "Flooded Chambers",
-                description = "Stagnant water fills the room, softly rippling beneath the surface",
-                item = alligator_armour,
-                enemy = crocodile
-                )
-
-crypt = Area(name = "Collapsed Crypt",
-             description = "Stone slabs lie broken. The air is stale, heavy with a musk of territorial aggression.",
-             item = bear_armour,
-             enemy = cave_bear
-             )
-
-murals = Area(name = "Hall of Murals",
-              description = "The doorway crumples behind you. Walls are lined with tales of ancient beasts, roaring lizards, colied serpents, tusked giants.",
-              item = mammoth_armour
-              )
-
-garden = Area(name = "Pillar Garden",
-              description = "Dozens of pillars rise from the floor. Something darts between them, too fast to notice...",
-              item = bird_armour,
-              enemy = terror_bird
-              )
-
-archway = Area(name = "Obsidian Archway",
-               description = "A black arch stands alone. Deep grooves mark the floor, as if something dragged itself along, again and again",
-               item = snake_toothed,
-               enemy= titanoboa
-               )
-
-god = Area(name = "Statue of the Gods",
-           description = "A towering figure looms, arms stretched forward as if asking for an offering",
-           item = HOG,
-           enemy = mammoth
-           )
-
-sunken_arena = Area(name = "Sunken Arena",
-                    description = "An pit opens wide, walls marked with claws. The ground shakes. Something ancient stirs below",
-                    item = primal_armour,
-                    enemy = trex
-                    )
-
-
-# add exits
-secret.add_exit("back", "River")
-secret.add_exit("enter", "Open Grounds")
-
-grounds.add_exit("back", "Secret Gate")
-grounds.add_exit("left", "Watch Tower Remains")
-grounds.add_exit("straight", "Courtyard of Statues")
-grounds.add_exit("right", "Dusty Stairwell")
-
-watch_tower.add_exit("right", "Open Grounds")
-watch_tower.add_exit("straight", "Courtyard of Statues")
-
-statues.add_exit("back", "Open Grounds")
-statues.add_exit("left", "Watch Tower Remains")
-statues.add_exit("right", "Dusty Stairwell")
-
-stairwell.add_exit("back", "Open Grounds")
-stairwell.add_exit("enter", "Hall of Echoes")
-
-hall.add_exit("back", "Dusty Stairwell")
-hall.add_exit("deeper", "Passage")
-
-passage.add_exit("back", "Hall of Echoes")
-passage.add_exit("left", "Flooded Chambers")
-passage.add_exit("right", "Collapsed Crypt")
-
-chambers.add_exit("back", "Passage")
-chambers.add_exit("deeper", "Hall of Murals")
-
-crypt.add_exit("back", "Passage")
-crypt.add_exit("deeper", "Hall of Murals")
-
-murals.add_exit("left", "Pillar Garden")
-murals.add_exit("right", "Obsidian Archway")
-
-garden.add_exit("back", "Hall of Murals")
-garden.add_exit("deeper", "Statue of the Gods")
-
-archway.add_exit("back", "Hall of Murals")
-archway.add_exit("deeper", "Statue of the Gods")
-
-god.add_exit("deeper", "Sunken Arena")
-
-sunken_arena.add_exit("deeper", "$#*!!-^")
-
-# add areas to the region
-ruins.add_area(secret)
-ruins.add_area(grounds)
-ruins.add_area(watch_tower)
-ruins.add_area(statues)
-ruins.add_area(stairwell)
-ruins.add_area(hall)
-ruins.add_area(passage)
-ruins.add_area(chambers)
-ruins.add_area(crypt)
-ruins.add_area(murals)
-ruins.add_area(garden)
-ruins.add_area(archway)
-ruins.add_area(god)
-ruins.add_area(sunken_arena)
-
-# adds the region's areas into the global dictionary
-register_region(ruins)
-
-#--------------- Settlement ---------------#
-settlement = Region(name = "Settlement")
-
-# define areas
-foraging_ground = Area(name = "Foraging Ground",
-                       description = "While foraging for food, you run into a group of cavemen. They seem friendly",
-                       item = spear
-                       )
-
-outskirts = Area(name = "Village Outskirts",
-                 description = "A vast settlement, with structures more advanced than any caveman could create, fades into view",
-                 )
-
-gate = Area(name = "Village Gate",
-            description = "Guards fitted in attire unbefitting the time period greets you."
-            )
-
-guards = Area(name = "Guards",
-              description = "You learn that many face your same fate, brought back to the stone age from their own time periods"
-              )
-
-city_centre = Area(name = "City Centre",
-                   description = "You are in the middle of the settlement. Many paths and buildings await you",
-                   item = chainmail_armour
-                   )
-
-town_hall = Area(name = "Town Hall",
-                 description = "The town hall's marble walls amaze you, a feat of Ancient Greek architecture"
-                 )
-
-gallery = Area(name = "Gallery",
-               description = "You see records of familiar names - Greek Gods",
-               item = trident
-               )
-
-tavern = Area(name = "Tavern",
-              description = "The tavern is empty. People are gathering food for the settlement. Maybe you can look around while noone's watching"
-              )
-
-kitchen = Area(name = "Kitchen",
-               description = "The kitchen is up to medieval standards",
-               item = poisoned_dagger,
-               enemy = snakes
-               )
-
-barracks = Area(name = "Barracks",
-                description = "Where people train or learn the different techniques or weapons from different cultures"
-                )
-
-north_train = Area(name = "Northern Training Grounds",
-                   description = "Specialised in Nordic combat",
-                   item = battle_hammer
-                   )
-
-south_train = Area(name = "Southern Training Grounds",
-                   description = "Specialised in Ranged combat",
-                   item = MCB
-                   )
-
-east_train = Area(name = "Eastern Training Grounds",
-                  description = "Specialised in Asian combat",
-                  item = katana
-                  )
-
-west_train = Area(name = "Western Training Grounds",
-                  description = "Specialised in Medieval combat",
-                  item = sword
-                  )
-
-storage = Area(name = "Storage Room",
-               description = "An empty room filled with random junk",
-               item = fireworks
-               )
-
-
-# add exits
-foraging_ground.add_exit("follow tribe", "Village Outskirts")
-
-outskirts.add_exit("ahead", "Village Gate")
-
-gate.add_exit("enter", "City Centre")
-
-city_centre.add_exit("town hall", "Town Hall")
-city_centre.add_exit("tavern", "Tavern")
-city_centre.add_exit("barracks", "Barracks")
-city_centre.add_exit("storage", "Storage Room")
-city_centre.add_exit("hunt", "Outer Region")
-
-town_hall.add_exit("back", "City Centre")
-town_hall.add_exit("gallery", "Gallery")
-
-tavern.add_exit("back", "City Centre")
-tavern.add_exit("kitchen", "Kitchen")
-
-barracks.add_exit("back", "City Centre")
-barracks.add_exit("north", "Northern Training Grounds")
-barracks.add_exit("south", "Southern Training Grounds")
-barracks.add_exit("east", "Eastern Training Grounds")
-barracks.add_exit("west", "Western Training Grounds")
-
-storage.add_exit("back", "City Centre")
-
-kitchen.add_exit("back", "Tavern")
-
-north_train.add_exit("back", "Barracks")
-south_train.add_exit("back", "Barracks")
-east_train.add_exit("back", "Barracks")
-west_train.add_exit("back", "Barracks")
-
-gallery.add_exit("back", "Town Hall")
-
-
-# add areas to the region
-settlement.add_area(foraging_ground)
-settlement.add_area(outskirts)
-settlement.add_area(gate)
-settlement.add_area(guards)
-settlement.add_area(city_centre)
-settlement.add_area(town_hall)
-settlement.add_area(gallery)
-settlement.add_area(tavern)
-settlement.add_area(kitchen)
-settlement.add_area(barracks)
-settlement.add_area(north_train)
-settlement.add_area(south_train)
-settlement.add_area(east_train)
-settlement.add_area(west_train)
-settlement.add_area(storage)
-
-# adds the region's areas into the global dictionary
-register_region(settlement)
-
-#--------------- Hunting Grounds ---------------#
-hunting_grounds = Region(name = "Hunting Grounds")
-
-# define areas
-outer_grounds = Area(name = "Outer Region",
-                      description = "The outskirts of the native's traditional hunting grounds",
-                      item = bird_armour,
-                      enemy = terror_bird
-                      )
-
-main_grounds = Area(name = "Main Hunting Grounds",
-                    description = "Traditional hunting grounds of the natives. Rich with food and predators"
-                    )
-
-southern_grounds = Area(name = "Southern Hunting Grounds",
-                        description = "Massive stand alone trees are littered across the region",
-                        item = sloth_armour,
-                        enemy = megatherium
-                        )
-
-northern_grounds = Area(name = "Northern Hunting Grounds",
-                        description = "The weather sends chills down your spine. Snow falls as the earth quakes beneath your feet",
-                        item = mammoth_armour,
-                        enemy = mammoth
-                        )
-
-# add exits
-outer_grounds.add_exit("ahead", "Main Hunting Grounds")
-
-main_grounds.add_exit("back", "Outer Region")
-main_grounds.add_exit("north", "Northern Hunting Grounds")
-main_grounds.add_exit("south", "Southern Hunting Grounds")
-main_grounds.add_exit("explore", "Rival Hunting Grounds")
-
-northern_grounds.add_exit("south", "Main Hunting Grounds")
-northern_grounds.add_exit("east", "Rival Hunting Grounds")
-
-southern_grounds.add_exit("north", "Main Hunting Grounds")
-southern_grounds.add_exit("east", "Rival Hunting Grounds")
-
-# add areas to the region
-hunting_grounds.add_area(outer_grounds)
-hunting_grounds.add_area(main_grounds)
-hunting_grounds.add_area(southern_grounds)
-hunting_grounds.add_area(northern_grounds)
-
-# adds the region's areas into the global dictionary
-register_region(hunting_grounds)
-
-#--------------- Rival ---------------#
-rival = Region(name = "Rival Tribe")
-
-# define areas
-rival_hunting_ground = Area(name = "Rival Hunting Grounds",
-                            description = "You stumble into a different area. People in prehistoric attire surround you",
-                            item = scythe,
-                            enemy = tribe
-                            )
-
-rival_settlement = Area(name = "Rival Settlement",
-                        description = "You stumble into a village fit for the time period. Clay huts and campfires surround you",
-                        item = mammoth_blade
-                        )
-
-hut = Area(name = "Prehistoric Hut",
-           description = "A clay structure. There is noone home",
-           item = bear_armour
-           )
-
-tent = Area(name = "Chieftain's Tent",
-            description = "Somebody's home...",
-            item = prehistoric_slayer,
-            enemy = chieftain
-            )
-
-# add exits
-rival_hunting_ground.add_exit("back", "Main Hunting Grounds")
-rival_hunting_ground.add_exit("raid", "Rival Settlement")
-
-
-rival_settlement.add_exit("hut", "Prehistoric Hut")
-rival_settlement.add_exit("tent", "Chieftain's Tent")
-rival_settlement.add_exit("leave", "Rough Dirt Path")
-
-hut.add_exit("back", "Rival Settlement")
-
-tent.add_exit("back", "Rival Settlement")
-
-# add areas to the region
-rival.add_area(rival_hunting_ground)
-rival.add_area(rival_settlement)
-rival.add_area(hut)
-rival.add_area(tent)
-
-# adds the region's areas into the global dictionary
-register_region(rival)
-
-#--------------- Temple ---------------#
-temple = Region(name = "Temple")
-
-# define areas
-path = Area(name = "Rough Dirt Path",
-            description = "You follow a rough path, plants start to surround you, their shadows blocking out the sun. It's not too late to turn back",
-            )
-
-entrance = Area(name = "Temple Entrance",
-                description = "You hit a sudden wall. A structure, covered in vines and dirt seems to snarl back at you",
-                enemy = spack
-                )
-
-room = Area(name = "Mysterious Room",
-              description = "It stinks... Your foot hits something on the ground. The floor is littered with remains"
-              )
-
-remains = Area(name = "Remains",
-               description = "A mangled remain. You cannot tell apart ribs from teeth...",
-               item = chainsaw
-               )
-
-hallway = Area(name = "Spacious Hallways",
-               description = "You follow the wall until you find to openings. The left is shrouded in darkness. The right exudes a suspicious light"
-               )
-
-twilight = Area(name = "Twilight Room",
-                description = "The roof is torn open, rubble covers the ground... A pedestal is illuminated by the moon's gaze",
-                item = snake_toothed,
-                enemy = titanoboa
-                )
-
-pedestal = Area(name = "Pedestal",
-                description = "It glows under the moonlight",
-                item = HOG
-                )
-
-darkness = Area(name = "...",
-                description = "there is nothing here",
-                )
-
-arena = Area(name = "$#*!!-^",
-             description = "g<!dd |u<k",
-             enemy = mictlantecuhtli
-             )
-
-# add exits
-path.add_exit("deeper", "Temple Entrance")
-
-entrance.add_exit("deeper", "Mysterious Room")
-
-room.add_exit("inspect", "Remains")
-room.add_exit("deeper", "Spacious Hallways")
-
-remains.add_exit("deeper", "Spacious Hallways")
-
-hallway.add_exit("back", "Mysterious Room")
-hallway.add_exit("left", "...")
-hallway.add_exit("right", "Twilight Room")
-
-twilight.add_exit("back", "Spacious Hallways")
-twilight.add_exit("inspect", "Pedestal")
-
-pedestal.add_exit("back", "Spacious Hallways")
-
-darkness.add_exit("back", "$#*!!-^")
-darkness.add_exit("deeper", "$#*!!-^")
-
-# add areas to the region
-temple.add_area(path)
-temple.add_area(entrance)
-temple.add_area(room)
-temple.add_area(remains)
-temple.add_area(hallway)
-temple.add_area(twilight)
-temple.add_area(pedestal)
-temple.add_area(darkness)
-temple.add_area(arena)
-
-# adds the region's areas into the global dictionary
-register_region(temple)
\ No newline at end of file
+from weapons import *
+from characters import *
+from armour import *
+from encounters import *
+import os
+import json
+import world
+import tables
+
+# ===============================
+# Classes
+# ===============================
+class Area:
+    """
+    Represents a single location within the game
+    An Area has:
+        - a name (string)
+        - a description (string)
+        - exits (dictionary mapping directions to other area names)
+        - any items or enemies (optional)
+        - an encounter table of enemies that may appear on entry (optional)
+        - a respawn rule for bringing back its item and enemy once they are gone (optional)
+    """
+    def __init__(self,
+                 name: str,
+                 description: str,
+                 item: object = None,
+                 enemy: object = None,
+                 encounter: object = None,
+                 respawn: object = None
+                 ) -> None:
+        self.name = name
+        self.description = description
+        self.item = item
+        self.enemy = enemy
+        self.baseline = (item, enemy)     # what the area holds at the start of every game
+        self.encounter = encounter
+        self.respawn = respawn
+        self.enemies = []       # enemies spawned from the encounter table, waiting to be fought
+        self.complete = False   # to track if the area has been completed
+        self.exits = {}         # dictionary of possible exits
+        relocate(self, None, item)
+        relocate(self, None, enemy)
+
+    def change(self, **values) -> None:
+        """
+        Changes what the area holds: its item, enemy, enemies or complete (e.g. area.change(item = None))
+        Every change goes through here, so the world knows to restore this area for a new game
+        and the locations of its item and enemy stay up to date
+        """
+        world.mark(self)
+        for name, value in values.items():
+            if name == "item" or name == "enemy":
+                relocate(self, getattr(self, name), value)
+            setattr(self, name, value)
+
+    def restore(self) -> None:
+        """
+        Puts the area back the way it was at the start of the game
+        Called by world.reset() for a new game
+        """
+        item, enemy = self.baseline
+        for spawned in self.enemies:
+            spawned.pool.release(spawned)       # spawned enemies go back to their pool
+        self.change(item = item, enemy = enemy, enemies = [], complete = False)
+
+    def state(self) -> tuple:
+        # What a game changes about the area (see world.stash)
+        return (self.item, self.enemy, self.enemies, self.complete)
+
+    def set_state(self,
+                  state: tuple
+                  ) -> None:
+        item, enemy, self.enemies, self.complete = state
+        if all_areas.get(self.name) is self:    # areas replaced by a reload aren't in the locations any more
+            relocate(self, self.item, item)
+            relocate(self, self.enemy, enemy)
+        self.item = item
+        self.enemy = enemy
+
+    def start_over(self) -> None:
+        # Back to how the area started, leaving the spawned enemies to the game that stashed them (see world.stash)
+        item, enemy = self.baseline
+        self.set_state((item, enemy, [], False))
+
+    def bring_back(self,
+                   item: bool = False,
+                   enemy: bool = False
+                   ) -> None:
+        """
+        Puts the item and/or enemy the area started with back, e.g. when they respawn
+        An enemy comes back at full strength, and an area with something in it again is no longer complete
+        """
+        start_item, start_enemy = self.baseline
+        if item and start_item is not None and self.item is None:
+            self.change(item = start_item, complete = False)
+        if enemy and start_enemy is not None and self.enemy is None:
+            start_enemy.reset()
+            self.change(enemy = start_enemy, complete = False)
+
+    def add_exit(self,
+                 action,
+                 area_name
+                 ) -> None:
+        """
+        Adds a possible action from an Area to another Area
+        direction = the action to take (e.g., "north", "south", "hunt", "forage", etc.)
+        area_name = string name of the area to which the action leads to
+        """
+        self.exits[action] = area_name      
+
+    def spawn(self) -> None:
+        """
+        Rolls the area's encounter table when the player enters
+        Does nothing if the area has no table or its last encounter hasn't been fought yet
+        """
+        if self.encounter and not self.enemies:
+            enemies = self.encounter.roll()
+            if enemies:
+                self.change(enemies = enemies)
+
+
+class Region:
+    """
+    Groups together multiple Areas with a similar theme or location
+    Allows for better organisation of the game world
+    """
+    def __init__(self,
+                 name: str
+                 ) -> None:
+        self.name = name
+        self.areas = {}     # dictionary to hold areas by name
+
+    def add_area(self, 
+                 area: Area):
+        """
+        Adds an Area object to this Region's dictionary of areas
+        """
+        self.areas[area.name] = area    
+        area.region = self.name     # lets the server find which shard owns an area (see server.py)
+
+
+
+# ==============================
+# Global Area Registry
+# ==============================
+
+# This dictionary holds all areas across all regions
+# Allows movement between regions
+all_areas = {}
+
+# Every region by name, in the order they were registered
+regions = {}
+
+# Every weapon, armour and enemy, and the names of the areas holding it right now
+# Areas keep it up to date whenever their item or enemy changes (picked up, defeated, restored for a new game, ...)
+# so finding something never means going through every area
+locations = {}
+
+
+def relocate(area, old, new):
+    # Moves an area from the locations of what it held to the locations of what it holds now
+    if old is new:
+        return
+    if old is not None:
+        locations[old].discard(area.name)
+    if new is not None:
+        locations.setdefault(new, set()).add(area.name)
+
+
+def locate(thing):
+    """
+    Returns the names of the areas holding a weapon, armour or enemy
+    """
+    names = list(locations.get(thing, ()))
+    if isinstance(all_areas, LazyAreas):
+        names += all_areas.locations(thing)     # areas that haven't been built yet are still as they started
+    return names
+
+
+def exits_of(name):
+    # An area's exits, without building the area when the world comes from content tables
+    if isinstance(all_areas, LazyAreas) and not dict.__contains__(all_areas, name):
+        return all_areas.tables.area(all_areas.tables.find(name)).exits
+    return all_areas[name].exits
+
+
+# Routes longer than this aren't searched for
+ROUTE_LIMIT = 100
+
+
+def distances(start, targets, limit = ROUTE_LIMIT, first = False):
+    """
+    Finds how many moves it takes to get from one area to each of the target areas
+    Searches outwards from start, one move at a time, and stops as soon as every target has been reached
+    (or as soon as any target has been reached with first)
+    Returns a dictionary of target name -> moves, targets further than limit moves or out of reach are left out
+    """
+    remaining = set(targets)
+    found = {}
+    if start in remaining:
+        found[start] = 0
+        remaining.discard(start)
+        if first:
+            return found
+    seen = {start}
+    frontier = [start]
+    moves = 0
+    while frontier and remaining and moves < limit:
+        moves += 1
+        next_frontier = []
+        for name in frontier:
+            for target in exits_of(name).values():
+                if target not in seen and target in all_areas:
+                    seen.add(target)
+                    next_frontier.append(target)
+                    if target in remaining:
+                        found[target] = moves
+                        remaining.discard(target)
+        if first and found:
+            break
+        frontier = next_frontier
+    return found
+
+
+def register_region(region):
+    """
+    Registers a region and its areas into the global area registry.
+    This allows the movement system to access all areas even across different regions
+    """
+    regions[region.name] = region
+    for area in region.areas.values():  # loop through each area in the region
+        all_areas[area.name] = area     # add the area to the global registry by name
+
+
+class LazyAreas(dict):
+    """
+    all_areas when the world comes from a content tables file (see tables.py)
+    An Area is only built the first time it is looked up, areas nobody visits never take up memory
+    Like a dict, but values() and len() only cover the areas built so far
+    """
+    def __init__(self,
+                 tables: object
+                 ) -> None:
+        super().__init__()
+        self.tables = tables
+        self.content = {value.name: value for value in list(globals().values())
+                        if isinstance(value, (Weapon, Armour, Enemy))}
+        self.encounters = encounter_tables()
+        self.respawns = respawn_rules()
+        self.things = {}    # name -> code of each weapon, armour and enemy in the tables' locations
+        for code in range(tables.weapon_count + tables.armour_count + tables.enemy_count):
+            self.things[tables.thing_name(code)] = code
+
+    def locations(self, thing) -> list:
+        # Names of the areas that started with the thing and haven't been built yet
+        code = self.things.get(thing.name)
+        if code is None:
+            return []
+        names = (self.tables.area_name(area) for area in self.tables.locations(code))
+        return [name for name in names if not dict.__contains__(self, name)]
+
+    def __missing__(self, name):
+        code = self.tables.find(name)
+        if code < 0:
+            raise KeyError(name)
+        return self.build(code)
+
+    def __contains__(self, name):
+        return super().__contains__(name) or self.tables.find(name) >= 0
+
+    def at(self, code) -> Area:
+        # Looks an area up by its code (see content.py)
+        return self.get(self.tables.area_name(code)) or self.build(code)
+
+    def build(self, code) -> Area:
+        view = self.tables.area(code)
+        encounter = view.encounter
+        respawn = view.respawn
+
+        # A new area is part of the starting world, not a change to it
+        tracking = world.tracking
+        world.tracking = False
+        area = Area(name = view.name,
+                    description = view.description,
+                    item = self.content.get(view.item),
+                    enemy = self.content.get(view.enemy),
+                    encounter = self.encounters[encounter] if encounter >= 0 else None,
+                    respawn = self.respawns[respawn] if respawn >= 0 else None)
+        area.exits = view.exits
+        area.region = view.region
+        world.tracking = tracking
+        self[area.name] = area
+        return area
+
+
+def encounter_tables():
+    # Every encounter table defined in this file, in order
+    return [value for value in list(globals().values()) if isinstance(value, EncounterTable)]
+
+
+def respawn_rules():
+    # Every respawn rule defined in this file, in order
+    return [value for value in list(globals().values()) if isinstance(value, RespawnRule)]
+
+
+def load_tables(content):
+    """
+    Plays the world packed in content tables (see tables.py), areas are built as the player reaches them
+    Returns the names of the area the player starts in and of the area that wins the game
+    """
+    global all_areas
+    all_areas = LazyAreas(content)
+    regions.clear()
+    locations.clear()
+    for code in range(content.region_count):
+        name = content.region(code)
+        regions[name] = Region(name = name)     # names only, the areas are in the tables
+    return content.area_name(content.start), content.area_name(content.win)
+
+
+def load_world(path):
+    """
+    Replaces the shipped map with a world generated by worldgen.py
+    The file is read one region per line, so only the areas themselves are ever held in memory
+    Items and enemies are looked up by name and shared between areas, like the shipped map does
+    Returns the names of the area the player starts in and of the area that wins the game
+    """
+    content = {value.name: value for value in list(globals().values()) if isinstance(value, (Weapon, Armour, Enemy))}
+    with open(path, encoding = "utf-8") as file:
+        header = json.loads(file.readline())
+        if header.get("format") != "timebound-world":
+            raise ValueError(f"{path} is not a generated world")
+        if "win" not in header:
+            raise ValueError(f"{path} was generated by an older worldgen.py, generate it again")
+        all_areas.clear()
+        regions.clear()
+        locations.clear()
+        for line in file:
+            record = json.loads(line)
+            region = Region(name = record["name"])
+            for data in record["areas"]:
+                area = Area(name = data["name"],
+                            description = data["description"],
+                            item = content.get(data["item"]),
+                            enemy = content.get(data["enemy"]))
+                area.exits = data["exits"]
+                region.add_area(area)
+            register_region(region)
+    return header["start"], header.get("win")
+
+
+# ==============================
+# Encounter tables
+# ==============================
+# Predators and prey roaming the hunting grounds
+hunting_table = EncounterTable(chance = 75)
+hunting_table.add(wolf, weight = 5, min_count = 2, max_count = 4)
+hunting_table.add(megaloceros, weight = 3, min_count = 1, max_count = 2)
+hunting_table.add(smilodon, weight = 1)
+
+# Whatever lurks in the dark of the ruins
+ruins_table = EncounterTable(chance = 50)
+ruins_table.add(snakes, weight = 3)
+ruins_table.add(smilodon, weight = 1, min_count = 1, max_count = 2)
+
+
+# ==============================
+# Respawn rules
+# ==============================
+# The wildlife of the grasslands comes back a while after it has been dealt with
+wildlife_respawn = RespawnRule(delay = 40, jitter = 20, max_concurrent = 2)
+
+
+# ==============================
+# Region and Area definitions
+# ==============================
+# Not built when the world comes from content tables, the areas are built from the tables instead
+if not tables.loaded:
+    #--------------- Savanna ---------------#
+    savanna = Region(name = "Savanna")
+
+
+    # define areas
+    short_grasslands = Area(name = "Short Grasslands",
+                            description = "You are in a vast expanse of open grasslands. It is eerily quiet",
+                            )
+
+    tall_grasslands = Area(name = "Tall Grasslands",
+                           description = "Your view is obstructed by tall grass, making it hard to see far. A faint rustling can be heard",
+                           item = bone
+                           )
+
+    dense_grasslands = Area(name = "Dense Grasslands",
+                            description = "The grass is so thick here that you can barely move. You feel uneasy",
+                            item = fur,
+                            enemy = wolf,
+                            respawn = wildlife_respawn
+                            )
+
+    thornbush = Area(name = "Thornbush Thicket",
+                     description = "You push through a maze of dry, tangled thornbushes. The air smells of dust and something metallic",
+                     item = brambles,
+                     enemy = snakes,
+                     respawn = wildlife_respawn
+                     )
+
+    den = Area(name = "Wolf's Den",
+               description = "You have stumbled onto the gravesite of many skeletons",
+               item = spear,
+               enemy = wolves
+               )
+
+    plains = Area(name = "Open Plains",
+                  description = "The ground rumbles as dirt is swept up into the air",
+                  item = deer_armour,
+                  enemy = megaloceros
+                  )
+
+    tree = Area(name = "Savanna Tree",
+                description = "You go rest under a tree. You sit down but stumble as something cumbles under you. Human remains",
+                item = LST
+                )
+
+    northern_grasslands = Area(name = "Northern Grasslands",
+                               description = "The ground is littered with carcasses rotting under the sun's heat",
+                               item = saber_armour,
+                               enemy = smilodon
+                               )
+
+    southern_grasslands = Area(name = "Southern Grasslands",
+                               description = "Large acacia trees provide shade. Large bohemoths take them for food",
+                               item = sloth_armour,
+                               enemy = megatherium
+                               )
+
+    watering_hole = Area(name = "Watering Hole",
+                         description = "A muddy watering hole surrounded by tall grass. The water is murky, but it is the only source of water for miles",
+                         item = alligator_armour,
+                         enemy = crocodile
+                         )
+
+
+
+    # add exits
+    short_grasslands.add_exit("north", "Woodland Edge")
+    short_grasslands.add_exit("south", "Tall Grasslands")
+
+    tall_grasslands.add_exit("north", "Short Grasslands")
+    tall_grasslands.add_exit("hunt", "Dense Grasslands")
+    tall_grasslands.add_exit("forage", "Foraging Ground")
+
+    dense_grasslands.add_exit("north", "Tall Grasslands")
+    dense_grasslands.add_exit("east", "Thornbush Thicket")
+    dense_grasslands.add_exit("west", "Wolf's Den")
+    dense_grasslands.add_exit("south", "Open Plains")
+
+    thornbush.add_exit("west", "Dense Grasslands")
+    thornbush.add_exit("straight", "Open Plains")
+
+    den.add_exit("east", "Dense Grasslands")
+    den.add_exit("straight", "Open Plains")
+
+    plains.add_exit("back", "Dense Grasslands")
+    plains.add_exit("north", "Northern Grasslands")
+    plains.add_exit("south", "Southern Grasslands")
+    plains.add_exit("rest", "Savanna Tree")
+
+    northern_grasslands.add_exit("back", "Open Plains")
+    northern_grasslands.add_exit("rest", "Savanna Tree")
+
+    southern_grasslands.add_exit("back", "Open Plains")
+    southern_grasslands.add_exit("rest", "Savanna Tree")
+
+    tree.add_exit("explore", "Watering Hole")
+    tree.add_exit("hunt", "Outer Region")
+    tree.add_exit("forage", "Foraging Ground")
+
+    # add areas to the region
+    savanna.add_area(short_grasslands)  
+    savanna.add_area(tall_grasslands)  
+    savanna.add_area(dense_grasslands)
+    savanna.add_area(thornbush)
+    savanna.add_area(den)
+    savanna.add_area(plains)
+    savanna.add_area(tree)
+    savanna.add_area(northern_grasslands)
+    savanna.add_area(southern_grasslands)
+    savanna.add_area(watering_hole)
+
+    # adds the region's areas into the global dictionary
+    register_region(savanna)
+
+    #--------------- Jungle ---------------#
+    jungle = Region(name = "Jungle")
+
+    # define areas
+    edge = Area(name = "Woodland Edge",
+                description = "Large jungle trees are looming ahead of you",
+                item = vine_armour
+                )
+
+    dense_forest = Area(name = "Dense Forest",
+                        description = "The dense foliage only lets individual rays of light to penetrate",
+                        item = dagger
+                        )
+
+    clearing = Area(name = "Open Clearing",
+                    description = "The jungle opens up to a large empty space",
+                    item = deer_armour,
+                    enemy = megaloceros
+                    )
+
+    river = Area(name = "River",
+                 description = "A small river flows. A log is placed up on two rocks, maybe as a bridge?"
+                 )
+
+    # add exits
+    edge.add_exit("south", "Short Grasslands")
+    edge.add_exit("forage", "Foraging Ground")
+    edge.add_exit("deeper", "Dense Forest")
+
+    dense_forest.add_exit("back", "Woodland Edge")
+    dense_forest.add_exit("deeper", "Open Clearing")
+
+    clearing.add_exit("back", "Dense Forest")
+    clearing.add_exit("deeper", "River")
+
+    river.add_exit("back", "Open Clearing")
+    river.add_exit("bridge", "Secret Gate")
+    river.add_exit("follow river", "Village Outskirts")
+
+    # add areas to the region
+    jungle.add_area(edge)
+    jungle.add_area(dense_forest) 
+    jungle.add_area(clearing)
+    jungle.add_area(river)
+
+    # adds the region's areas into the global dictionary
+    register_region(jungle)
+
+    #--------------- Ruins ---------------#
+    ruins = Region(name = "Ruins")
+
+    # define areas
+    secret = Area(name = "Secret Gate",
+                  description = "A door covered in vines... and maybe some other green critters",
+                  item = poisoned_dagger,
+                  enemy = snakes
+                  )
+
+    grounds = Area(name = "Open Grounds",
+                   description = "An open sanctuary within the walls of the ruins"
+                   )
+
+    watch_tower = Area(name = "Watch Tower Remains",
+                       description = "The crumbled debris of what seems to be a watchtower",
+                       item = MCB
+                       )
+
+    statues = Area(name = "Courtyard of Statues",
+                   description = "Eerie humanoid statues. Some are even decorated!.. with some limbs missing",
+                   item = chainmail_armour
+                   )
+
+    stairwell = Area(name = "Dusty Stairwell",
+                     description = "A small hole in the ground reveals itself to be a way to go deeper"
+                     )
+
+    hall = Area(name = "Hall of Echoes",
+                description = "SOunD iS heAEaVily dISTorted. don't get caught off guard",
+                encounter = ruins_table
+                )
+
+    passage = Area(name = "Passage",
+                   description = "The passage is littered with bones. It's not too late to turn back",
+                   item = LST,
+                   enemy = smilodon
+                   )
+
+    chambers = Area(name = "Flooded Chambers",
+                    description = "Stagnant water fills the room, softly rippling beneath the surface",
+                    item = alligator_armour,
+                    enemy = crocodile
+                    )
+
+    crypt = Area(name = "Collapsed Crypt",
+                 description = "Stone slabs lie broken. The air is stale, heavy with a musk of territorial aggression.",
+                 item = bear_armour,
+                 enemy = cave_bear
+                 )
+
+    murals = Area(name = "Hall of Murals",
+                  description = "The doorway crumples behind you. Walls are lined with tales of ancient beasts, roaring lizards, colied serpents, tusked giants.",
+                  item = mammoth_armour
+                  )
+
+    garden = Area(name = "Pillar Garden",
+                  description = "Dozens of pillars rise from the floor. Something darts between them, too fast to notice...",
+                  item = bird_armour,
+                  enemy = terror_bird
+                  )
+
+    archway = Area(name = "Obsidian Archway",
+                   description = "A black arch stands alone. Deep grooves mark the floor, as if something dragged itself along, again and again",
+                   item = snake_toothed,
+                   enemy= titanoboa
+                   )
+
+    god = Area(name = "Statue of the Gods",
+               description = "A towering figure looms, arms stretched forward as if asking for an offering",
+               item = HOG,
+               enemy = mammoth
+               )
+
+    sunken_arena = Area(name = "Sunken Arena",
+                        description = "An pit opens wide, walls marked with claws. The ground shakes. Something ancient stirs below",
+                        item = primal_armour,
+                        enemy = trex
+                        )
+
+
+    # add exits
+    secret.add_exit("back", "River")
+    secret.add_exit("enter", "Open Grounds")
+
+    grounds.add_exit("back", "Secret Gate")
+    grounds.add_exit("left", "Watch Tower Remains")
+    grounds.add_exit("straight", "Courtyard of Statues")
+    grounds.add_exit("right", "Dusty Stairwell")
+
+    watch_tower.add_exit("right", "Open Grounds")
+    watch_tower.add_exit("straight", "Courtyard of Statues")
+
+    statues.add_exit("back", "Open Grounds")
+    statues.add_exit("left", "Watch Tower Remains")
+    statues.add_exit("right", "Dusty Stairwell")
+
+    stairwell.add_exit("back", "Open Grounds")
+    stairwell.add_exit("enter", "Hall of Echoes")
+
+    hall.add_exit("back", "Dusty Stairwell")
+    hall.add_exit("deeper", "Passage")
+
+    passage.add_exit("back", "Hall of Echoes")
+    passage.add_exit("left", "Flooded Chambers")
+    passage.add_exit("right", "Collapsed Crypt")
+
+    chambers.add_exit("back", "Passage")
+    chambers.add_exit("deeper", "Hall of Murals")
+
+    crypt.add_exit("back", "Passage")
+    crypt.add_exit("deeper", "Hall of Murals")
+
+    murals.add_exit("left", "Pillar Garden")
+    murals.add_exit("right", "Obsidian Archway")
+
+    garden.add_exit("back", "Hall of Murals")
+    garden.add_exit("deeper", "Statue of the Gods")
+
+    archway.add_exit("back", "Hall of Murals")
+    archway.add_exit("deeper", "Statue of the Gods")
+
+    god.add_exit("deeper", "Sunken Arena")
+
+    sunken_arena.add_exit("deeper", "$#*!!-^")
+
+    # add areas to the region
+    ruins.add_area(secret)
+    ruins.add_area(grounds)
+    ruins.add_area(watch_tower)
+    ruins.add_area(statues)
+    ruins.add_area(stairwell)
+    ruins.add_area(hall)
+    ruins.add_area(passage)
+    ruins.add_area(chambers)
+    ruins.add_area(crypt)
+    ruins.add_area(murals)
+    ruins.add_area(garden)
+    ruins.add_area(archway)
+    ruins.add_area(god)
+    ruins.add_area(sunken_arena)
+
+    # adds the region's areas into the global dictionary
+    register_region(ruins)
+
+    #--------------- Settlement ---------------#
+    settlement = Region(name = "Settlement")
+
+    # define areas
+    foraging_ground = Area(name = "Foraging Ground",
+                           description = "While foraging for food, you run into a group of cavemen. They seem friendly",
+                           item = spear
+                           )
+
+    outskirts = Area(name = "Village Outskirts",
+                     description = "A vast settlement, with structures more advanced than any caveman could create, fades into view",
+                     )
+
+    gate = Area(name = "Village Gate",
+                description = "Guards fitted in attire unbefitting the time period greets you."
+                )
+
+    guards = Area(name = "Guards",
+                  description = "You learn that many face your same fate, brought back to the stone age from their own time periods"
+                  )
+
+    city_centre = Area(name = "City Centre",
+                       description = "You are in the middle of the settlement. Many paths and buildings await you",
+                       item = chainmail_armour
+                       )
+
+    town_hall = Area(name = "Town Hall",
+                     description = "The town hall's marble walls amaze you, a feat of Ancient Greek architecture"
+                     )
+
+    gallery = Area(name = "Gallery",
+                   description = "You see records of familiar names - Greek Gods",
+                   item = trident
+                   )
+
+    tavern = Area(name = "Tavern",
+                  description = "The tavern is empty. People are gathering food for the settlement. Maybe you can look around while noone's watching"
+                  )
+
+    kitchen = Area(name = "Kitchen",
+                   description = "The kitchen is up to medieval standards",
+                   item = poisoned_dagger,
+                   enemy = snakes
+                   )
+
+    barracks = Area(name = "Barracks",
+                    description = "Where people train or learn the different techniques or weapons from different cultures"
+                    )
+
+    north_train = Area(name = "Northern Training Grounds",
+                       description = "Specialised in Nordic combat",
+                       item = battle_hammer
+                       )
+
+    south_train = Area(name = "Southern Training Grounds",
+                       description = "Specialised in Ranged combat",
+                       item = MCB
+                       )
+
+    east_train = Area(name = "Eastern Training Grounds",
+                      description = "Specialised in Asian combat",
+                      item = katana
+                      )
+
+    west_train = Area(name = "Western Training Grounds",
+                      description = "Specialised in Medieval combat",
+                      item = sword
+                      )
+
+    storage = Area(name = "Storage Room",
+                   description = "An empty room filled with random junk",
+                   item = fireworks
+                   )
+
+
+    # add exits
+    foraging_ground.add_exit("follow tribe", "Village Outskirts")
+
+    outskirts.add_exit("ahead", "Village Gate")
+
+    gate.add_exit("enter", "City Centre")
+
+    city_centre.add_exit("town hall", "Town Hall")
+    city_centre.add_exit("tavern", "Tavern")
+    city_centre.add_exit("barracks", "Barracks")
+    city_centre.add_exit("storage", "Storage Room")
+    city_centre.add_exit("hunt", "Outer Region")
+
+    town_hall.add_exit("back", "City Centre")
+    town_hall.add_exit("gallery", "Gallery")
+
+    tavern.add_exit("back", "City Centre")
+    tavern.add_exit("kitchen", "Kitchen")
+
+    barracks.add_exit("back", "City Centre")
+    barracks.add_exit("north", "Northern Training Grounds")
+    barracks.add_exit("south", "Southern Training Grounds")
+    barracks.add_exit("east", "Eastern Training Grounds")
+    barracks.add_exit("west", "Western Training Grounds")
+
+    storage.add_exit("back", "City Centre")
+
+    kitchen.add_exit("back", "Tavern")
+
+    north_train.add_exit("back", "Barracks")
+    south_train.add_exit("back", "Barracks")
+    east_train.add_exit("back", "Barracks")
+    west_train.add_exit("back", "Barracks")
+
+    gallery.add_exit("back", "Town Hall")
+
+
+    # add areas to the region
+    settlement.add_area(foraging_ground)
+    settlement.add_area(outskirts)
+    settlement.add_area(gate)
+    settlement.add_area(guards)
+    settlement.add_area(city_centre)
+    settlement.add_area(town_hall)
+    settlement.add_area(gallery)
+    settlement.add_area(tavern)
+    settlement.add_area(kitchen)
+    settlement.add_area(barracks)
+    settlement.add_area(north_train)
+    settlement.add_area(south_train)
+    settlement.add_area(east_train)
+    settlement.add_area(west_train)
+    settlement.add_area(storage)
+
+    # adds the region's areas into the global dictionary
+    register_region(settlement)
+
+    #--------------- Hunting Grounds ---------------#
+    hunting_grounds = Region(name = "Hunting Grounds")
+
+    # define areas
+    outer_grounds = Area(name = "Outer Region",
+                          description = "The outskirts of the native's traditional hunting grounds",
+                          item = bird_armour,
+                          enemy = terror_bird
+                          )
+
+    main_grounds = Area(name = "Main Hunting Grounds",
+                        description = "Traditional hunting grounds of the natives. Rich with food and predators",
+                        encounter = hunting_table
+                        )
+
+    southern_grounds = Area(name = "Southern Hunting Grounds",
+                            description = "Massive stand alone trees are littered across the region",
+                            item = sloth_armour,
+                            enemy = megatherium
+                            )
+
+    northern_grounds = Area(name = "Northern Hunting Grounds",
+                            description = "The weather sends chills down your spine. Snow falls as the earth quakes beneath your feet",
+                            item = mammoth_armour,
+                            enemy = mammoth
+                            )
+
+    # add exits
+    outer_grounds.add_exit("ahead", "Main Hunting Grounds")
+
+    main_grounds.add_exit("back", "Outer Region")
+    main_grounds.add_exit("north", "Northern Hunting Grounds")
+    main_grounds.add_exit("south", "Southern Hunting Grounds")
+    main_grounds.add_exit("explore", "Rival Hunting Grounds")
+
+    northern_grounds.add_exit("south", "Main Hunting Grounds")
+    northern_grounds.add_exit("east", "Rival Hunting Grounds")
+
+    southern_grounds.add_exit("north", "Main Hunting Grounds")
+    southern_grounds.add_exit("east", "Rival Hunting Grounds")
+
+    # add areas to the region
+    hunting_grounds.add_area(outer_grounds)
+    hunting_grounds.add_area(main_grounds)
+    hunting_grounds.add_area(southern_grounds)
+    hunting_grounds.add_area(northern_grounds)
+
+    # adds the region's areas into the global dictionary
+    register_region(hunting_grounds)
+
+    #--------------- Rival ---------------#
+    rival = Region(name = "Rival Tribe")
+
+    # define areas
+    rival_hunting_ground = Area(name = "Rival Hunting Grounds",
+                                description = "You stumble into a different area. People in prehistoric attire surround you",
+                                item = scythe,
+                                enemy = tribe
+                                )
+
+    rival_settlement = Area(name = "Rival Settlement",
+                            description = "You stumble into a village fit for the time period. Clay huts and campfires surround you",
+                            item = mammoth_blade
+                            )
+
+    hut = Area(name = "Prehistoric Hut",
+               description = "A clay structure. There is noone home",
+               item = bear_armour
+               )
+
+    tent = Area(name = "Chieftain's Tent",
+                description = "Somebody's home...",
+                item = prehistoric_slayer,
+                enemy = chieftain
+                )
+
+    # add exits
+    rival_hunting_ground.add_exit("back", "Main Hunting Grounds")
+    rival_hunting_ground.add_exit("raid", "Rival Settlement")
+
+
+    rival_settlement.add_exit("hut", "Prehistoric Hut")
+    rival_settlement.add_exit("tent", "Chieftain's Tent")
+    rival_settlement.add_exit("leave", "Rough Dirt Path")
+
+    hut.add_exit("back", "Rival Settlement")
+
+    tent.add_exit("back", "Rival Settlement")
+
+    # add areas to the region
+    rival.add_area(rival_hunting_ground)
+    rival.add_area(rival_settlement)
+    rival.add_area(hut)
+    rival.add_area(tent)
+
+    # adds the region's areas into the global dictionary
+    register_region(rival)
+
+    #--------------- Temple ---------------#
+    temple = Region(name = "Temple")
+
+    # define areas
+    path = Area(name = "Rough Dirt Path",
+                description = "You follow a rough path, plants start to surround you, their shadows blocking out the sun. It's not too late to turn back",
+                )
+
+    entrance = Area(name = "Temple Entrance",
+                    description = "You hit a sudden wall. A structure, covered in vines and dirt seems to snarl back at you",
+                    enemy = spack
+                    )
+
+    room = Area(name = "Mysterious Room",
+                  description = "It stinks... Your foot hits something on the ground. The floor is littered with remains"
+                  )
+
+    remains = Area(name = "Remains",
+                   description = "A mangled remain. You cannot tell apart ribs from teeth...",
+                   item = chainsaw
+                   )
+
+    hallway = Area(name = "Spacious Hallways",
+                   description = "You follow the wall until you find to openings. The left is shrouded in darkness. The right exudes a suspicious light"
+                   )
+
+    twilight = Area(name = "Twilight Room",
+                    description = "The roof is torn open, rubble covers the ground... A pedestal is illuminated by the moon's gaze",
+                    item = snake_toothed,
+                    enemy = titanoboa
+                    )
+
+    pedestal = Area(name = "Pedestal",
+                    description = "It glows under the moonlight",
+                    item = HOG
+                    )
+
+    darkness = Area(name = "...",
+                    description = "there is nothing here",
+                    )
+
+    arena = Area(name = "$#*!!-^",
+                 description = "g<!dd |u<k",
+                 enemy = mictlantecuhtli
+                 )
+
+    # add exits
+    path.add_exit("deeper", "Temple Entrance")
+
+    entrance.add_exit("deeper", "Mysterious Room")
+
+    room.add_exit("inspect", "Remains")
+    room.add_exit("deeper", "Spacious Hallways")
+
+    remains.add_exit("deeper", "Spacious Hallways")
+
+    hallway.add_exit("back", "Mysterious Room")
+    hallway.add_exit("left", "...")
+    hallway.add_exit("right", "Twilight Room")
+
+    twilight.add_exit("back", "Spacious Hallways")
+    twilight.add_exit("inspect", "Pedestal")
+
+    pedestal.add_exit("back", "Spacious Hallways")
+
+    darkness.add_exit("back", "$#*!!-^")
+    darkness.add_exit("deeper", "$#*!!-^")
+
+    # add areas to the region
+    temple.add_area(path)
+    temple.add_area(entrance)
+    temple.add_area(room)
+    temple.add_area(remains)
+    temple.add_area(hallway)
+    temple.add_area(twilight)
+    temple.add_area(pedestal)
+    temple.add_area(darkness)
+    temple.add_area(arena)
+
+    # adds the region's areas into the global dictionary
+    register_region(temple)
+
+
+# ==============================
+# Generated worlds
+# ==============================
+# TIMEBOUND_WORLD=<path> plays a world made by worldgen.py instead of the one above
+# TIMEBOUND_TABLES=<path> plays the world packed in a content tables file (see tables.py)
+if tables.loaded:
+    start_area, win_area = load_tables(tables.loaded)
+else:
+    start_area = "Short Grasslands"
+    win_area = arena.name       # the game is won once this area is complete
+    if os.environ.get("TIMEBOUND_WORLD"):
+        start_area, win_area = load_world(os.environ["TIMEBOUND_WORLD"])
+
+# Everything above is the starting world, only changes from here on need undoing for a new game
+world.capture()
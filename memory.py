@@ -0,0 +1,298 @@
+import gc
+import os
+import sys
+import time
+import types
+import signal
+import threading
+import tracemalloc
+
+# ==============================
+# Settings
+# ==============================
+# kill -USR2 <pid> (or python memory.py <pid>) writes a report of what is holding on to memory in a running game
+# or server (see server.py, which gathers one from every session) to TIMEBOUND_MEMORY_DIR
+# The report attributes the objects each subsystem keeps alive to it, and lists the top allocation sites
+# Allocations are only traced between two reports: the first starts tracing, the second lists the sites
+# allocated in between and stops it again
+# PYTHONTRACEMALLOC=1 traces allocations from the very start instead, and tracing is then never stopped
+#
+# Cost:
+#     - idle: nothing, allocations aren't traced and nothing is measured until a report is asked for
+#     - a report: one walk over the objects of every subsystem, and a tracemalloc snapshot while tracing
+#     - while tracing: every allocation is recorded by tracemalloc, typically making the game 2-3 times slower
+output_dir = os.environ.get("TIMEBOUND_MEMORY_DIR", ".")
+
+# Sessions (or processes) and allocation sites listed in a report
+TOP = int(os.environ.get("TIMEBOUND_MEMORY_TOP", "10"))
+
+# Allocation sites each process sends along for a report made from several processes, they are added up across them
+SITES = 100
+
+# Where each subsystem's objects are found, as "module.attribute"
+# Everything reachable from them is counted for the subsystem, except the modules, classes and functions they refer to
+# and content that belongs to another subsystem (e.g. the weapon the hero holds is content, not the hero's)
+# Each object is counted once, for the first subsystem that reaches it, in this order
+SUBSYSTEMS = {
+    "hero": ("main.player", "main.weapon_inventory", "main.armour_inventory"),
+    "enemies": ("content.ENEMIES", "encounters.pools"),
+    "world": ("map.all_areas", "world.changed", "world.randomized", "respawn.wheel", "shared.seen"),
+    "caches": ("hotreload.caches", "hotreload.history", "map.locations", "engine.items", "profiler.labels"),
+    "buffers": ("save.replay", "save.journal", "engine.events", "profiler.profilers", "sys.stdout"),
+    "content": ("content.WEAPONS", "content.ARMOURS"),
+}
+
+# Objects a walk never goes into
+SHARED = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType,
+          types.CodeType, types.FrameType)
+
+# Tracing started with PYTHONTRACEMALLOC is left on
+from_start = tracemalloc.is_tracing()
+since = time.time() if from_start else None     # when tracing started
+
+
+# ==============================
+# Measuring
+# ==============================
+def resolve(path):
+    # The object at "module.attribute", None if the module isn't loaded in this process
+    module, _, attribute = path.partition(".")
+    return getattr(sys.modules.get(module), attribute, None)
+
+
+def owners() -> dict:
+    """
+    Returns the id of every weapon, armour, enemy and built area -> the subsystem it is counted in
+    """
+    content = sys.modules.get("content")
+    areas = getattr(sys.modules.get("map"), "all_areas", {})
+    owner = {id(area): "world" for area in areas.values()}      # only the areas built so far with content tables
+    if content:
+        owner.update((id(enemy), "enemies") for enemy in content.ENEMIES)
+        owner.update((id(item), "content") for item in content.WEAPONS + content.ARMOURS)
+    return owner
+
+
+def walk(roots, name, owner, seen):
+    """
+    Adds up the size of everything reachable from roots that hasn't been seen yet
+    Returns (bytes, number of objects)
+    """
+    size = objects = 0
+    stack = [root for root in roots if root is not None]
+    while stack:
+        thing = stack.pop()
+        if id(thing) in seen or isinstance(thing, SHARED) or owner.get(id(thing), name) != name:
+            continue
+        seen.add(id(thing))
+        size += sys.getsizeof(thing)
+        objects += 1
+        stack.extend(gc.get_referents(thing))
+    return size, objects
+
+
+def retained() -> dict:
+    """
+    Returns subsystem -> (bytes, number of objects) it keeps alive in this process
+    """
+    owner = owners()
+    seen = set()
+    return {name: walk([resolve(path) for path in paths], name, owner, seen) for name, paths in SUBSYSTEMS.items()}
+
+
+def size_of(roots):
+    """
+    Returns (bytes, number of objects) reachable from roots, leaving out content
+    """
+    return walk(roots, None, owners(), set())
+
+
+def private_memory():
+    """
+    Returns the bytes of memory only this process uses, None where the system doesn't say (only Linux does)
+    Pages a forked process still shares with the process it was forked from aren't counted,
+    so a shard's figure is what it costs on top of the router
+    """
+    try:
+        with open("/proc/self/smaps_rollup") as file:
+            return sum(int(line.split()[1]) for line in file if line.startswith("Private_")) * 1024
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def site(frame) -> str:
+    # "file:line", files outside the game keep their whole path
+    path = os.path.abspath(frame.filename)
+    if os.path.dirname(path) == os.path.dirname(os.path.abspath(__file__)):
+        path = os.path.basename(path)
+    return f"{path}:{frame.lineno}"
+
+
+def allocation_sites(limit = SITES):
+    """
+    Returns the biggest sites of memory allocated since tracing started and still held, as (site, bytes, blocks),
+    or None when allocations aren't being traced
+    """
+    if not tracemalloc.is_tracing():
+        return None
+    snapshot = tracemalloc.take_snapshot().filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),
+                                                          tracemalloc.Filter(False, __file__)))
+    return [(site(stat.traceback[0]), stat.size, stat.count) for stat in snapshot.statistics("lineno")[:limit]]
+
+
+def trace(on):
+    """
+    Starts or stops tracing allocations
+    """
+    global since
+    if on and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        since = time.time()
+    elif not on and tracemalloc.is_tracing() and not from_start:
+        tracemalloc.stop()
+        since = None
+
+
+def tracing_next() -> bool:
+    # Whether allocations are traced after the next report, every report switches tracing on or off
+    return from_start or not tracemalloc.is_tracing()
+
+
+def measure(tracing = None) -> dict:
+    """
+    Measures this process
+    tracing = True or False starts or stops tracing allocations once it has been measured
+    """
+    report = {"pid": os.getpid(), "private": private_memory(), "retained": retained(),
+              "sites": allocation_sites(), "since": since}
+    if tracing is not None:
+        trace(tracing)
+    return report
+
+
+# ==============================
+# Report
+# ==============================
+def amount(size) -> str:
+    # Bytes in the largest unit that keeps them above 1
+    for unit in ("B", "KB", "MB"):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def render(reports, tracing) -> str:
+    """
+    Returns the report for one or more processes, given as (name, measure()) pairs
+    tracing = whether allocations are traced from now on
+    """
+    names = []
+    for _, report in reports:
+        names += [name for name in report["retained"] if name not in names]
+    totals = {name: [0, 0] for name in names}
+    for _, report in reports:
+        for name, (size, objects) in report["retained"].items():
+            totals[name][0] += size
+            totals[name][1] += objects
+    private = [report["private"] for _, report in reports if report["private"] is not None]
+
+    lines = [f"Memory report, {time.strftime('%Y-%m-%d %H:%M:%S')}, {len(reports)} processes",
+             "Retained: what each subsystem's objects keep alive, every object counted once for the first subsystem to reach it",
+             "Private: memory only the process uses, pages still shared with the process it was forked from aren't counted",
+             "",
+             f"Retained {amount(sum(size for size, _ in totals.values()))}, "
+             f"private {amount(sum(private)) if private else 'unknown'}",
+             ""]
+
+    lines.append("Retained by subsystem:")
+    for name, (size, objects) in totals.items():
+        lines.append(f"  {name: <10}{amount(size): >12}{objects: >10} objects")
+    lines.append("")
+
+    def total(report):
+        return sum(size for size, _ in report["retained"].values())
+    lines.append(f"Top {TOP} by retained memory:")
+    lines.append(f"  {'': <14}{'pid': >8}{'retained': >12}{'private': >12}" + "".join(f"{name: >12}" for name in names))
+    for name, report in sorted(reports, key = lambda pair: total(pair[1]), reverse = True)[:TOP]:
+        held = amount(report["private"]) if report["private"] is not None else "-"
+        columns = [amount(report["retained"][subsystem][0]) if subsystem in report["retained"] else "-" for subsystem in names]
+        lines.append(f"  {name: <14}{report['pid']: >8}{amount(total(report)): >12}{held: >12}"
+                     + "".join(f"{column: >12}" for column in columns))
+    lines.append("")
+
+    # Sites are added up across processes
+    sites = {}
+    traced = [report for _, report in reports if report["sites"] is not None]
+    for report in traced:
+        for where, size, blocks in report["sites"]:
+            entry = sites.setdefault(where, [0, 0, 0])
+            entry[0] += size
+            entry[1] += blocks
+            entry[2] += 1
+    if traced:
+        started = min(report["since"] or time.time() for report in traced)
+        lines.append(f"Top {TOP} allocation sites of memory still held, traced since "
+                     f"{time.strftime('%H:%M:%S', time.localtime(started))}"
+                     + ("" if tracing else ", tracing has now stopped") + ":")
+        for where, (size, blocks, processes) in sorted(sites.items(), key = lambda item: item[1][0], reverse = True)[:TOP]:
+            lines.append(f"  {amount(size): >12}{blocks: >10} blocks{processes: >6} processes  {where}")
+    elif tracing:
+        lines.append("Allocations weren't being traced, tracing has started: the next report lists the top sites allocated from now on")
+    else:
+        lines.append("Allocations aren't being traced")
+    return "\n".join(lines) + "\n"
+
+
+def write(reports, tracing) -> str:
+    """
+    Writes a report (see render) to a file in output_dir
+    Written to a temporary file first, so a reader never sees half a report
+    Returns the path of the file
+    """
+    path = os.path.join(output_dir, f"memory-{os.getpid()}-{int(time.time() * 1000)}.txt")
+    with open(path + ".tmp", "w") as file:
+        file.write(render(reports, tracing))
+    os.replace(path + ".tmp", path)
+    return path
+
+
+def handle_signal(signum, frame):
+    # SIGUSR2 writes a report for this process, and switches tracing on or off
+    reports = [("game", measure(tracing_next()))]
+    write(reports, tracemalloc.is_tracing())
+
+
+# Signals are only available on some platforms (not on Windows), the server replaces this with its own report
+if hasattr(signal, "SIGUSR2") and threading.current_thread() is threading.main_thread():
+    signal.signal(signal.SIGUSR2, handle_signal)
+
+
+# ==============================
+# Command line
+# ==============================
+def request(pid, timeout = 10.0):
+    """
+    Asks a running game or server for a report and waits for it to be written
+    Returns the report, None if none was written in time
+    """
+    prefix = f"memory-{pid}-"
+    before = {name for name in os.listdir(output_dir) if name.startswith(prefix)}
+    os.kill(pid, signal.SIGUSR2)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        for name in sorted(os.listdir(output_dir)):
+            if name.startswith(prefix) and name.endswith(".txt") and name not in before:
+                with open(os.path.join(output_dir, name)) as file:
+                    return file.read()
+        time.sleep(0.1)
+    return None
+
+
+# python memory.py <pid>
+if __name__ == "__main__":
+    if len(sys.argv) == 2 and sys.argv[1].isdigit():
+        report = request(int(sys.argv[1]))
+        print(report if report is not None else "No report was written, is the game running with the same TIMEBOUND_MEMORY_DIR?")
+    else:
+        print("Usage: python memory.py <pid of a game or server>")
@@ -0,0 +1,250 @@
+import os
+import time
+import atexit
+import bisect
+import builtins
+import functools
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+# ==============================
+# Settings
+# ==============================
+# Metrics are only collected when TIMEBOUND_METRICS is set (e.g. TIMEBOUND_METRICS=1)
+# When they are off, timed() hands back the original function, so there is no overhead at all
+enabled = os.environ.get("TIMEBOUND_METRICS", "") not in ("", "0")
+
+# Optional exports: a local port serving /metrics and/or a file written when the game exits
+port = os.environ.get("TIMEBOUND_METRICS_PORT")
+dump_file = os.environ.get("TIMEBOUND_METRICS_FILE")
+
+# Upper bounds of the histogram buckets, in seconds
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Metric families and their help text
+FAMILIES = {
+    "timebound_command_seconds": "Time spent handling a command entered at the action prompt",
+    "timebound_battle_turn_seconds": "Time spent on one round of a battle (player turn, enemy turns and effects)",
+    "timebound_call_seconds": "Time spent in game functions",
+    "timebound_render_seconds": "Time spent drawing a screen or table",
+    "timebound_reload_pause_seconds": "Time the game was held up swapping in reloaded content",
+}
+
+# Commands get their own label, anything else is counted as "invalid" so the number of labels stays fixed
+COMMANDS = ("go", "pick", "show", "equip", "status", "where", "optimize", "commands")
+
+
+# ==============================
+# Classes
+# ==============================
+class Histogram:
+    """
+    A latency histogram with fixed buckets
+    Observing a value only increments a counter in a preallocated list
+    A Histogram has:
+        - counts (list of integers, one per bucket plus one for anything above the last bucket)
+        - a running sum of every observed value (float)
+        - a count of observed values (integer)
+    """
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self,
+                seconds: float
+                ) -> None:
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+
+# ==============================
+# Registry
+# ==============================
+# (family, label name, label value) -> Histogram
+histograms = {}
+
+# counter name -> [help text, value]
+counters = {
+    "timebound_sessions_total": ["Games started", 0],
+    "timebound_fights_total": ["Battles started", 0],
+}
+
+# Total time spent blocked in input(), taken away from every timing so that the player's thinking time isn't counted
+# Kept per thread: a server's shard plays each of its games in a thread of its own (see server.py)
+class Waited(threading.local):
+    seconds = 0.0
+
+
+waited = Waited()
+
+
+def histogram(family, label, value):
+    """
+    Returns the histogram for a family and label, creating it the first time it is used
+    """
+    key = (family, label, value)
+    if key not in histograms:
+        histograms[key] = Histogram()
+    return histograms[key]
+
+
+def clock():
+    """
+    Returns a "busy" clock reading: wall time minus the time spent waiting for input
+    The difference between two readings is the time the game actually spent working
+    """
+    return time.perf_counter() - waited.seconds
+
+
+def observe(family, label, value, started):
+    """
+    Records the busy time since started (a reading from clock())
+    """
+    if enabled:
+        histogram(family, label, value).observe(clock() - started)
+
+
+def observe_command(command, started):
+    """
+    Records the time taken by a command from the action prompt
+    """
+    if enabled:
+        if command not in COMMANDS:
+            command = "invalid"
+        histogram("timebound_command_seconds", "command", command).observe(clock() - started)
+
+
+def count(name):
+    """
+    Increments one of the counters
+    """
+    counters[name][1] += 1
+
+
+def timed(family, value):
+    """
+    Decorator that records every call to a function in a histogram
+    When metrics are off the function is returned unchanged
+    """
+    def decorate(function):
+        if not enabled:
+            return function
+        label = "view" if family == "timebound_render_seconds" else "function"
+        target = histogram(family, label, value)
+
+        counts = target.counts
+        perf_counter = time.perf_counter
+        bisect_left = bisect.bisect_left
+
+        # The histogram update is written out here rather than calling observe(), this wrapper runs on every call
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            started = perf_counter() - waited.seconds
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed = perf_counter() - waited.seconds - started
+                counts[bisect_left(BUCKETS, elapsed)] += 1
+                target.sum += elapsed
+                target.count += 1
+        return wrapper
+    return decorate
+
+
+def timed_input(prompt = ""):
+    """
+    Replacement for input() that keeps track of the time spent waiting on the player
+    """
+    started = time.perf_counter()
+    try:
+        return original_input(prompt)
+    finally:
+        waited.seconds += time.perf_counter() - started
+
+
+# ==============================
+# Export
+# ==============================
+def render():
+    """
+    Returns every metric in the Prometheus text exposition format
+    """
+    lines = []
+    for name, (help_text, value) in counters.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} counter")
+        lines.append(f"{name} {value}")
+
+    for family, help_text in FAMILIES.items():
+        lines.append(f"# HELP {family} {help_text}")
+        lines.append(f"# TYPE {family} histogram")
+        for (name, label, value), hist in sorted(histograms.items()):
+            if name != family:
+                continue
+            labels = f'{label}="{value}"' if label else ""
+            sep = "," if labels else ""
+
+            # Prometheus buckets are cumulative
+            total = 0
+            for bound, bucket_count in zip(BUCKETS, hist.counts):
+                total += bucket_count
+                lines.append(f'{family}_bucket{{{labels}{sep}le="{bound}"}} {total}')
+            lines.append(f'{family}_bucket{{{labels}{sep}le="+Inf"}} {hist.count}')
+            lines.append(f"{family}_sum{{{labels}}} {hist.sum}")
+            lines.append(f"{family}_count{{{labels}}} {hist.count}")
+    return "\n".join(lines) + "\n"
+
+
+def dump(path):
+    """
+    Writes every metric to a file
+    Written to a temporary file first, so a reader never sees half a dump
+    """
+    temp = path + ".tmp"
+    with open(temp, "w") as file:
+        file.write(render())
+    os.replace(temp, path)
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """
+    Serves the metrics at /metrics
+    """
+    def do_GET(self):
+        if self.path != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass    # keep requests from printing over the game
+
+
+def serve(port):
+    """
+    Serves the metrics on a local port from a background thread
+    """
+    server = HTTPServer(("127.0.0.1", int(port)), MetricsHandler)
+    thread = threading.Thread(target = server.serve_forever, daemon = True)
+    thread.start()
+    return server
+
+
+# ==============================
+# Start up
+# ==============================
+original_input = builtins.input
+
+if enabled:
+    builtins.input = timed_input
+    if port:
+        serve(port)
+    if dump_file:
+        atexit.register(dump, dump_file)
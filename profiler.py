@@ -0,0 +1,259 @@
+import os
+import sys
+import time
+import atexit
+import signal
+import builtins
+import threading
+from collections import Counter
+
+# ==============================
+# Settings
+# ==============================
+# TIMEBOUND_PROFILE=1 starts profiling as soon as a session starts
+# Profiling can also be switched on and off while the game runs, with toggle() or by sending the process SIGUSR1
+start_on = os.environ.get("TIMEBOUND_PROFILE", "") not in ("", "0")
+
+# Samples per second and where the collapsed stack files are written
+rate = float(os.environ.get("TIMEBOUND_PROFILE_RATE", "100"))
+output_dir = os.environ.get("TIMEBOUND_PROFILE_DIR", ".")
+
+# Deepest stack recorded per sample, frames below this are left out
+MAX_DEPTH = 64
+
+# Only frames from the game's own files are recorded
+GAME_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+# code object -> name used in the stacks (None for code outside the game), worked out once per function
+labels = {}
+
+
+def label(code):
+    """
+    Returns "module.function" for code from the game's files, or None for anything else
+    """
+    path = os.path.abspath(code.co_filename)
+    if os.path.dirname(path) != GAME_DIR:
+        return None
+    module = os.path.basename(path)[:-3]
+    return f"{module}.{code.co_qualname}"
+
+
+# ==============================
+# Classes
+# ==============================
+class Profiler:
+    """
+    A sampling profiler for one session
+    A background thread looks at the session's call stack rate times a second and counts how often each stack is seen
+    Samples taken while the session is waiting for input are skipped, so only game logic is counted
+    A Profiler has:
+        - the session it profiles, and the player's name (both used to name the output file)
+        - the id of the thread running the session
+        - a rate (samples per second)
+        - stacks (Counter mapping collapsed stacks to the number of samples)
+
+    Cost:
+        - off: nothing, no thread runs and input() is left alone
+        - on: one stack walk of at most MAX_DEPTH frames per sample, done while holding the GIL
+          at the default 100 samples a second this is a few hundred microseconds of work per second (well under 1%)
+          memory grows with the number of distinct stacks, not with the number of samples
+    """
+    def __init__(self,
+                 session: object,
+                 name: str,
+                 thread_id: int,
+                 rate: float = rate
+                 ) -> None:
+        self.session = session
+        self.name = name
+        self.thread_id = thread_id
+        self.rate = rate
+        self.stacks = Counter()
+        self.samples = 0
+        self.waiting = False        # True while the session is blocked in input()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self) -> None:
+        self.stop_event.clear()
+        self.thread = threading.Thread(target = self.run, daemon = True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+
+    def run(self) -> None:
+        # Sampling loop, runs in the profiler's own thread
+        interval = 1 / self.rate
+        while not self.stop_event.wait(interval):
+            self.sample()
+
+    def sample(self) -> None:
+        # Records the session's current stack, outermost frame first
+        if self.waiting:
+            return
+        frame = sys._current_frames().get(self.thread_id)
+        names = []
+        while frame and len(names) < MAX_DEPTH:
+            code = frame.f_code
+            if code not in labels:
+                labels[code] = label(code)
+            if labels[code]:
+                names.append(labels[code])
+            frame = frame.f_back
+        if names:
+            names.reverse()
+            self.stacks[";".join(names)] += 1
+            self.samples += 1
+
+    def write(self) -> str:
+        """
+        Writes the samples in the collapsed stack format read by flamegraph tools
+        (one line per stack: frames separated by ';', a space, then the number of samples)
+        Returns the path of the file
+        """
+        name = "".join(c if c.isalnum() else "_" for c in self.name)    # names come from players
+        path = os.path.join(output_dir, f"profile-{name}-{self.session}-{int(time.time())}.folded")
+        with open(path, "w") as file:
+            for stack, samples in self.stacks.most_common():
+                file.write(f"{stack} {samples}\n")
+        return path
+
+
+# ==============================
+# Sessions
+# ==============================
+# Sessions are told apart by an id of their own (players can share a name)
+# session -> Profiler currently running for it
+profilers = {}
+
+# session -> (id of the thread running it, player's name), for every session that can be profiled
+sessions = {}
+
+# thread id -> session, the reverse of sessions
+thread_sessions = {}
+
+# Held while SIGUSR1 toggles every session, so two signals in a row don't toggle them at the same time
+toggling = threading.Lock()
+
+# input() as it was before profiling started, and whether profiled_input() is part of the input() chain
+previous_input = None
+installed = False
+
+
+def profiled_input(prompt = ""):
+    """
+    Replacement for input() while profiling, marks the session as waiting so samples are skipped
+    Passes straight through for sessions that aren't being profiled
+    """
+    profiler = profilers.get(thread_sessions.get(threading.get_ident()))
+    if profiler:
+        profiler.waiting = True
+    try:
+        return previous_input(prompt)
+    finally:
+        if profiler:
+            profiler.waiting = False
+
+
+def attach(session, name):
+    """
+    Registers the calling thread as the thread running a session
+    session = the session's id, name = the player's name
+    Profiling starts straight away if TIMEBOUND_PROFILE is set
+    """
+    thread_id = threading.get_ident()
+    sessions[session] = (thread_id, name)
+    thread_sessions[thread_id] = session
+    if start_on:
+        start(session)
+
+
+def detach(session):
+    """
+    Forgets a session that has ended, writing its samples if it was being profiled
+    """
+    stop(session)
+    thread_id, name = sessions.pop(session, (None, None))
+    thread_sessions.pop(thread_id, None)
+
+
+def start(session, rate = rate):
+    """
+    Starts profiling a session
+    """
+    global previous_input, installed
+    if session in profilers or session not in sessions:
+        return
+    if not installed:
+        previous_input = builtins.input
+        builtins.input = profiled_input
+        installed = True
+    thread_id, name = sessions[session]
+    profilers[session] = Profiler(session, name, thread_id, rate)
+    profilers[session].start()
+
+
+def stop(session):
+    """
+    Stops profiling a session and writes its samples
+    Returns the path of the written file, or None if the session wasn't being profiled
+    """
+    profiler = profilers.pop(session, None)
+    if profiler is None:
+        return None
+    profiler.stop()
+    if not profilers:
+        unhook()
+    return profiler.write()
+
+
+def unhook():
+    """
+    Takes profiled_input() back out of the input() chain once nothing is profiled
+    If something has wrapped input() since (the save journal), it can't be unpicked from under that wrapper,
+    so it stays in the chain as a pass-through and the next start() reuses it instead of wrapping again
+    """
+    global installed
+    if installed and builtins.input is profiled_input:
+        builtins.input = previous_input
+        installed = False
+
+
+def toggle(session):
+    """
+    Switches profiling of a session on or off
+    """
+    if session in profilers:
+        return stop(session)
+    start(session)
+
+
+def stop_all():
+    for session in list(profilers):
+        stop(session)
+
+
+def toggle_all():
+    with toggling:
+        for session in list(sessions):
+            toggle(session)
+
+
+def handle_signal(signum, frame):
+    # SIGUSR1 toggles profiling of every session attached to this process
+    # Stopping a profiler waits for its thread and writes a file, neither of which belongs in a signal handler,
+    # so the toggling is handed to a thread of its own
+    threading.Thread(target = toggle_all, daemon = True).start()
+
+
+# Signals are only available on some platforms (not on Windows)
+if hasattr(signal, "SIGUSR1") and threading.current_thread() is threading.main_thread():
+    signal.signal(signal.SIGUSR1, handle_signal)
+
+atexit.register(stop_all)
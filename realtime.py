@@ -0,0 +1,61 @@
+import os
+import time
+import threading
+
+# ==============================
+# Real time battles
+# ==============================
+# TIMEBOUND_TURN_SECONDS=<seconds> gives players on a server (see server.py) that long for their whole turn:
+# choosing to attack or defend, their target and their attack, however many tries it takes
+# A player who takes any longer hesitates, and the enemies take their turn anyway
+# Faster enemies leave less time: the time is divided by 1 + the agility of the fastest enemy / 100
+#
+# The server times every session's answers itself, from one timer wheel per shard,
+# so a timed battle costs no thread or sleep of its own
+# Games played at a console are never timed
+
+SECONDS = float(os.environ.get("TIMEBOUND_TURN_SECONDS", "0"))
+
+enabled = False     # set by the server when SECONDS is given
+deadline = None     # seconds the next input() has to be answered in, taken by the server's input()
+
+
+class TimedOut(Exception):
+    """
+    Raised by input() when the player didn't answer in time
+    """
+
+
+def turn_seconds(enemies):
+    # Time to answer in against these enemies
+    return SECONDS * 100 / (100 + max(enemy.agility for enemy in enemies))
+
+
+class Turn(threading.local):
+    # When the player's turn runs out (time.monotonic()), None outside a real time turn
+    # Kept per thread: a server's shard plays each of its games in a thread of its own (see server.py)
+    ends = None
+
+
+turn = Turn()
+
+
+def start_turn(enemies):
+    """
+    Starts the clock on the player's turn in a real time battle, does nothing otherwise
+    """
+    if enabled:
+        turn.ends = time.monotonic() + turn_seconds(enemies)
+
+
+def end_turn():
+    turn.ends = None
+
+
+def time_next_input():
+    """
+    Puts what is left of the player's turn on the next input(), does nothing outside a real time turn
+    """
+    global deadline
+    if turn.ends is not None:
+        deadline = max(0.0, turn.ends - time.monotonic())
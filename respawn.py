@@ -0,0 +1,183 @@
+import map
+
+# ==============================
+# Respawning
+# ==============================
+# Areas with a respawn rule (see encounters.RespawnRule) get their item and enemy back some turns after
+# they were picked up or defeated
+# Respawns wait in a hierarchical timer wheel, ticked once per game turn, so however many are waiting,
+# scheduling one is O(1) and a turn only costs the respawns that come due, no area is ever scanned
+# The game decides what bringing something back means (see main.bring_back), e.g. in a shared world (see shared.py)
+# it clears the area's shared record, bringing the content back for everyone
+
+
+# ==============================
+# Classes
+# ==============================
+class TimerWheel:
+    """
+    Hierarchical timer wheel
+    Level 0 has one slot per tick, each slot of a higher level spans a whole turn of the level below
+    A timer goes straight into the slot of the lowest level that reaches its due tick
+    When a level comes round, the next slot of the level above is emptied into it (a cascade),
+    so every timer moves down at most once per level before it expires
+    Timers further away than the whole wheel wait in the top level and are placed again on every cascade
+    A TimerWheel has:
+        - the current tick (integer)
+        - slots per level and number of levels (integers, defaults to 64 and 4: about 16.7 million ticks ahead)
+        - the slots themselves (lists of (due tick, timer))
+    """
+    def __init__(self,
+                 slots: int = 64,
+                 levels: int = 4
+                 ) -> None:
+        self.now = 0
+        self.slots = slots
+        self.levels = levels
+        self.spans = [slots ** level for level in range(levels + 1)]     # ticks covered by one slot of each level
+        self.wheels = [[[] for _ in range(slots)] for _ in range(levels)]
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def schedule(self,
+                 due: int,
+                 timer
+                 ) -> None:
+        # Adds a timer that expires on the due tick (on the next tick if that has already passed)
+        self.count += 1
+        self.place(max(due, self.now + 1), timer)
+
+    def place(self, due, timer) -> None:
+        ahead = due - self.now
+        level = 0
+        while level < self.levels - 1 and ahead >= self.spans[level + 1]:
+            level += 1
+        at = min(due, self.now + self.spans[self.levels] - 1)      # beyond the wheel: the top level's last slot
+        self.wheels[level][at // self.spans[level] % self.slots].append((due, timer))
+
+    def advance(self,
+                to: int
+                ) -> list:
+        """
+        Ticks the wheel forward up to the given tick
+        Returns the timers that expired, in the order they came due
+        """
+        expired = []
+        while self.now < to:
+            self.now += 1
+            for level in range(self.levels - 1, 0, -1):
+                if self.now % self.spans[level] == 0:
+                    slot = self.wheels[level][self.now // self.spans[level] % self.slots]
+                    timers = slot[:]
+                    slot.clear()
+                    for due, timer in timers:
+                        self.place(due, timer)
+            slot = self.wheels[0][self.now % self.slots]
+            if slot:
+                expired += [timer for due, timer in slot]
+                self.count -= len(slot)
+                slot.clear()
+        return expired
+
+    def pending(self) -> list:
+        # Every timer still waiting, as (due tick, timer)
+        return [entry for wheel in self.wheels for slot in wheel for entry in slot]
+
+    def clear(self,
+              now: int = 0
+              ) -> None:
+        for wheel in self.wheels:
+            for slot in wheel:
+                slot.clear()
+        self.count = 0
+        self.now = now
+
+
+# ==============================
+# Scheduling
+# ==============================
+wheel = TimerWheel()    # (area name, what comes back) for every respawn waiting, ticked by game turns
+
+
+def schedule(area, what) -> None:
+    """
+    Schedules something an area has just lost (its item or enemy, see save.ITEM_TAKEN and save.ENEMY_CLEARED) to come back
+    Does nothing for areas without a respawn rule, or when the rule already has as many respawns waiting as it allows
+    """
+    rule = area.respawn
+    if rule is None or (rule.max_concurrent and rule.waiting >= rule.max_concurrent):
+        return
+    add(area.name, what, wheel.now + rule.roll_delay())
+
+
+def add(name, what, due) -> None:
+    count(name, 1)
+    wheel.schedule(due, (name, what))
+
+
+def count(name, change) -> None:
+    # Counts a respawn in or out of its area's rule, areas or rules a reload has removed since are left out
+    rule = map.all_areas[name].respawn if name in map.all_areas else None
+    if rule is not None:
+        rule.waiting += change
+
+
+def due(turns) -> list:
+    """
+    Moves on to the given turn
+    Returns (area, what comes back) for every respawn due by then
+    """
+    respawns = []
+    for name, what in wheel.advance(turns):
+        if name in map.all_areas:
+            count(name, -1)
+            respawns.append((map.all_areas[name], what))
+    return respawns
+
+
+def pending() -> list:
+    # Every respawn still waiting, as (area name, what comes back, due turn)
+    return [(name, what, due) for due, (name, what) in wheel.pending()]
+
+
+def drain() -> list:
+    """
+    Returns (area, what comes back) for every respawn still waiting, and stops waiting for them
+    """
+    respawns = [(map.all_areas[name], what) for name, what, due in pending() if name in map.all_areas]
+    clear(wheel.now)
+    return respawns
+
+
+def stash() -> TimerWheel:
+    """
+    Takes the respawns of the game being played out, for another game to be swapped in (see world.stash)
+    Returns them, for unstash()
+    """
+    global wheel
+    stashed = wheel
+    count_waiting(-1)
+    wheel = TimerWheel()
+    return stashed
+
+
+def unstash(stashed) -> None:
+    # Puts a game's respawns taken out by stash() back
+    global wheel
+    wheel = stashed
+    count_waiting(1)
+
+
+def count_waiting(change) -> None:
+    # Counts every respawn on the wheel in or out of its rule
+    for name, what, due in pending():
+        count(name, change)
+
+
+def clear(turns = 0) -> None:
+    # Drops every waiting respawn, for a new game or one being resumed at the given turn
+    for name, what, due in pending():
+        count(name, -1)
+    wheel.clear(turns)
@@ -0,0 +1,465 @@
+import os
+import time
+import random
+import struct
+from array import array
+import builtins
+from collections import deque
+import content
+import world
+import respawn
+import encounters
+from map import Area
+
+# ==============================
+# Settings
+# ==============================
+SAVE_PATH = os.environ.get("TIMEBOUND_SAVE", "timebound.sav")
+SNAPSHOT_INTERVAL = float(os.environ.get("TIMEBOUND_SAVE_INTERVAL", "5"))     # seconds between snapshots
+
+# Servers keep their sessions' snapshots themselves (see server.py) and turn saving off
+enabled = True
+
+MAGIC = b"TBS"
+VERSION = 4
+
+# Flags stored for each area that differs from how it started
+ITEM_TAKEN = 1
+ENEMY_CLEARED = 2
+COMPLETE = 4
+
+
+# ==============================
+# Classes
+# ==============================
+class Snapshot:
+    """
+    Everything needed to put a session back where it was, with content referred to by ID (see content.py)
+    A Snapshot has:
+        - a sequence number (integer, counts up with every snapshot, ties the journal to its snapshot)
+        - a random seed (integer, the game's random numbers are reseeded with it when the snapshot is taken)
+        - the player's name, HP, equipped weapon and armour
+        - the weapon and armour inventories
+        - the current area, the number of turns taken and the seconds played
+        - areas (list of (area id, flags) for every area that changed)
+        - enemies (list of (enemy id, rolled size, hp, group size, first alive, aoe damage, member HPs)
+          for every enemy that changed or has a randomly rolled size)
+        - spawned (list of (area id, enemy id, rolled size, hp, group size, first alive, aoe damage, member HPs)
+          for every enemy spawned from an encounter table and not fought yet, the enemy id is the one it was copied from)
+        - respawns (list of (area id, ITEM_TAKEN or ENEMY_CLEARED, due turn) for every respawn waiting, see respawn.py)
+    """
+    def __init__(self) -> None:
+        self.sequence = 0
+        self.seed = 0
+        self.name = ""
+        self.hp = 0
+        self.weapon = 0
+        self.armour = 0
+        self.weapon_inventory = []
+        self.armour_inventory = []
+        self.current_area = 0
+        self.turns = 0
+        self.seconds = 0.0
+        self.areas = []
+        self.enemies = []
+        self.spawned = []
+        self.respawns = []
+
+
+class Journal:
+    """
+    Append-only log of every line entered since the last snapshot
+    The first line holds the sequence number of the snapshot it follows,
+    so a journal left over from an older snapshot is never replayed on top of a newer one
+    Each line is flushed as soon as it is written, so it survives the process crashing
+    """
+    def __init__(self,
+                 path: str,
+                 sequence: int,
+                 keep: bool = False
+                 ) -> None:
+        self.path = path
+        if keep:
+            self.file = open(path, "a", encoding = "utf-8")     # carry on after the lines being replayed
+        else:
+            self.file = open(path, "w", encoding = "utf-8")
+            self.file.write(f"#{sequence}\n")
+            self.file.flush()
+
+    def append(self,
+               line: str
+               ) -> None:
+        self.file.write(line.replace("\n", " ") + "\n")
+        self.file.flush()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+# ==============================
+# Capturing and restoring
+# ==============================
+def capture(player, weapon_inventory, armour_inventory, current_area, turns, seconds, numbering = None):
+    """
+    Takes a snapshot of a session and the state of the world
+    numbering = the version of the content (see hotreload.Version) the game is still playing with,
+    when content has been reloaded since, so the snapshot is numbered for that version
+    """
+    ids = numbering or content
+    randomized = numbering.randomized if numbering else world.randomized
+    snapshot = Snapshot()
+    snapshot.name = player.name
+    snapshot.hp = player.hp
+    snapshot.weapon = ids.weapon_ids[id(player.weapon)]
+    snapshot.armour = ids.armour_ids[id(player.armour)]
+    snapshot.weapon_inventory = [ids.weapon_ids[id(item)] for item in weapon_inventory]
+    snapshot.armour_inventory = [ids.armour_ids[id(item)] for item in armour_inventory]
+    snapshot.current_area = ids.area_ids[current_area.name]
+    snapshot.turns = turns
+    snapshot.seconds = seconds
+
+    # Only what changed since the start of the game needs saving (see world.py)
+    for thing in world.changed:
+        if isinstance(thing, Area):
+            item, enemy = thing.baseline
+            flags = 0
+            if item is not None and thing.item is None:
+                flags |= ITEM_TAKEN
+            if enemy is not None and thing.enemy is None:
+                flags |= ENEMY_CLEARED
+            if thing.complete:
+                flags |= COMPLETE
+            if flags:
+                snapshot.areas.append((ids.area_ids[thing.name], flags))
+
+    # Randomly sized groups are always saved, their size was rolled for this game
+    enemies = [thing for thing in world.changed if id(thing) in ids.enemy_ids]
+    enemies += [enemy for enemy in randomized if enemy not in world.changed]
+    for enemy in enemies:
+        snapshot.enemies.append((ids.enemy_ids[id(enemy)], *enemy_state(enemy)))
+
+    # Enemies spawned from encounter tables are copies, saved as the enemy they were copied from
+    for thing in world.changed:
+        if isinstance(thing, Area):
+            for enemy in thing.enemies:
+                snapshot.spawned.append((ids.area_ids[thing.name], ids.enemy_ids[id(enemy.pool.template)],
+                                         *enemy_state(enemy)))
+
+    snapshot.respawns = [(ids.area_ids[name], what, due) for name, what, due in respawn.pending()]
+    return snapshot
+
+
+def apply(snapshot, player, weapon_inventory, armour_inventory):
+    """
+    Puts a snapshot back into the player, the inventories and the world
+    Returns the area the player was in
+    """
+    player.name = snapshot.name
+    player.weapon = content.WEAPONS[snapshot.weapon]
+    player.armour = content.ARMOURS[snapshot.armour]
+    player.hp = snapshot.hp
+    weapon_inventory[:] = [content.WEAPONS[code] for code in snapshot.weapon_inventory]
+    armour_inventory[:] = [content.ARMOURS[code] for code in snapshot.armour_inventory]
+
+    # Start from the world as it was when the game started, then apply the changes
+    world.reset()
+    for code, flags in snapshot.areas:
+        changes = {"complete": bool(flags & COMPLETE)}
+        if flags & ITEM_TAKEN:
+            changes["item"] = None
+        if flags & ENEMY_CLEARED:
+            changes["enemy"] = None
+        content.AREAS[code].change(**changes)
+
+    for code, *state in snapshot.enemies:
+        restore_enemy(content.ENEMIES[code], *state)
+
+    # Spawned enemies are taken out of their pools again, in the order they were spawned in
+    spawned = {}
+    for area_code, code, *state in snapshot.spawned:
+        enemy = encounters.get_pool(content.ENEMIES[code]).acquire()
+        restore_enemy(enemy, *state)
+        spawned.setdefault(content.AREAS[area_code], []).append(enemy)
+    for area, enemies in spawned.items():
+        area.change(enemies = enemies)
+
+    respawn.clear(snapshot.turns)
+    for code, what, due in snapshot.respawns:
+        respawn.add(content.AREAS[code].name, what, due)
+
+    # Last of all, so nothing above uses up random numbers the journal's replay relies on
+    random.seed(snapshot.seed)
+    return content.AREAS[snapshot.current_area]
+
+
+def enemy_state(enemy) -> tuple:
+    """
+    Returns what a snapshot keeps of an enemy: (rolled size, hp, group size, first alive, aoe damage, member HPs)
+    """
+    members = None
+    if enemy.members is not None and enemy.hp != enemy.hp_max:
+        members = list(enemy.members[enemy.first_alive:])     # fallen members don't need saving
+    return (enemy.original_group_size, enemy.hp, enemy.current_group_size, enemy.first_alive, enemy.aoe_damage, members)
+
+
+def restore_enemy(enemy, size, hp, group_size, first_alive, aoe_damage, members) -> None:
+    # Puts what enemy_state() kept back into an enemy
+    if enemy.group_range:
+        enemy.reroll(size)
+    world.mark(enemy)
+    enemy.hp = hp
+    enemy.current_group_size = group_size
+    if members is not None:
+        enemy.first_alive = first_alive
+        enemy.aoe_damage = aoe_damage
+        enemy.members[first_alive:] = array("l", members)
+
+
+# ==============================
+# Binary format
+# ==============================
+# All numbers are little endian
+#   header:     magic (3 bytes), version (u8), content fingerprint (u32), sequence (u32), seed (u64)
+#   player:     name length (u8) + name (utf-8), hp (i32), weapon (u16), armour (u16), turns (u32), seconds (f64)
+#   inventory:  count (u8) + weapon ids (u16 each), count (u8) + armour ids (u16 each)
+#   location:   area id (u16)
+#   areas:      count (u16) + (area id (u16), flags (u8)) each
+#   enemies:    count (u16) + (enemy id (u16), rolled size (u32), hp (i32), group size (u32), first alive (u32), aoe damage (i32),
+#               member count (u32, 0xFFFFFFFF when not stored: pooled groups and groups at full strength)
+#               + member HPs (i32 each)) each
+#   spawned:    count (u16) + (area id (u16), then an enemy as above) each
+#   respawns:   count (u32) + (area id (u32), ITEM_TAKEN or ENEMY_CLEARED (u8), due turn (u32)) each
+HEADER = struct.Struct("<3sBIIQ")
+PLAYER = struct.Struct("<iHHId")
+AREA = struct.Struct("<HB")
+ENEMY = struct.Struct("<HIiIIiI")
+RESPAWN = struct.Struct("<IBI")
+NOT_STORED = 0xFFFFFFFF
+
+
+def encode(snapshot):
+    name = snapshot.name.encode()[:255]
+    parts = [
+        HEADER.pack(MAGIC, VERSION, content.fingerprint(), snapshot.sequence, snapshot.seed),
+        struct.pack("<B", len(name)), name,
+        PLAYER.pack(snapshot.hp, snapshot.weapon, snapshot.armour, snapshot.turns, snapshot.seconds),
+        struct.pack(f"<B{len(snapshot.weapon_inventory)}H", len(snapshot.weapon_inventory), *snapshot.weapon_inventory),
+        struct.pack(f"<B{len(snapshot.armour_inventory)}H", len(snapshot.armour_inventory), *snapshot.armour_inventory),
+        struct.pack("<HH", snapshot.current_area, len(snapshot.areas)),
+    ]
+    for code, flags in snapshot.areas:
+        parts.append(AREA.pack(code, flags))
+
+    parts.append(struct.pack("<H", len(snapshot.enemies)))
+    for enemy in snapshot.enemies:
+        encode_enemy(parts, *enemy)
+
+    parts.append(struct.pack("<H", len(snapshot.spawned)))
+    for area_code, *enemy in snapshot.spawned:
+        parts.append(struct.pack("<H", area_code))
+        encode_enemy(parts, *enemy)
+
+    parts.append(struct.pack("<I", len(snapshot.respawns)))
+    for code, what, due in snapshot.respawns:
+        parts.append(RESPAWN.pack(code, what, due))
+    return b"".join(parts)
+
+
+def encode_enemy(parts, code, size, hp, group_size, first_alive, aoe_damage, members) -> None:
+    if members is None:
+        parts.append(ENEMY.pack(code, size, hp, group_size, first_alive, aoe_damage, NOT_STORED))
+    else:
+        parts.append(ENEMY.pack(code, size, hp, group_size, first_alive, aoe_damage, len(members)))
+        parts.append(struct.pack(f"<{len(members)}i", *members))
+
+
+def decode_enemy(data, offset) -> tuple:
+    # Returns (enemy, offset after it)
+    code, size, hp, group_size, first_alive, aoe_damage, member_count = ENEMY.unpack_from(data, offset)
+    offset += ENEMY.size
+    members = None
+    if member_count != NOT_STORED:
+        members = list(struct.unpack_from(f"<{member_count}i", data, offset))
+        offset += 4 * member_count
+    return (code, size, hp, group_size, first_alive, aoe_damage, members), offset
+
+
+def decode(data, saved_with = None):
+    """
+    Reads a snapshot back from bytes
+    saved_with = fingerprint of the content the snapshot was saved with, when that isn't the content loaded now
+    (see hotreload.upgrade)
+    Raises ValueError if the data isn't a snapshot, or was saved with different content
+    """
+    if len(data) < HEADER.size:
+        raise ValueError("save file is incomplete")
+    magic, version, fingerprint, sequence, seed = HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("not a save file")
+    if version != VERSION:
+        raise ValueError(f"save file version {version} is not supported")
+    if fingerprint != (content.fingerprint() if saved_with is None else saved_with):
+        raise ValueError("the game's content has changed since this save was made")
+
+    snapshot = Snapshot()
+    snapshot.sequence = sequence
+    snapshot.seed = seed
+    offset = HEADER.size
+
+    try:
+        (length,) = struct.unpack_from("<B", data, offset)
+        snapshot.name = data[offset + 1:offset + 1 + length].decode()
+        offset += 1 + length
+
+        snapshot.hp, snapshot.weapon, snapshot.armour, snapshot.turns, snapshot.seconds = PLAYER.unpack_from(data, offset)
+        offset += PLAYER.size
+
+        for inventory in (snapshot.weapon_inventory, snapshot.armour_inventory):
+            (count,) = struct.unpack_from("<B", data, offset)
+            inventory.extend(struct.unpack_from(f"<{count}H", data, offset + 1))
+            offset += 1 + 2 * count
+
+        snapshot.current_area, count = struct.unpack_from("<HH", data, offset)
+        offset += 4
+        for _ in range(count):
+            snapshot.areas.append(AREA.unpack_from(data, offset))
+            offset += AREA.size
+
+        (count,) = struct.unpack_from("<H", data, offset)
+        offset += 2
+        for _ in range(count):
+            enemy, offset = decode_enemy(data, offset)
+            snapshot.enemies.append(enemy)
+
+        (count,) = struct.unpack_from("<H", data, offset)
+        offset += 2
+        for _ in range(count):
+            (area_code,) = struct.unpack_from("<H", data, offset)
+            enemy, offset = decode_enemy(data, offset + 2)
+            snapshot.spawned.append((area_code, *enemy))
+
+        (count,) = struct.unpack_from("<I", data, offset)
+        offset += 4
+        for _ in range(count):
+            snapshot.respawns.append(RESPAWN.unpack_from(data, offset))
+            offset += RESPAWN.size
+    except struct.error:
+        raise ValueError("save file is incomplete")
+    return snapshot
+
+
+# ==============================
+# Saving and recovering
+# ==============================
+journal = None          # Journal of the lines entered since the last snapshot
+sequence = 0            # sequence number of the last snapshot
+last_saved = 0.0        # time.monotonic() of the last snapshot
+replay = deque()        # journal lines waiting to be replayed after a crash
+previous_input = builtins.input
+installed = False       # True once input() goes through the journal
+
+
+def journaled_input(prompt = ""):
+    """
+    Replacement for input() that writes every line to the journal
+    While recovering, lines come from the journal being replayed instead of the player
+    """
+    if replay:
+        line = replay.popleft()
+        print(prompt + line)
+        return line
+    line = previous_input(prompt)
+    if journal:
+        journal.append(line)
+    return line
+
+
+def install():
+    """
+    Routes input() through the journal
+    Only done once, whatever wraps input() later (the profiler) wraps the journal, never the other way round
+    """
+    global previous_input, installed
+    if not installed:
+        previous_input = builtins.input
+        builtins.input = journaled_input
+        installed = True
+
+
+def due():
+    """
+    True if it is time for another snapshot
+    Never while replaying a journal, the journal only makes sense on top of the snapshot it follows
+    """
+    return enabled and not replay and time.monotonic() - last_saved >= SNAPSHOT_INTERVAL
+
+
+def store(snapshot, path = SAVE_PATH):
+    """
+    Writes a snapshot and starts a new, empty journal after it
+    The random numbers are reseeded, so that replaying the journal on top of this snapshot rolls the same numbers
+    """
+    global journal, sequence, last_saved
+    install()
+    sequence += 1
+    snapshot.sequence = sequence
+    snapshot.seed = random.getrandbits(64)
+    random.seed(snapshot.seed)
+
+    # Written to a temporary file first, so a crash never leaves half a snapshot behind
+    temp = path + ".tmp"
+    with open(temp, "wb") as file:
+        file.write(encode(snapshot))
+    os.replace(temp, path)
+
+    # A crash before the new journal is started leaves the old one behind,
+    # its sequence number no longer matches, so its lines (already part of the snapshot) are ignored
+    if journal:
+        journal.close()
+    journal = Journal(path + ".journal", sequence)
+    last_saved = time.monotonic()
+
+
+def recover(path = SAVE_PATH):
+    """
+    Loads the last snapshot and queues the journal lines entered after it for replay
+    The snapshot still has to be put back into the game with apply()
+    Returns the snapshot, or None if there is nothing to recover
+    Raises ValueError if the save file can't be used
+    """
+    global journal, sequence, last_saved
+    if not enabled or not os.path.exists(path):
+        return None
+    with open(path, "rb") as file:
+        snapshot = decode(file.read())
+
+    install()
+    sequence = snapshot.sequence
+    last_saved = time.monotonic()
+
+    lines = []
+    journal_path = path + ".journal"
+    if os.path.exists(journal_path):
+        with open(journal_path, encoding = "utf-8") as file:
+            lines = file.read().split("\n")
+        if lines[0] == f"#{sequence}":
+            replay.extend(line for line in lines[1:-1])     # the last entry is the empty string after the final newline
+            journal = Journal(journal_path, sequence, keep = True)
+    if journal is None:
+        journal = Journal(journal_path, sequence)
+    return snapshot
+
+
+def discard(path = SAVE_PATH):
+    """
+    Deletes the snapshot and journal once a game is over
+    """
+    global journal
+    if not enabled:
+        return
+    if journal:
+        journal.close()
+        journal = None
+    for name in (path, path + ".journal"):
+        if os.path.exists(name):
+            os.remove(name)
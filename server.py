@@ -0,0 +1,940 @@
+import io
+import os
+import sys
+import time
+import queue
+import marshal
+import random
+import signal
+import traceback
+import builtins
+import threading
+import socketserver
+import multiprocessing
+from collections import OrderedDict
+import save
+import map
+import world
+import shared
+import profiler
+import spectate
+import respawn
+import realtime
+import hotreload
+import memory
+
+# ==============================
+# Settings
+# ==============================
+# python server.py starts a game server, players connect with any line based client (e.g. nc localhost 4000)
+PORT = int(os.environ.get("TIMEBOUND_SERVER_PORT", "4000"))
+
+# The world is split by region across this many shard processes
+SHARDS = int(os.environ.get("TIMEBOUND_SHARDS", "0")) or min(os.cpu_count() or 1, len(map.regions))
+
+# Shards are forked from the router where the platform allows it, so they start with the game already imported
+if "fork" in multiprocessing.get_all_start_methods():
+    context = multiprocessing.get_context("fork")
+else:
+    context = multiprocessing.get_context("spawn")
+
+# Sessions that wait at the action prompt for IDLE_SECONDS are put to sleep: snapshotted to HIBERNATE_DIR and
+# dropped from their shard, the next line they are sent wakes them up again
+# LIVE_SESSIONS caps the number of running sessions per shard, the least recently active go to sleep first (0 for no cap)
+IDLE_SECONDS = float(os.environ.get("TIMEBOUND_IDLE_SECONDS", "300"))
+LIVE_SESSIONS = int(os.environ.get("TIMEBOUND_LIVE_SESSIONS", "0"))
+HIBERNATE_DIR = os.environ.get("TIMEBOUND_HIBERNATE_DIR", "hibernated")
+
+# Spectators connect here to watch fights in progress (see spectate.py)
+SPECTATE_PORT = int(os.environ.get("TIMEBOUND_SPECTATE_PORT", str(PORT + 1)))
+
+# Everything a client is sent between two of its reads goes out in a single write
+# A player's session is held at its next prompt until its output has been written, so a player who reads slowly
+# only ever slows down their own game
+# A spectator who falls SPECTATOR_FRAMES fight frames behind has them dropped and is sent the whole fight again instead
+# A client that takes longer than WRITE_SECONDS to take a write is disconnected
+SPECTATOR_FRAMES = int(os.environ.get("TIMEBOUND_SPECTATOR_FRAMES", "256"))
+WRITE_SECONDS = float(os.environ.get("TIMEBOUND_WRITE_SECONDS", "30"))
+
+# With TIMEBOUND_TURN_SECONDS set, battles are played in real time (see realtime.py): a player who doesn't answer
+# in time hesitates and the enemies take their turn anyway
+# Each shard keeps every one of its sessions' deadlines in one timer wheel, ticked every DEADLINE_TICK seconds
+# from its own event loop, rather than a timer thread or sleep per fight
+DEADLINE_TICK = float(os.environ.get("TIMEBOUND_DEADLINE_TICK", "0.05"))
+
+# kill -HUP <server> reloads the weapons, armour, enemies and areas from disk without dropping anyone (see hotreload.py)
+# The router and every shard reload straight away, each session carries its game over at its next action prompt,
+# where nothing is halfway through
+# The shards run the code the router read, so a file saved again in the meantime can't leave them on other content
+# A session held up for longer than RELOAD_BUDGET seconds by a reload is reported: its shard loading and swapping
+# in the new content holds up every session of the shard, carrying its game over only holds up the session itself
+RELOAD_BUDGET = float(os.environ.get("TIMEBOUND_RELOAD_BUDGET", "0.05"))
+
+# kill -USR2 <server> (or python memory.py <server>) writes a memory report covering the router, every shard
+# and every live session (see memory.py), sessions that haven't measured themselves within MEMORY_WAIT seconds are left out
+MEMORY_WAIT = float(os.environ.get("TIMEBOUND_MEMORY_WAIT", "2"))
+
+# Every process builds the world for itself, unless TIMEBOUND_TABLES points them all at the same content tables,
+# which they then share (see tables.py)
+
+# Regions are dealt out to the shards in the order they were registered
+shard_of = {name: index % SHARDS for index, name in enumerate(map.regions)}
+
+
+def place_regions():
+    # Regions that are new to reloaded content are dealt out after the ones already placed, the same in every process
+    for name in map.regions:
+        if name not in shard_of:
+            shard_of[name] = len(shard_of) % SHARDS
+
+# How the server looks:
+#   router (this process)   keeps the players' connections, and knows which shard owns each session
+#   shards                  one process per group of regions, the sessions in its regions take turns to run in it
+#                           over the one copy of their areas and enemies the shard has (see Session)
+# When a player moves into a region owned by another shard, the session is snapshotted (see save.py)
+# and the router passes the snapshot on to the new shard, which carries on from it
+# The client's connection stays with the router the whole time
+#
+# Messages:
+#   router -> shard         ("open", session, snapshot or None, prompts), ("line", session, text, prompt),
+#                           ("close", session), ("reload", None, content's code), ("memory", None, tracing)
+#   shard -> session        a line, or an exception to raise instead: Hibernate, realtime.TimedOut when the player
+#                           ran out of time to answer, EOFError when the player has gone
+#   session -> shard        ("input", output, resumable, deadline), ("output", output), ("handoff", output, region, snapshot),
+#                           ("hibernated", snapshot), ("spectate", fight message), ("reloaded", pause), ("closed",)
+#   shard -> router         (session, "input", output, prompt), (session, "output", output),
+#                           (session, "handoff", output, region, snapshot, prompts), (session, "spectate", fight message),
+#                           (session, "reloaded", pause), (session, "memory", report), (None, "memory", shard's report),
+#                           (session, "closed"), (session, "line", text, prompt)
+# Prompts are numbered per session, the count goes along with a handoff, and every line carries the number of
+# the last prompt the player had been shown when they typed it
+# A session only gets a line after asking for one, so lines typed during a handoff wait at the router for the new shard
+# In real time battles the router reads lines as they are typed, so the player sees the enemies' turns while
+# their prompt waits: a shard drops the lines typed at a prompt that ran out of time, and sends lines that reach it
+# after their session has been handed over back to the router, for the new shard
+# Fight messages (see spectate.py) are encoded once by the session, the router keeps each fight's state for
+# spectators who start watching halfway through and passes the encoded deltas on to everyone watching
+
+
+# ==============================
+# Sessions
+# ==============================
+# The prompt in main.action(), a session waiting here can be carried on from a snapshot
+RESUMABLE_PROMPT = "What do you want to do? "
+
+# The game's own state in main, which every session has its own copy of
+GAME = ("player", "weapon_inventory", "armour_inventory", "current_area", "run", "turns", "started_at", "cause_of_death",
+        "session_id")
+
+current = None          # the session swapped in, the only one running
+
+
+class Handoff(Exception):
+    """
+    Raised when the player moves into a region owned by another shard
+    Unwinds the game back to run_session(), which hands the session over
+    """
+    def __init__(self,
+                 region: str
+                 ) -> None:
+        super().__init__(region)
+        self.region = region
+
+
+class Hibernate(Exception):
+    """
+    Raised when the shard puts an idle session to sleep
+    Unwinds the game back to run_session(), which snapshots the session
+    """
+
+
+class Session:
+    """
+    One player's game, played in a thread of its own inside its shard
+    Only the session swapped in runs, the shard waits for it to ask for its next line before it does anything else,
+    so all of them play over the one copy of the areas and enemies the shard has
+    A session that is swapped out takes its own state with it: main's game state (see GAME), what it changed
+    in the world (see world.stash) and its respawns
+    A Session has:
+        - the router's number for the session, and its shard
+        - the snapshot it carries on from (encoded, when it was handed over from another shard or woken up)
+        - waking_line (the line that woke it up, the answer to its first prompt)
+        - its thread (None until it first runs), and its inbox (its next line, or an exception to raise instead)
+        - its game, world, respawns and seen (its state while swapped out)
+        - output (what it printed since its last message)
+        - moving_to (region owned by another shard that the player has just moved into)
+        - reload_due (the reload it hasn't carried its game over to yet, see carry_on)
+        - resumable (True while it waits at the action prompt, where it can be put to sleep)
+        - since (time.monotonic() of its last request for a line)
+        - waiting (True while it waits for a line)
+        - prompts (integer, counts its requests for a line, so a deadline only ever expires the prompt it was set for)
+        - expired (set of the numbers of its prompts that ran out of time, while lines typed at them may still come)
+    """
+    def __init__(self,
+                 number: int,
+                 shard: object,
+                 snapshot: bytes = None,
+                 waking_line: str = None,
+                 prompts: int = 0
+                 ) -> None:
+        import main
+        self.number = number
+        self.shard = shard
+        self.snapshot = snapshot
+        self.waking_line = waking_line
+        self.thread = None
+        self.inbox = queue.SimpleQueue()
+        self.game = {name: getattr(main, name) for name in GAME}
+        self.game.update(player = main.Hero(name = "Player"), weapon_inventory = [], armour_inventory = [],
+                         session_id = number)
+        self.world = (set(), [])
+        self.respawns = respawn.TimerWheel()
+        self.seen = {}
+        self.output = io.StringIO()
+        self.moving_to = None
+        self.reload_due = None
+        self.resumable = False
+        self.since = time.monotonic()
+        self.waiting = False
+        self.prompts = prompts
+        self.expired = set()
+
+    def swap_in(self) -> None:
+        global current
+        import main
+        current = self
+        vars(main).update(self.game)
+        world.unstash(self.world)
+        respawn.unstash(self.respawns)
+        shared.seen = self.seen
+        sys.stdout = self.output
+
+    def swap_out(self) -> None:
+        global current
+        import main
+        self.game = {name: getattr(main, name) for name in GAME}
+        self.world = world.stash()
+        self.respawns = respawn.stash()
+        self.seen = shared.seen
+        sys.stdout = sys.__stdout__
+        current = None
+
+    def send(self,
+             message: tuple
+             ) -> None:
+        # Passes a message on to the router, the session carries on
+        self.shard.replies.put(message)
+
+    def ask(self,
+            message: tuple
+            ):
+        # Hands back to the shard with a message, and waits to be swapped in again with the answer
+        self.shard.replies.put(message)
+        return self.inbox.get()
+
+    def measure(self) -> dict:
+        # A memory report (see memory.measure) of what the session holds on to of its own while it is swapped out
+        return {"pid": os.getpid(), "private": None, "sites": None, "since": None,
+                "retained": {"hero": memory.size_of([self.game]),
+                             "world": memory.size_of([self.world, self.respawns, self.seen]),
+                             "buffers": memory.size_of([self.output])}}
+
+
+def take_output():
+    # Everything printed since the last time, sent along with the next message
+    text = sys.stdout.getvalue()
+    sys.stdout.seek(0)
+    sys.stdout.truncate()
+    return text
+
+
+def remote_input(prompt = ""):
+    """
+    Replacement for input() in sessions: sends what was printed to the player and waits for their next line
+    """
+    session = current
+    sys.stdout.write(prompt)
+    if session.waking_line is not None:
+        # A woken session has played back up to the prompt it fell asleep at, the player has already seen all of that
+        take_output()
+        line, session.waking_line = session.waking_line, None
+        return line
+
+    if session.reload_due is not None and prompt == RESUMABLE_PROMPT:
+        session.send(("reloaded", carry_on(session)))
+    deadline, realtime.deadline = realtime.deadline, None
+    line = session.ask(("input", take_output(), prompt == RESUMABLE_PROMPT, deadline))
+    if isinstance(line, BaseException):
+        raise line      # Hibernate, realtime.TimedOut, or EOFError once the router has closed the session
+
+    # The move's "Press enter to continue" has been answered, the new shard carries on from the next command
+    if session.moving_to is not None:
+        raise Handoff(session.moving_to)
+    return line
+
+
+def carry_on(session):
+    """
+    Carries the game of the session swapped in over to the content its shard has reloaded since (see hotreload.Reload.carry_on)
+    Returns the seconds the game was held up by the reload, the shard's load and swap included
+    """
+    import main
+    started = time.perf_counter()
+    update, session.reload_due = session.reload_due, None
+    snapshot = save.capture(main.player, main.weapon_inventory, main.armour_inventory, main.current_area, main.turns, 0,
+                            numbering = update.old)
+    world.stash()       # the game's changes to the old content, the snapshot brings them over
+    respawn.stash()
+    main.current_area = update.carry_on(snapshot, main.player, main.weapon_inventory, main.armour_inventory)
+    return update.pause + time.perf_counter() - started
+
+
+def clear_screen(command):
+    # Stands in for os.system("cls"), there is no console to clear, so the client is sent the ANSI codes instead
+    sys.stdout.write("\033[2J\033[H")
+    return 0
+
+
+def install():
+    """
+    Routes sessions' input and output through their shard
+    Done before main is imported, so input() wrappers (metrics, save) wrap this one
+    """
+    builtins.input = remote_input
+    os.system = clear_screen
+    save.enabled = False    # the router holds on to sessions, not the save file
+    realtime.enabled = realtime.SECONDS > 0
+
+
+def run_session(session):
+    """
+    Runs one player's game, in the session's own thread
+    Ends with the session's last message to the shard: it has closed, been handed over or gone to sleep
+    """
+    import main
+    ending = ("closed",)
+    try:
+        if session.snapshot is not None:
+            snapshot = save.decode(hotreload.upgrade(session.snapshot))     # it may have been taken before a reload
+        else:
+            snapshot = None
+            main.new_game()     # from the baseline world, with the session's own sizes for randomly sized groups
+        while True:
+            main.play(snapshot)
+            snapshot = None
+            if input("Do you want to play again? ").lower().strip() != "yes":
+                break
+            main.new_game()
+        session.send(("output", take_output() + "Goodbye!\n"))
+    except (Handoff, Hibernate) as stop:
+        if session.reload_due is not None:
+            session.send(("reloaded", carry_on(session)))     # snapshots are taken with the content loaded now
+        state = save.capture(main.player, main.weapon_inventory, main.armour_inventory, main.current_area,
+                             main.turns, time.time() - main.started_at)
+        state.seed = random.getrandbits(64)
+        if isinstance(stop, Handoff):
+            ending = ("handoff", take_output(), stop.region, save.encode(state))
+        else:
+            ending = ("hibernated", save.encode(state))
+    except EOFError:
+        pass    # the router closed the session
+    except Exception:
+        traceback.print_exc(file = sys.__stderr__)      # only this session ends
+    finally:
+        profiler.detach(session.number)
+        session.shard.replies.put(ending)
+
+
+# ==============================
+# Shards
+# ==============================
+class Shard:
+    """
+    Runs the sessions in this shard's regions one at a time, passes messages between them and the router,
+    and puts idle sessions to sleep
+    Deadlines in real time battles wait in a timer wheel as (session, prompt number), checked on every pass
+    Live sessions are kept least recently active first, those are the first to go to sleep
+    A sleeping session is just its snapshot on disk, it wakes up as a new session with the player's next line
+    """
+    def __init__(self,
+                 number: int,
+                 inbox: object,
+                 outbox: object
+                 ) -> None:
+        self.number = number
+        self.inbox = inbox          # pipe from the router
+        self.outbox = outbox        # queue shared by all shards back to the router
+        self.replies = queue.SimpleQueue()      # messages from the session running
+        self.live = OrderedDict()   # session -> Session
+        self.sleeping = {}          # session -> (snapshot file, prompts)
+        self.handed_off = set()     # sessions handed over to another shard since they were last here
+        self.deadlines = respawn.TimerWheel()
+        self.started = time.monotonic()
+
+    def run(self) -> None:
+        while True:
+            # Only woken up every tick while there are deadlines to check
+            if self.inbox.poll(DEADLINE_TICK if self.deadlines else 1):
+                self.from_router(self.inbox.recv())
+            if self.deadlines:
+                self.expire_deadlines()
+            self.hibernate_idle()
+
+    def tick(self) -> int:
+        return int((time.monotonic() - self.started) / DEADLINE_TICK)
+
+    def set_deadline(self, session, seconds) -> None:
+        if not self.deadlines:
+            self.deadlines.clear(self.tick())       # nothing waiting, skip the idle ticks rather than turning through them
+        self.deadlines.schedule(self.tick() + max(1, round(seconds / DEADLINE_TICK)), (session.number, session.prompts))
+
+    def expire_deadlines(self) -> None:
+        # Answers every prompt still waiting when its deadline came with TimedOut, the session carries on without the player
+        for number, prompt in self.deadlines.advance(self.tick()):
+            session = self.live.get(number)
+            if session and session.waiting and session.prompts == prompt:
+                session.expired.add(prompt)
+                self.resume(session, realtime.TimedOut())
+
+    def start(self, number, snapshot = None, line = None, prompts = 0) -> None:
+        self.handed_off.discard(number)
+        session = self.live[number] = Session(number, self, snapshot, line, prompts)
+        self.resume(session)
+
+    def resume(self, session, line = None) -> None:
+        """
+        Swaps a session in and runs it until it asks for its next line or ends, passing on what it sends meanwhile
+        line = its next line, or an exception to raise instead
+        """
+        session.resumable = False
+        session.waiting = False
+        session.swap_in()
+        if session.thread is None:
+            session.thread = threading.Thread(target = run_session, args = (session,), daemon = True)
+            session.thread.start()
+        else:
+            session.inbox.put(line)
+        message = self.replies.get()
+        while message[0] in ("output", "spectate", "reloaded"):
+            self.outbox.put((session.number,) + message)
+            message = self.replies.get()
+        session.swap_out()
+        self.stopped(session, message)
+
+    def stopped(self, session, message) -> None:
+        # Handles the message a session stopped running with
+        if message[0] == "input":
+            session.resumable = message[2]
+            session.since = time.monotonic()
+            session.waiting = True
+            session.prompts += 1
+            if message[3] is not None:
+                self.set_deadline(session, message[3])
+            self.live.move_to_end(session.number)
+            self.outbox.put((session.number, "input", message[1], session.prompts))
+            return
+
+        # The session is finished here
+        del self.live[session.number]
+        if message[0] == "hibernated":
+            path = os.path.join(HIBERNATE_DIR, f"{os.getpid()}-{session.number}.snapshot")
+            with open(path, "wb") as file:
+                file.write(message[1])
+            self.sleeping[session.number] = (path, session.prompts)
+        elif message[0] == "handoff":
+            self.handed_off.add(session.number)
+            self.outbox.put((session.number,) + message + (session.prompts,))     # the router sends it on to the new shard
+        else:
+            self.outbox.put((session.number,) + message)
+
+    def from_router(self, message) -> None:
+        kind, number = message[0], message[1]
+        if kind == "open":
+            self.start(number, message[2], prompts = message[3])
+        elif kind == "line":
+            text, prompt = message[2], message[3]
+            if number in self.sleeping:
+                self.wake(number, text)
+            elif number in self.live:
+                session = self.live[number]
+                expired = prompt in session.expired
+                session.expired = {later for later in session.expired if later >= prompt}     # no more lines for earlier ones
+                if session.waiting and not expired:
+                    self.resume(session, text)
+            elif number in self.handed_off:
+                self.outbox.put((number, "line", text, prompt))
+        elif kind == "reload":
+            self.reload({name: marshal.loads(code) for name, code in message[2].items()})
+        elif kind == "memory":
+            self.measure(message[2])
+        elif kind == "close":
+            if number in self.sleeping:
+                os.remove(self.sleeping.pop(number)[0])
+            elif number in self.live:
+                self.resume(self.live[number], EOFError())
+
+    def hibernate_idle(self) -> None:
+        """
+        Puts to sleep the sessions that have waited at the action prompt for IDLE_SECONDS,
+        and the least recently active ones while there are more than LIVE_SESSIONS
+        """
+        now = time.monotonic()
+        over = len(self.live) - LIVE_SESSIONS if LIVE_SESSIONS else 0
+        for session in list(self.live.values()):
+            if over <= 0 and now - session.since < IDLE_SECONDS:
+                break       # everything after this has been active more recently
+            if session.resumable and session.waiting:
+                self.resume(session, Hibernate())
+                over -= 1
+
+    def reload(self, code) -> None:
+        """
+        Reloads content once for all of this shard's sessions, code = the content's code the router loaded (see hotreload.load)
+        Those waiting at the action prompt carry their games over straight away, the others when they next get there
+        Sleeping sessions are brought up to date when they wake (see hotreload.upgrade)
+        """
+        try:
+            update = hotreload.load(code)
+            update.swap()       # no session is swapped in, this only swaps the shard's own world
+        except hotreload.ReloadError as error:
+            print(f"Shard {self.number} kept its content: {error}")
+            return
+        place_regions()
+        for session in list(self.live.values()):
+            if session.reload_due is None:
+                session.reload_due = update     # still playing with the content this reload swapped out
+            if session.resumable and session.waiting:
+                session.swap_in()
+                pause = carry_on(session)
+                session.swap_out()
+                self.outbox.put((session.number, "reloaded", pause))
+
+    def measure(self, tracing) -> None:
+        """
+        Measures this shard for a memory report, and each of its live sessions: what it holds on to of its own
+        The router is told how many session reports to wait for
+        """
+        report = memory.measure(tracing)
+        report["shard"] = self.number
+        report["asked"] = len(self.live)
+        self.outbox.put((None, "memory", report))
+        for session in self.live.values():
+            self.outbox.put((session.number, "memory", session.measure()))
+
+    def wake(self, number, line) -> None:
+        path, prompts = self.sleeping.pop(number)
+        with open(path, "rb") as file:
+            snapshot = file.read()
+        os.remove(path)
+        self.start(number, snapshot, line, prompts)
+
+
+def run_shard(number, inbox, outbox):
+    random.seed()       # forked shards would otherwise all roll the same numbers
+    install()
+    import main
+    spectate.send = lambda message: current.send(("spectate", message))
+
+    # Crossing into another shard's region hands the session over, see remote_input()
+    move_player = main.move_player
+    def handoff_on_move(action):
+        move_player(action)
+        if shard_of[main.current_area.region] != number:
+            current.moving_to = main.current_area.region
+    main.move_player = handoff_on_move
+
+    # Stopped by the router with SIGTERM, exiting normally lets atexit write out finished runs (see leaderboard.py)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    os.makedirs(HIBERNATE_DIR, exist_ok = True)
+    Shard(number, inbox, outbox).run()
+
+
+# ==============================
+# Router
+# ==============================
+class Router:
+    """
+    Owns the shard processes and knows which shard each session is in
+    """
+    def __init__(self,
+                 shards: int = SHARDS
+                 ) -> None:
+        self.outbox = context.Queue()
+        self.pipes = []
+        self.locks = []
+        self.processes = []
+        for shard in range(shards):
+            ours, theirs = context.Pipe()
+            process = context.Process(target = run_shard, args = (shard, theirs, self.outbox))    # not a daemon, stopping it lets it write out finished runs
+            process.start()
+            self.processes.append(process)
+            self.pipes.append(ours)
+            self.locks.append(threading.Lock())
+
+        self.lock = threading.Lock()
+        self.next_session = 0
+        self.owner = {}     # session -> shard
+        self.events = {}    # session -> messages waiting for the session's connection
+        self.fights = {}    # session -> spectate.Fight in progress
+        self.watchers = {}  # session -> tuple of Watchers, replaced whenever someone starts or stops watching
+        self.watching = {}  # Watcher -> session
+        self.watch_lock = threading.Lock()
+        self.reload_lock = threading.Lock()
+        self.memory_lock = threading.Lock()
+        self.measured = None    # queue of the reports for the memory report being made
+        threading.Thread(target = self.dispatch, daemon = True).start()
+
+    def stop(self):
+        # Sessions are threads of their shard, they go with it
+        for process in self.processes:
+            process.terminate()
+
+    def send(self, shard, message):
+        with self.locks[shard]:
+            self.pipes[shard].send(message)
+
+    def open(self):
+        with self.lock:
+            session = self.next_session
+            self.next_session += 1
+        self.events[session] = queue.Queue()
+        self.owner[session] = shard_of[map.all_areas[map.start_area].region]
+        self.send(self.owner[session], ("open", session, None, 0))
+        return session
+
+    def line(self, session, text, prompt):
+        # prompt = the number of the last prompt the player had been shown
+        self.send(self.owner[session], ("line", session, text, prompt))
+
+    def close(self, session):
+        self.send(self.owner.pop(session), ("close", session))
+        del self.events[session]
+        with self.watch_lock:
+            self.fights.pop(session, None)
+            watchers = self.watchers.pop(session, ())
+            for watcher in watchers:
+                del self.watching[watcher]
+        for watcher in watchers:
+            watcher.leave()
+
+    def reload(self):
+        """
+        Reloads content here and in every shard, the shards pass it on to their sessions
+        The new content is loaded here first, so content that doesn't load is never sent any further
+        """
+        with self.reload_lock:
+            try:
+                update = hotreload.load()
+                update.swap()
+            except hotreload.ReloadError as error:
+                print(f"Content not reloaded: {error}")
+                return
+            place_regions()
+            print(f"Content reloaded: {update.changes}")
+            code = {name: marshal.dumps(code) for name, code in update.code.items()}      # code objects don't pickle
+            for shard in range(len(self.pipes)):
+                self.send(shard, ("reload", None, code))
+
+    def reloaded(self, session, pause):
+        # A session has carried its game over to reloaded content, having been held up for pause seconds
+        if pause > RELOAD_BUDGET:
+            print(f"Session {session} was held up {pause * 1000:.1f} ms by the reload")
+
+    def memory_report(self):
+        """
+        Writes a memory report covering every process, sessions are also charged with what the router holds for them
+        (their connection's waiting messages, their fight and the frames waiting for its spectators)
+        """
+        with self.memory_lock:
+            tracing = memory.tracing_next()
+            self.measured = queue.Queue()
+            for shard in range(len(self.pipes)):
+                self.send(shard, ("memory", None, tracing))
+            reports = [("router", memory.measure(tracing))]
+
+            sessions = {}
+            shards = 0
+            asked = 0
+            deadline = time.monotonic() + MEMORY_WAIT
+            while shards < len(self.pipes) or len(sessions) < asked:
+                try:
+                    session, report = self.measured.get(timeout = max(0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if session is None:
+                    reports.append((f"shard {report['shard']}", report))
+                    shards += 1
+                    asked += report["asked"]
+                else:
+                    sessions[session] = report
+            self.measured = None
+
+            for session, report in sessions.items():
+                with self.watch_lock:
+                    roots = [self.events.get(session), self.fights.get(session), self.watchers.get(session)]
+                    report["retained"]["router"] = memory.size_of(roots)
+                reports.append((f"session {session}", report))
+            path = memory.write(reports, tracing)
+            print(f"Memory report written to {path}")
+
+    def spectated(self, session, message):
+        """
+        Keeps a session's fight up to date and passes it on, encoded once, to everyone watching
+        """
+        with self.watch_lock:
+            if message[0] == "begin":
+                fight = self.fights[session] = spectate.Fight(*message[1:])
+                text = fight.keyframe()
+            elif message[0] == "turn":
+                turn, action, changes, text = message[1:]
+                if session in self.fights:
+                    self.fights[session].apply(turn, changes)
+            else:
+                self.fights.pop(session, None)
+                text = message[2]
+            watchers = self.watchers.get(session, ())
+        data = text.encode()
+        for watcher in watchers:
+            watcher.offer(data)
+
+    def keyframe(self, session):
+        # The session's fight as it is now, None if it isn't fighting
+        with self.watch_lock:
+            fight = self.fights.get(session)
+            return fight.keyframe() if fight else None
+
+    def watch(self, session, watcher):
+        # Starts a spectator watching a session, returns the session's fight as it is now
+        with self.watch_lock:
+            fight = self.fights.get(session)
+            if fight is None:
+                return None
+            self.watchers[session] = self.watchers.get(session, ()) + (watcher,)
+            self.watching[watcher] = session
+            return fight.keyframe()
+
+    def unwatch(self, watcher):
+        with self.watch_lock:
+            session = self.watching.pop(watcher, None)
+            if session in self.watchers:
+                self.watchers[session] = tuple(other for other in self.watchers[session] if other is not watcher)
+
+    def dispatch(self):
+        # Hands each message from the shards to its session's connection, handoffs are forwarded to the new shard
+        while True:
+            message = self.outbox.get()
+            session, kind = message[0], message[1]
+            if kind == "spectate":
+                self.spectated(session, message[2])
+                continue
+            if kind == "reloaded":
+                self.reloaded(session, message[2])
+                continue
+            if kind == "memory":
+                measured = self.measured
+                if measured is not None:
+                    measured.put((session, message[2]))     # dropped if it came too late for the report
+                continue
+            events = self.events.get(session)
+            if events is None:
+                continue        # the player has already disconnected
+            if kind == "handoff":
+                output, region, snapshot, prompts = message[2:]
+                events.put(("output", output))
+                self.owner[session] = shard_of[region]
+                self.send(shard_of[region], ("open", session, snapshot, prompts))
+            elif kind == "line":
+                # It reached the shard the session had just left
+                shard = self.owner.get(session)
+                if shard is not None:
+                    self.send(shard, ("line", session) + message[2:])
+            else:
+                events.put(message[1:])
+
+
+class Watcher:
+    """
+    A spectator's fight frames waiting to be written
+    A Watcher has:
+        - frames (encoded frames, at most SPECTATOR_FRAMES)
+        - behind (True once frames have been dropped, until the spectator has been sent the whole fight again)
+        - left (True once the watched player has left)
+    Frames are offered by the router's dispatch thread, which never waits for a spectator
+    """
+    def __init__(self) -> None:
+        self.frames = []
+        self.behind = False
+        self.left = False
+        self.condition = threading.Condition()
+
+    def offer(self, data) -> None:
+        with self.condition:
+            if len(self.frames) >= SPECTATOR_FRAMES:
+                self.frames.clear()
+                self.behind = True
+            else:
+                self.frames.append(data)
+            self.condition.notify()
+
+    def leave(self) -> None:
+        with self.condition:
+            self.left = True
+            self.condition.notify()
+
+    def take(self):
+        """
+        Waits for something to write, returns (frames, behind, left) and empties the queue
+        """
+        with self.condition:
+            while not self.frames and not self.behind and not self.left:
+                self.condition.wait()
+            frames, self.frames = self.frames, []
+            behind, self.behind = self.behind, False
+            return frames, behind, self.left
+
+
+class Handler(socketserver.StreamRequestHandler):
+    """
+    Base for the server's connections, writes with a time limit
+    """
+    def write(self, data):
+        # Reads wait as long as the client likes, a write only gets WRITE_SECONDS
+        self.connection.settimeout(WRITE_SECONDS)
+        self.wfile.write(data)
+        self.connection.settimeout(None)
+
+
+class ConnectionHandler(Handler):
+    """
+    One player's connection, lines are only read from it when their session asks for one
+    (in real time battles they are read as they come, see read_ahead())
+    Everything the session sends up to its next prompt is written in one go
+    """
+    def handle(self):
+        router = self.server.router
+        session = router.open()
+        events = router.events[session]
+        reading_ahead = realtime.SECONDS > 0
+        self.shown = 0      # the number of the last prompt written to the player
+        if reading_ahead:
+            threading.Thread(target = self.read_ahead, args = (events,), daemon = True).start()
+        try:
+            closed = False
+            while not closed:
+                text = []
+                event = events.get()
+                while True:
+                    if event[0] == "closed":
+                        closed = True
+                        break
+                    if event[0] == "line":
+                        router.line(session, event[1], event[2])
+                    else:
+                        text.append(event[1])
+                        if event[0] == "input":
+                            break
+                    event = events.get()
+                self.write("".join(text).encode())
+                if event[0] == "input":
+                    self.shown = event[2]
+                if not closed and not reading_ahead:
+                    line = self.rfile.readline()
+                    if not line:
+                        break       # the player disconnected
+                    router.line(session, line.decode(errors = "replace").rstrip("\r\n"), self.shown)
+        except OSError:
+            pass
+        finally:
+            if session in router.events:
+                router.close(session)
+
+    def read_ahead(self, events):
+        # Passes lines on as they are typed, so a prompt that runs out of time doesn't hold up what comes after it
+        try:
+            for line in self.rfile:
+                events.put(("line", line.decode(errors = "replace").rstrip("\r\n"), self.shown))
+        except (OSError, ValueError):
+            pass        # the connection was closed under us
+        events.put(("closed",))      # the player disconnected
+
+
+class SpectatorHandler(Handler):
+    """
+    A spectator's connection: picks a fight in progress, then follows that player's fights until they leave
+    Frames that arrive while a write is going out are written together with the next one
+    """
+    def handle(self):
+        router = self.server.router
+        watcher = Watcher()
+        try:
+            while True:
+                # Fights are started, moved on and ended by the shards' readers, so they are listed under the lock
+                with router.watch_lock:
+                    listing = [f"[{session}] {fight.player} vs {', '.join(fight.enemies)} (turn {fight.turn})\n"
+                               for session, fight in router.fights.items()]
+                if not listing:
+                    self.write(b"There are no fights to watch right now. Press enter to look again... ")
+                    if not self.rfile.readline():
+                        break
+                    continue
+                listing.insert(0, "\nFights in progress:\n")
+                listing.append("Which fight do you want to watch? ")
+                self.write("".join(listing).encode())
+                line = self.rfile.readline()
+                if not line:
+                    break
+                line = line.strip()
+                session = int(line) if line.isdigit() else None
+                keyframe = router.watch(session, watcher) if session is not None else None
+                if keyframe is None:
+                    self.write(b"That fight isn't going on\n")
+                    continue
+
+                self.write(keyframe.encode())
+                while True:
+                    frames, behind, left = watcher.take()
+                    if behind:
+                        # Too far behind to catch up frame by frame, start again from the fight as it is now
+                        frames = [b"(skipping ahead)\n", (router.keyframe(session) or "").encode()]
+                    if left:
+                        frames.append(b"The player has left\n")
+                    self.write(b"".join(frames))
+                    if left:
+                        watcher.left = False
+                        break
+        except OSError:
+            pass
+        finally:
+            router.unwatch(watcher)
+
+
+class GameServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def serve(port = PORT, shards = SHARDS, spectate_port = SPECTATE_PORT):
+    """
+    Starts the shards and serves players (and spectators) until interrupted
+    """
+    server = GameServer(("0.0.0.0", port), ConnectionHandler)
+    server.router = Router(shards)
+    spectators = GameServer(("0.0.0.0", spectate_port), SpectatorHandler)
+    spectators.router = server.router
+    threading.Thread(target = spectators.serve_forever, daemon = True).start()
+    if hasattr(signal, "SIGHUP"):       # not on Windows
+        signal.signal(signal.SIGHUP, lambda number, frame: threading.Thread(target = server.router.reload, daemon = True).start())
+        signal.signal(signal.SIGUSR2, lambda number, frame: threading.Thread(target = server.router.memory_report, daemon = True).start())
+    print(f"Serving on port {port} with {shards} shards, spectators on port {spectate_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    server.server_close()
+    spectators.shutdown()
+    spectators.server_close()
+    server.router.stop()
+
+
+if __name__ == "__main__":
+    serve()
@@ -0,0 +1,194 @@
+import os
+import mmap
+import struct
+import content
+from save import ITEM_TAKEN, ENEMY_CLEARED
+
+try:
+    import fcntl
+except ImportError:     # Windows
+    fcntl = None
+    import msvcrt
+
+# ==============================
+# Shared world
+# ==============================
+# TIMEBOUND_SHARED_WORLD=<path> makes every game played with the same file share one live world,
+# e.g. every session of a server (see server.py): an item picked up or an enemy defeated by one player
+# is gone for everyone else too, and stays gone when the game or server is restarted
+#
+# The file holds a record for every area, in content ID order: a version (u32) and flags (u8, see save.py)
+# Every change to an area's record bumps its version
+# Each game remembers the version of every area it has caught up with (see sync)
+# Changes are made by compare and swap: a record is only written if it is still at the version that was read,
+# otherwise another player got there first and the change is worked out again from the new record
+# Only the record being swapped is locked, for a few microseconds, so players in different areas never wait
+# for each other, and reading a record (which is all most commands do) takes no lock at all
+# A swap makes the version odd while it writes the flags and even again once they are written (a seqlock):
+# a reader reads the version, the flags and the version again, and reads again if the version was odd or moved
+#
+# Whoever swaps first wins: a second player reaching for the same item or enemy finds it already gone
+
+MAGIC = b"TBW"
+VERSION = 2
+
+HEADER = struct.Struct("<3sBII")    # magic, version, content fingerprint, area count
+RECORD = struct.Struct("<IB")       # version, flags
+STAMP = struct.Struct("<I")         # the version on its own
+
+PATH = os.environ.get("TIMEBOUND_SHARED_WORLD")
+enabled = PATH is not None
+
+file = None     # the shared world file, kept open for its locks
+data = None     # the file, mapped
+seen = {}       # area code -> version this game has caught up with
+
+
+def attach(path = PATH):
+    """
+    Maps the shared world file, creating it (with every area as it starts out) if it doesn't exist yet
+    """
+    global file
+    global data
+    count = len(content.AREAS)
+    if not os.path.exists(path):
+        # Written aside and linked into place, so a game starting at the same time never sees half a file
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as new:
+            new.write(HEADER.pack(MAGIC, VERSION, content.fingerprint(), count))
+            new.write(bytes(RECORD.size * count))
+        try:
+            os.link(temporary, path)
+        except FileExistsError:
+            pass        # someone else created it first
+        finally:
+            os.remove(temporary)
+
+    file = open(path, "r+b")
+    data = mmap.mmap(file.fileno(), 0)
+    magic, version, fingerprint, areas = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a shared world file")
+    if fingerprint != content.fingerprint() or areas != count:
+        raise ValueError(f"{path} was made for different content, remove it to start a new shared world")
+
+
+def offset(code):
+    return HEADER.size + code * RECORD.size
+
+
+def lock(code):
+    # Locks one area's record against other processes
+    if fcntl:
+        fcntl.lockf(file, fcntl.LOCK_EX, RECORD.size, offset(code), os.SEEK_SET)
+    else:
+        file.seek(offset(code))
+        msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, RECORD.size)
+
+
+def unlock(code):
+    if fcntl:
+        fcntl.lockf(file, fcntl.LOCK_UN, RECORD.size, offset(code), os.SEEK_SET)
+    else:
+        file.seek(offset(code))
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, RECORD.size)
+
+
+def read(code):
+    """
+    Returns an area's (version, flags)
+    A record being swapped is read again until the swap is done, without locking it (see the seqlock above)
+    """
+    if data is None:
+        attach()
+    at = offset(code)
+    while True:
+        (before,) = STAMP.unpack_from(data, at)
+        if before & 1:
+            break       # being written, or its writer died halfway: wait for the lock instead of spinning
+        flags = data[at + STAMP.size]
+        (after,) = STAMP.unpack_from(data, at)
+        if before == after:
+            return before, flags
+    lock(code)
+    try:
+        return RECORD.unpack_from(data, at)
+    finally:
+        unlock(code)
+
+
+def compare_and_swap(code, version, flags) -> bool:
+    """
+    Sets an area's flags, but only if the area is still at the given version
+    Returns whether the flags were set
+    """
+    at = offset(code)
+    lock(code)
+    try:
+        if STAMP.unpack_from(data, at)[0] != version:
+            return False
+        # Going from even to odd only ever changes the lowest byte, so readers never see a torn odd version
+        STAMP.pack_into(data, at, version | 1)
+        data[at + STAMP.size] = flags
+        STAMP.pack_into(data, at, ((version | 1) + 1) & 0xFFFFFFFF)
+        return True
+    finally:
+        unlock(code)
+
+
+def sync(area):
+    """
+    Catches an area up with the shared world if anyone changed it since this game last looked
+    Whatever the shared record says is gone is removed, anything it doesn't is put back as the area started out
+    """
+    if not enabled:
+        return
+    code = content.area_ids[area.name]
+    version, flags = read(code)
+    if seen.get(code) == version:
+        return
+    if flags & ITEM_TAKEN and area.item is not None:
+        area.change(item = None)
+    if flags & ENEMY_CLEARED and area.enemy is not None:
+        area.change(enemy = None)
+    area.bring_back(item = not flags & ITEM_TAKEN, enemy = not flags & ENEMY_CLEARED)
+    seen[code] = version
+
+
+def claim(area, flag) -> bool:
+    """
+    Takes the item (ITEM_TAKEN) or defeats the enemy (ENEMY_CLEARED) of an area for this game alone
+    Returns False if another player already has, the area is caught up with the shared world either way
+    Always True when the world isn't shared
+    """
+    if not enabled:
+        return True
+    code = content.area_ids[area.name]
+    while True:
+        version, flags = read(code)
+        if flags & flag:
+            claimed = False
+            break
+        if compare_and_swap(code, version, flags | flag):
+            claimed = True
+            break
+        # Someone else changed the area in the meantime, try again from what it holds now
+    sync(area)
+    return claimed
+
+
+def release(area, flag) -> None:
+    """
+    Brings an area's item (ITEM_TAKEN) or enemy (ENEMY_CLEARED) back for every player, e.g. when it respawns
+    """
+    code = content.area_ids[area.name]
+    while True:
+        version, flags = read(code)
+        if not flags & flag or compare_and_swap(code, version, flags & ~flag):
+            break
+    sync(area)
+
+
+def forget():
+    # A new game starts from the baseline world, so every area has to be caught up with again
+    seen.clear()
@@ -0,0 +1,134 @@
+# ==============================
+# Spectating
+# ==============================
+# Lets other players watch a fight live (see server.py)
+# A fight is sent as a keyframe when it starts, then as a delta after every turn: only the values that changed
+# (the player's HP and sickness, each enemy's HP, group size and sickness) along with the action the player took
+# Each delta is encoded once, in the fighting player's session, and the same text is passed to every spectator,
+# so a fight costs the same to broadcast however many are watching, apart from writing it out to each of them
+#
+# Nothing is recorded unless something is listening (send is set)
+
+# Where a session sends its fights, set by the server (or the engine, see engine.py): called with
+# ("begin", player, enemy names, values), ("turn", turn, action, changes, text) and ("end", result, text)
+send = None
+
+# Values are kept by (who, stat): who is "hero" or an enemy's position in the fight
+STATS = ("hp", "size", "sickness")
+
+
+def group(values) -> dict:
+    # Regroups values by who they belong to: {who: {stat: value}}
+    grouped = {}
+    for (who, stat), value in values.items():
+        grouped.setdefault(who, {})[stat] = value
+    return grouped
+
+
+# ==============================
+# Classes
+# ==============================
+class Fight:
+    """
+    What a spectator knows about a fight, kept up to date by applying its deltas
+    A Fight has:
+        - the player's name and the enemies' names (in their positions in the fight)
+        - values (dictionary of (who, stat) -> value)
+        - the turn it is at
+    """
+    def __init__(self,
+                 player: str,
+                 enemies: list,
+                 values: dict
+                 ) -> None:
+        self.player = player
+        self.enemies = enemies
+        self.values = dict(values)
+        self.turn = 0
+
+    def apply(self,
+              turn: int,
+              changes: dict
+              ) -> None:
+        self.turn = turn
+        self.values.update(changes)
+
+    def name(self, who) -> str:
+        return self.player if who == "hero" else self.enemies[who]
+
+    def describe(self, who, stats) -> str:
+        # e.g. "Wolf HP 45, 2 left, sickness 3", only the stats given
+        parts = [f"{self.name(who)} HP {stats['hp']}"] if "hp" in stats else [self.name(who)]
+        if "size" in stats:
+            parts.append(f"{stats['size']} left")
+        if "sickness" in stats:
+            parts.append(f"sickness {stats['sickness']}")
+        return ", ".join(parts)
+
+    def keyframe(self) -> str:
+        """
+        The whole fight as it is now, for a spectator who has just started watching
+        """
+        lines = [f"{self.player} vs {', '.join(self.enemies)} (turn {self.turn})"]
+        for who in ["hero"] + list(range(len(self.enemies))):
+            lines.append("    " + self.describe(who, {stat: self.values[(who, stat)] for stat in STATS if (who, stat) in self.values}))
+        return "\n".join(lines) + "\n"
+
+    def encode(self,
+               turn: int,
+               action: str,
+               changes: dict
+               ) -> str:
+        """
+        One line for a turn, naming only what changed, e.g.
+        "Turn 3: Bob attacks | Bob HP 120 | Wolf HP 45, 2 left"
+        """
+        parts = [f"Turn {turn}: {self.player} {action}"]
+        parts += [self.describe(who, stats) for who, stats in group(changes).items()]
+        return " | ".join(parts) + "\n"
+
+
+class Recorder:
+    """
+    Follows a fight in the fighting player's session and sends a delta after every turn
+    """
+    def __init__(self,
+                 hero: object,
+                 enemies: list
+                 ) -> None:
+        self.hero = hero
+        self.enemies = list(enemies)        # enemies keep their positions, even after they fall
+        self.turn = 0
+        self.last = self.values()
+        self.fight = Fight(hero.name, [enemy.name for enemy in self.enemies], self.last)
+        send(("begin", hero.name, self.fight.enemies, self.last))
+
+    def values(self) -> dict:
+        values = {("hero", "hp"): self.hero.hp, ("hero", "sickness"): self.hero.sickness}
+        for who, enemy in enumerate(self.enemies):
+            values[(who, "hp")] = enemy.hp
+            values[(who, "size")] = enemy.current_group_size
+            values[(who, "sickness")] = enemy.sickness
+        return values
+
+    def record(self,
+               action: str
+               ) -> None:
+        # Sends what changed since the last turn, with the action the player took this turn
+        self.turn += 1
+        now = self.values()
+        changes = {key: value for key, value in now.items() if self.last[key] != value}
+        self.last = now
+        send(("turn", self.turn, action, changes, self.fight.encode(self.turn, action, changes)))
+
+    def end(self,
+            result: str
+            ) -> None:
+        send(("end", result, f"{self.hero.name} {result}!\n"))
+
+
+def begin(hero, enemies):
+    """
+    Starts following a fight, returns None when nothing is listening
+    """
+    return Recorder(hero, enemies) if send else None
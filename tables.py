@@ -0,0 +1,474 @@
+import os
+import sys
+import mmap
+import zlib
+import struct
+
+# ==============================
+# Content tables
+# ==============================
+# The content that never changes while the game runs (weapon and armour stats, enemy templates,
+# area names, descriptions and exits) packed into one flat file
+# Processes map the file instead of building the content themselves: the operating system shares the pages
+# between every process that maps it, and nothing is read until it is used, so a process attaches instantly
+# and another server worker costs almost no memory for content
+# Views read their record straight from the mapped file whenever a value is asked for
+#
+# python tables.py <path> writes the tables for the world that is loaded (the shipped map, or TIMEBOUND_WORLD)
+# TIMEBOUND_TABLES=<path> then plays from them: weapons.py, armour.py and characters.py bind their content to views
+# under the names they would have given it, and map.py builds areas from the tables as the player reaches them
+# (see map.load_tables) instead of building the shipped map
+# Tables written from content modules that have been edited since are refused, they have to be written again
+#
+# All numbers are little endian, text is stored once in the strings section and referred to by (offset, length)
+#   header:     magic (3 bytes), version (u8), content fingerprint (u32), checksum of the content modules' source (u32),
+#               weapon, armour, enemy, region and encounter counts (u16), area and exit counts (u32), hash slots (u32),
+#               start area and the area that wins the game (u32 each), section offsets (u64 each)
+#   weapons:    name, name in weapons.py, description, kind (u8: 0 weapon, 1 special, 2 aoe),
+#               damage, special damage, crit chance, sickness inflicted, bleeding and stun chance (i32 each)
+#   armours:    name, name in armour.py, description, hp, agility, damage reduction in basis points (i32 each)
+#   enemies:    name, name in characters.py, smallest and largest group size, hp per member, agility, damage,
+#               crit chance, sickness per member, sickness inflicted, bleeding, stun chance (i32 each), flags (u8)
+#   regions:    name
+#   areas:      name, description, region (u16), encounter and respawn rule (i16 each, -1 for none),
+#               item name, enemy name, first exit (u32), exit count (u8)
+#   exits:      action, area (u32)
+#   hash:       area + 1 (u32) for each slot, 0 for an empty slot, slots found by the crc32 of the area's name
+#   locations:  first and count (u32 each) for every weapon, armour and enemy, in that order,
+#               into a list of the areas (u32) that start out holding it
+#   strings:    utf-8 text
+MAGIC = b"TBT"
+VERSION = 6
+
+HEADER = struct.Struct("<3sBIIHHHHHIIIII9Q")
+TEXT = struct.Struct("<II")
+WEAPON = struct.Struct("<IIIIIIBiiiiiiiii")
+ARMOUR = struct.Struct("<IIIIIIiii")
+ENEMY = struct.Struct("<IIIIiiiiiiiiiiiiB")
+REGION = struct.Struct("<II")
+AREA = struct.Struct("<IIIIHhhIIIIIB")
+EXIT = struct.Struct("<III")
+SLOT = struct.Struct("<I")
+SPAN = struct.Struct("<II")
+
+# Weapon kinds
+PLAIN, SPECIAL, AOE = 0, 1, 2
+
+# Enemy flags
+PER_MEMBER = 1
+RANDOM_SIZE = 2
+
+# The modules the content is written from, a change to any of them means the tables have to be written again
+SOURCES = ("weapons", "armour", "characters", "encounters", "map")
+GAME_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def source_checksum() -> int:
+    # Checksum of the content modules as they are on disk
+    checksum = 0
+    for name in SOURCES:
+        with open(os.path.join(GAME_DIR, f"{name}.py"), "rb") as file:
+            checksum = zlib.crc32(file.read(), checksum)
+    return checksum
+
+
+# ==============================
+# Views
+# ==============================
+def field(layout, index) -> tuple:
+    # (struct reading the value at index in a record, and where it starts in the record)
+    codes = layout.format.lstrip("<")
+    return struct.Struct("<" + codes[index]), struct.calcsize("<" + codes[:index])
+
+
+def number(layout, index):
+    # A property reading one number of the view's record, straight from its place in the file
+    value, at = field(layout, index)
+    return property(lambda view: value.unpack_from(view.tables.data, view.offset + at)[0])
+
+
+def text(layout, index):
+    # A property reading text from the strings section, its (offset, length) starts at index in the record
+    at = field(layout, index)[1]
+    return property(lambda view: view.tables.text(*TEXT.unpack_from(view.tables.data, view.offset + at)))
+
+
+class View:
+    """
+    Reads one record of a table, straight from the mapped file
+    A View has:
+        - the tables it reads from
+        - the record's offset in the file
+    """
+    __slots__ = ("tables", "offset")
+    LAYOUT = None
+
+    def __init__(self,
+                 tables: object,
+                 offset: int
+                 ) -> None:
+        self.tables = tables
+        self.offset = offset
+
+    def values(self) -> tuple:
+        return self.LAYOUT.unpack_from(self.tables.data, self.offset)
+
+
+class WeaponView(View):
+    __slots__ = ()
+    LAYOUT = WEAPON
+    name = text(WEAPON, 0)
+    key = text(WEAPON, 2)
+    description = text(WEAPON, 4)
+    kind = number(WEAPON, 6)
+    min_damage = number(WEAPON, 7)
+    max_damage = number(WEAPON, 8)
+    crit_ch = number(WEAPON, 9)
+    bleed = number(WEAPON, 14)
+    stun_ch = number(WEAPON, 15)
+
+
+class SpecialWeaponView(WeaponView):
+    # Only special weapons have a special attack and inflict sickness
+    __slots__ = ()
+    min_special = number(WEAPON, 10)
+    max_special = number(WEAPON, 11)
+    inflict_min_sickness = number(WEAPON, 12)
+    inflict_max_sickness = number(WEAPON, 13)
+
+
+class ArmourView(View):
+    __slots__ = ()
+    LAYOUT = ARMOUR
+    name = text(ARMOUR, 0)
+    key = text(ARMOUR, 2)
+    description = text(ARMOUR, 4)
+    hp = number(ARMOUR, 6)
+    agility = number(ARMOUR, 7)
+    damage_reduction = number(ARMOUR, 8)
+
+
+class EnemyView(View):
+    # Only what every member of the group shares, the group's own state (HP, size, ...) is kept by the Enemy
+    __slots__ = ()
+    LAYOUT = ENEMY
+    name = text(ENEMY, 0)
+    key = text(ENEMY, 2)
+    min_group_size = number(ENEMY, 4)
+    max_group_size = number(ENEMY, 5)
+    hp_member = number(ENEMY, 6)
+    agility = number(ENEMY, 7)
+    min_damage = number(ENEMY, 8)
+    max_damage = number(ENEMY, 9)
+    crit_ch = number(ENEMY, 10)
+    sickness_member = number(ENEMY, 11)
+    inflict_min_sickness = number(ENEMY, 12)
+    inflict_max_sickness = number(ENEMY, 13)
+    bleed = number(ENEMY, 14)
+    stun_ch = number(ENEMY, 15)
+    flags = number(ENEMY, 16)
+
+
+class AreaView(View):
+    __slots__ = ()
+    LAYOUT = AREA
+    name = text(AREA, 0)
+    description = text(AREA, 2)
+    encounter = number(AREA, 5)       # index into map.encounter_tables(), -1 for none
+    respawn = number(AREA, 6)         # index into map.respawn_rules(), -1 for none
+
+    @property
+    def region(self) -> str:
+        return self.tables.region(self.values()[4])
+
+    @property
+    def item(self) -> str:
+        # Name of the weapon or armour in the area, None if there isn't one
+        return self.tables.text(*self.values()[7:9]) or None
+
+    @property
+    def enemy(self) -> str:
+        return self.tables.text(*self.values()[9:11]) or None
+
+    @property
+    def exits(self) -> dict:
+        first, count = self.values()[11:13]
+        return dict(self.tables.exit(first + index) for index in range(count))
+
+
+# Content classes made by content_class(), by (view, class)
+content_classes = {}
+
+
+def content_class(view, kind) -> type:
+    """
+    Returns a class for content read from the tables, e.g. content_class(SpecialWeaponView, SpecialWeapon)
+    The view's properties come before the game's own class, so the content reads its stats from the tables
+    but is a SpecialWeapon (with its methods) to the rest of the game
+    """
+    if (view, kind) not in content_classes:
+        content_classes[(view, kind)] = type(kind.__name__, (view, kind), {"__slots__": ()})
+    return content_classes[(view, kind)]
+
+
+def make(view, kind, tables, offset):
+    # Content of a class made by content_class(), without going through the class's constructor
+    thing = object.__new__(content_class(view, kind))
+    View.__init__(thing, tables, offset)
+    return thing
+
+
+# ==============================
+# Classes
+# ==============================
+class Tables:
+    """
+    A content tables file mapped into memory
+    Raises ValueError if the file isn't a content tables file, or was written from content that has changed since
+    """
+    def __init__(self,
+                 path: str
+                 ) -> None:
+        with open(path, "rb") as file:
+            self.data = mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_READ)     # the mapping stays open after the file is closed
+        if len(self.data) < HEADER.size:
+            raise ValueError(f"{path} is not a content tables file")
+        (magic, version, self.fingerprint, source, self.weapon_count, self.armour_count, self.enemy_count,
+         self.region_count, self.encounter_count, self.area_count, self.exit_count, self.slots, self.start, self.win,
+         *sections) = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a content tables file")
+        if version != VERSION:
+            raise ValueError(f"content tables version {version} is not supported")
+        if source != source_checksum():
+            raise ValueError(f"the content has changed since {path} was written, write it again with python tables.py {path}")
+        self.weapons_at, self.armours_at, self.enemies_at, self.regions_at, self.areas_at, \
+            self.exits_at, self.hash_at, self.locations_at, self.strings_at = sections
+
+    def text(self, offset, length) -> str:
+        start = self.strings_at + offset
+        return self.data[start:start + length].decode()
+
+    def weapon(self, code) -> WeaponView:
+        return WeaponView(self, self.weapons_at + code * WEAPON.size)
+
+    def armour(self, code) -> ArmourView:
+        return ArmourView(self, self.armours_at + code * ARMOUR.size)
+
+    def enemy(self, code) -> EnemyView:
+        return EnemyView(self, self.enemies_at + code * ENEMY.size)
+
+    def weapons(self, classes) -> dict:
+        """
+        Returns every weapon by its name in weapons.py, read from the tables
+        classes = the class for each kind of weapon (PLAIN, SPECIAL and AOE)
+        """
+        weapons = {}
+        for code in range(self.weapon_count):
+            view = self.weapon(code)
+            kind = view.kind
+            weapons[view.key] = make(SpecialWeaponView if kind == SPECIAL else WeaponView, classes[kind], self, view.offset)
+        return weapons
+
+    def armours(self, kind) -> dict:
+        # Every armour by its name in armour.py, read from the tables
+        views = (self.armour(code) for code in range(self.armour_count))
+        return {view.key: make(ArmourView, kind, self, view.offset) for view in views}
+
+    def enemies(self, kind) -> dict:
+        """
+        Returns every enemy by its name in characters.py, its stats read from the tables
+        Each one is given a group of its own to fight with (see Enemy.form)
+        """
+        enemies = {}
+        for code in range(self.enemy_count):
+            enemy = make(EnemyView, kind, self, self.enemies_at + code * ENEMY.size)
+            size = enemy.min_group_size
+            if enemy.flags & RANDOM_SIZE:
+                size = (enemy.min_group_size, enemy.max_group_size)
+            enemy.form(size, per_member = bool(enemy.flags & PER_MEMBER))
+            enemies[enemy.key] = enemy
+        return enemies
+
+    def region(self, code) -> str:
+        return self.text(*REGION.unpack_from(self.data, self.regions_at + code * REGION.size))
+
+    def area(self, code) -> AreaView:
+        return AreaView(self, self.areas_at + code * AREA.size)
+
+    def area_name(self, code) -> str:
+        return self.text(*TEXT.unpack_from(self.data, self.areas_at + code * AREA.size))
+
+    def exit(self, code) -> tuple:
+        offset, length, area = EXIT.unpack_from(self.data, self.exits_at + code * EXIT.size)
+        return self.text(offset, length), self.area_name(area)
+
+    def thing_name(self, code) -> str:
+        # Name of a weapon, armour or enemy, numbered in that order as in the locations section
+        if code < self.weapon_count:
+            return self.weapon(code).name
+        code -= self.weapon_count
+        if code < self.armour_count:
+            return self.armour(code).name
+        return self.enemy(code - self.armour_count).name
+
+    def locations(self, code) -> tuple:
+        """
+        Returns the codes of the areas that start out holding a weapon, armour or enemy (numbered as in thing_name())
+        """
+        first, count = SPAN.unpack_from(self.data, self.locations_at + code * SPAN.size)
+        things = self.weapon_count + self.armour_count + self.enemy_count
+        return struct.unpack_from(f"<{count}I", self.data, self.locations_at + things * SPAN.size + first * 4)
+
+    def find(self, name) -> int:
+        """
+        Returns the code of the area with this name, -1 if there is none
+        """
+        key = name.encode()
+        slot = zlib.crc32(key) & (self.slots - 1)
+        while True:
+            (entry,) = SLOT.unpack_from(self.data, self.hash_at + slot * SLOT.size)
+            if entry == 0:
+                return -1
+            offset, length = TEXT.unpack_from(self.data, self.areas_at + (entry - 1) * AREA.size)
+            start = self.strings_at + offset
+            if self.data[start:start + length] == key:
+                return entry - 1
+            slot = (slot + 1) & (self.slots - 1)
+
+    def close(self) -> None:
+        self.data.close()
+
+
+# The tables this process plays from, None when it builds the content itself
+loaded = Tables(os.environ["TIMEBOUND_TABLES"]) if os.environ.get("TIMEBOUND_TABLES") else None
+
+
+# ==============================
+# Writing
+# ==============================
+def write(path):
+    """
+    Packs the content that is loaded into a tables file
+    Areas keep the codes content.py gives them, so saves work the same with or without the tables
+    """
+    import content
+    import map
+    import weapons
+    import armour
+    import characters
+    from weapons import SpecialWeapon, AOEWeapon
+
+    strings = bytearray()
+    known = {}      # text -> (offset, length), every piece of text is stored once
+
+    def store(value):
+        value = value or ""
+        if value not in known:
+            encoded = value.encode()
+            known[value] = (len(strings), len(encoded))
+            strings.extend(encoded)
+        return known[value]
+
+    # The name each weapon, armour and enemy is given in its module, so the module can give it the same name again
+    keys = {}
+    for module in (weapons, armour, characters):
+        keys.update((id(value), key) for key, value in vars(module).items())
+
+    weapon_table = bytearray()
+    for weapon in content.WEAPONS:
+        kind = SPECIAL if isinstance(weapon, SpecialWeapon) else AOE if isinstance(weapon, AOEWeapon) else PLAIN
+        weapon_table += WEAPON.pack(*store(weapon.name), *store(keys[id(weapon)]), *store(weapon.description), kind,
+                               weapon.min_damage, weapon.max_damage, weapon.crit_ch,
+                               getattr(weapon, "min_special", 0), getattr(weapon, "max_special", 0),
+                               getattr(weapon, "inflict_min_sickness", 0), getattr(weapon, "inflict_max_sickness", 0),
+                               weapon.bleed, weapon.stun_ch)
+
+    armours = bytearray()
+    for item in content.ARMOURS:
+        armours += ARMOUR.pack(*store(item.name), *store(keys[id(item)]), *store(item.description),
+                               item.hp, item.agility, item.damage_reduction)
+
+    enemies = bytearray()
+    for enemy in content.ENEMIES:
+        smallest, largest = enemy.group_range or (enemy.original_group_size, enemy.original_group_size)
+        flags = (PER_MEMBER if enemy.members is not None else 0) | (RANDOM_SIZE if enemy.group_range else 0)
+        enemies += ENEMY.pack(*store(enemy.name), *store(keys[id(enemy)]), smallest, largest, enemy.hp_member, enemy.agility,
+                              enemy.min_damage, enemy.max_damage, enemy.crit_ch, enemy.sickness_member,
+                              enemy.inflict_min_sickness, enemy.inflict_max_sickness, enemy.bleed, enemy.stun_ch, flags)
+
+    region_codes = {name: code for code, name in enumerate(map.regions)}
+    regions = bytearray()
+    for name in map.regions:
+        regions += REGION.pack(*store(name))
+
+    encounter_codes = {id(table): code for code, table in enumerate(map.encounter_tables())}
+    respawn_codes = {id(rule): code for code, rule in enumerate(map.respawn_rules())}
+    areas = bytearray()
+    exits = bytearray()
+    exit_count = 0
+    for area in content.AREAS:
+        encounter = encounter_codes.get(id(area.encounter), -1)
+        respawn = respawn_codes.get(id(area.respawn), -1)
+        item, enemy = area.baseline
+        areas += AREA.pack(*store(area.name), *store(area.description), region_codes[area.region], encounter, respawn,
+                           *store(item and item.name), *store(enemy and enemy.name), exit_count, len(area.exits))
+        for action, target in area.exits.items():
+            exits += EXIT.pack(*store(action), content.area_ids[target])
+        exit_count += len(area.exits)
+
+    # Open addressing hash of area names, kept at most half full
+    slots = 1
+    while slots < len(content.AREAS) * 2:
+        slots *= 2
+    table = [0] * slots
+    for code, area in enumerate(content.AREAS):
+        slot = zlib.crc32(area.name.encode()) & (slots - 1)
+        while table[slot]:
+            slot = (slot + 1) & (slots - 1)
+        table[slot] = code + 1
+    hashes = struct.pack(f"<{slots}I", *table)
+
+    # Where every weapon, armour and enemy starts out
+    holding = {}
+    for code, area in enumerate(content.AREAS):
+        for thing in area.baseline:
+            if thing is not None:
+                holding.setdefault(id(thing), []).append(code)
+    spans = bytearray()
+    lists = []
+    for thing in content.WEAPONS + content.ARMOURS + content.ENEMIES:
+        codes = holding.get(id(thing), [])
+        spans += SPAN.pack(len(lists), len(codes))
+        lists += codes
+    found = spans + struct.pack(f"<{len(lists)}I", *lists)
+
+    sections = [weapon_table, armours, enemies, regions, areas, exits, hashes, found, strings]
+    offsets = []
+    offset = HEADER.size
+    for section in sections:
+        offsets.append(offset)
+        offset += len(section)
+
+    header = HEADER.pack(MAGIC, VERSION, content.fingerprint(), source_checksum(), len(content.WEAPONS), len(content.ARMOURS),
+                         len(content.ENEMIES), len(map.regions), len(encounter_codes), len(content.AREAS),
+                         exit_count, slots, content.area_ids[map.start_area], content.area_ids[map.win_area], *offsets)
+
+    # Written to a temporary file first, processes that have the old file mapped keep reading it undisturbed
+    temp = path + ".tmp"
+    with open(temp, "wb") as file:
+        file.write(header)
+        for section in sections:
+            file.write(section)
+    os.replace(temp, path)
+
+
+# ==============================
+# Command line
+# ==============================
+# python tables.py <path>
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python tables.py <path>")
+    else:
+        write(sys.argv[1])
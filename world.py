@@ -0,0 +1,78 @@
+# ==============================
+# World change tracking
+# ==============================
+# Areas and enemies report themselves here whenever something a new game would have to undo changes
+# (an item picked up, an enemy damaged, an area completed, ...)
+# Resetting the world only restores those, instead of going through every area and enemy
+
+changed = set()     # areas and enemies that changed since the baseline
+randomized = []     # enemies whose group size is rolled again for every new game
+tracking = False    # changes made while the world is still being built are part of the baseline
+
+
+def mark(thing):
+    """
+    Records that an area or enemy has changed
+    """
+    if tracking:
+        changed.add(thing)
+
+
+def capture():
+    """
+    Takes the world as it is now as the baseline for new games
+    Areas and enemies keep their own starting values, so this only needs to start tracking changes
+    """
+    global tracking
+    changed.clear()
+    tracking = True
+
+
+def reset():
+    """
+    Restores the baseline world for a new game
+    Each changed area or enemy puts itself back with restore(), then randomly sized groups are rolled again
+    Returns the number of objects restored
+    """
+    restored = len(changed)
+    for thing in list(changed):
+        thing.restore()
+    changed.clear()
+    for enemy in randomized:
+        enemy.reroll()
+    changed.clear()     # rerolling counts as part of the new baseline
+    return restored
+
+
+# ==============================
+# Swapping games
+# ==============================
+# A server's shard plays many games over one world (see server.py): a game that is swapped out takes its changes
+# out of the world with it, and puts them back when it is swapped in again
+unstashed = []      # what the game swapped in last had changed
+
+
+def stash():
+    """
+    Takes the changes of the game being played out of the world, putting the baseline back for the next game
+    Enemies spawned from encounter tables belong to the game that spawned them and are left as they are,
+    randomly sized groups are always taken, every game rolls its own sizes
+    Returns what unstash() needs to put the changes back
+    """
+    global changed, unstashed
+    things = [thing for thing in changed.union(randomized, unstashed) if getattr(thing, "pool", None) is None]
+    stashed = (changed, [(thing, thing.state()) for thing in things])
+    changed = set()
+    unstashed = []
+    for thing in things:
+        thing.start_over()
+    return stashed
+
+
+def unstash(stashed):
+    # Puts a game's changes taken out by stash() back into the world
+    global changed, unstashed
+    changed, states = stashed
+    unstashed = [thing for thing, _ in states]     # taken out again by stash(), even once a reload has moved on from them
+    for thing, state in states:
+        thing.set_state(state)
@@ -0,0 +1,168 @@
+import json
+import random
+import argparse
+from weapons import *
+from armour import *
+from characters import *
+
+# ==============================
+# Vocabulary
+# ==============================
+# Region themes, numbered when they repeat (e.g. "Jungle 12")
+THEMES = ["Savanna", "Jungle", "Ruins", "Settlement", "Hunting Grounds", "Rival Tribe", "Temple"]
+
+# Exit names, the same kind of actions used by the shipped map
+DIRECTIONS = ["north", "south", "east", "west", "left", "right", "straight", "ahead",
+              "deeper", "enter", "explore", "hunt", "forage", "inspect", "rest"]
+
+# Pieces used to build area descriptions
+SIGHTS = ["Tall grass sways around you", "Vines hang from every branch", "Broken stone lies everywhere",
+          "Smoke rises from a distant fire", "The ground is churned up by hooves", "Bones are scattered about",
+          "Water drips from somewhere above", "The air is thick and still"]
+MOODS = ["It is eerily quiet", "Something is watching you", "You feel uneasy", "A faint rustling can be heard",
+         "The wind howls", "You hear distant drums"]
+
+# Content that can be placed in generated areas, by name
+ITEMS = [value.name for value in list(globals().values()) if isinstance(value, (Weapon, Armour))]
+ENEMIES = [value.name for value in list(globals().values()) if isinstance(value, Enemy)]
+
+# The last area of the last region holds this enemy, and the game is won once the area is complete
+FINAL_ENEMY = mictlantecuhtli.name
+
+FORMAT = "timebound-world"
+VERSION = 2
+
+
+# ==============================
+# Generation
+# ==============================
+def region_name(index):
+    theme = THEMES[index % len(THEMES)]
+    return f"{theme} {index // len(THEMES) + 1}"
+
+
+def area_name(region, index):
+    return f"{region} - {index}"
+
+
+def final_area(areas, region_size):
+    # Name of the area that wins the game, the last area of the last region
+    regions = (areas + region_size - 1) // region_size
+    return area_name(region_name(regions - 1), areas - (regions - 1) * region_size - 1)
+
+
+def generate(seed = 0,
+             areas = 10000,
+             region_size = 100,
+             branching = 3,
+             one_way = 0.1,
+             item_density = 0.3,
+             enemy_density = 0.2
+             ):
+    """
+    Generates a world one region at a time, so only a single region is ever held in memory
+    Yields a dictionary per region: {"name": ..., "areas": [{"name", "description", "exits", "item", "enemy"}, ...]}
+    seed = the same seed always generates the same world
+    areas = total number of areas
+    region_size = number of areas per region
+    branching = most exits an area gets (at least one way back towards the start is always kept)
+    one_way = chance that an exit has no way back
+    item_density and enemy_density = chance that an area holds an item or an enemy
+    """
+    rng = random.Random(seed)
+    regions = (areas + region_size - 1) // region_size
+
+    for number in range(regions):
+        name = region_name(number)
+        size = min(region_size, areas - number * region_size)
+        records = []
+
+        for index in range(size):
+            records.append({
+                "name": area_name(name, index),
+                "description": f"{rng.choice(SIGHTS)}. {rng.choice(MOODS)}",
+                "exits": {},
+                "item": rng.choice(ITEMS) if rng.random() < item_density else None,
+                "enemy": rng.choice(ENEMIES) if rng.random() < enemy_density else None,
+            })
+
+        # Every area hangs off an earlier one, so the whole region can be reached from its first area
+        for index in range(1, size):
+            parent = records[rng.randrange(max(0, index - branching * 2), index)]
+            if not add_exit(rng, parent, records[index]["name"], branching + 1):
+                parent = records[index - 1]     # has no exits forward yet, so always has room
+                add_exit(rng, parent, records[index]["name"], len(DIRECTIONS))
+            if rng.random() >= one_way:
+                records[index]["exits"]["back"] = parent["name"]
+
+        # Extra exits between nearby areas, never from an area back to itself
+        for index in range(size):
+            nearby = [other for other in range(max(0, index - branching * 2), min(size, index + branching * 2 + 1))
+                      if other != index]
+            while nearby and len(records[index]["exits"]) < rng.randint(1, branching):
+                other = records[rng.choice(nearby)]
+                if not add_exit(rng, records[index], other["name"], branching):
+                    break
+
+        # The first area leads back to the previous region and the last area on to the next one
+        if number > 0 and rng.random() >= one_way:
+            records[0]["exits"]["leave"] = area_name(region_name(number - 1), region_size - 1)
+        if number < regions - 1:
+            records[-1]["exits"]["leave"] = area_name(region_name(number + 1), 0)
+        else:
+            records[-1]["item"] = None
+            records[-1]["enemy"] = FINAL_ENEMY
+
+        yield {"name": name, "areas": records}
+
+
+def add_exit(rng, record, target, limit):
+    """
+    Adds an exit with a direction the area isn't using yet
+    Returns False if the area already has limit exits
+    """
+    if len(record["exits"]) >= limit:
+        return False
+    free = [direction for direction in DIRECTIONS if direction not in record["exits"]]
+    record["exits"][rng.choice(free)] = target
+    return True
+
+
+def write(path, **settings):
+    """
+    Generates a world straight into a file, one JSON line per region after a header line
+    The file can be played with TIMEBOUND_WORLD=<path> (see map.load_world)
+    """
+    with open(path, "w", encoding = "utf-8") as file:
+        header = {"format": FORMAT, "version": VERSION, "settings": settings,
+                  "start": area_name(region_name(0), 0),
+                  "win": final_area(settings.get("areas", 10000), settings.get("region_size", 100))}
+        file.write(json.dumps(header) + "\n")
+        for region in generate(**settings):
+            file.write(json.dumps(region, separators = (",", ":")) + "\n")
+
+
+# ==============================
+# Command line
+# ==============================
+# python worldgen.py world.jsonl --areas 100000 --seed 7
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Generate a world for scale testing")
+    parser.add_argument("path")
+    parser.add_argument("--seed", type = int, default = 0)
+    parser.add_argument("--areas", type = int, default = 10000)
+    parser.add_argument("--region-size", type = int, default = 100)
+    parser.add_argument("--branching", type = int, default = 3)
+    parser.add_argument("--one-way", type = float, default = 0.1)
+    parser.add_argument("--item-density", type = float, default = 0.3)
+    parser.add_argument("--enemy-density", type = float, default = 0.2)
+    options = parser.parse_args()
+    write(options.path,
+          seed = options.seed,
+          areas = options.areas,
+          region_size = options.region_size,
+          branching = options.branching,
+          one_way = options.one_way,
+          item_density = options.item_density,
+          enemy_density = options.enemy_density
+          )